@@ -10,7 +10,15 @@ from pipo.signal_manager import SignalManager
 from pipo.bot import PipoBot
 from pipo.cogs.music_bot import MusicBot
 from pipo.config import settings
-from pipo.player.music_queue._remote_music_queue import broker, declare_dlx
+from pipo.player.audio_source.http_client import HttpClient
+from pipo.player.audio_source.spotify_client import SpotifyClient
+from pipo.player.audio_source.spotify_handler import SpotifyHandler
+from pipo.player.audio_source.youtube_handler import YoutubeQueryHandler
+from pipo.player.music_queue._remote_music_queue import (
+    broker,
+    declare_dlx,
+    extraction_executor,
+)
 
 
 async def run_bot():
@@ -20,10 +28,16 @@ async def run_bot():
         settings.main_task_name,
         (signal.SIGUSR1, signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGQUIT),
     )
+    SignalManager.add_cleanup(extraction_executor.shutdown)
+    SignalManager.add_cleanup(YoutubeQueryHandler.query_cache().close)
+    SignalManager.add_cleanup(SpotifyHandler.track_mapping().close)
+    SignalManager.add_cleanup(HttpClient.close)
+    SignalManager.add_cleanup(SpotifyClient.close)
 
     bot = PipoBot(
         command_prefix=settings.commands.prefix, description=settings.bot_description
     )
+    HttpClient.open()
     await broker.connect()
     await declare_dlx(broker)
     await broker.start()
@@ -29,9 +29,14 @@ settings.validators.register(
             "channel",
             "voice_channel",
             "token",
+            must_exist=True,
+            neq="",
+        ),
+        Validator(
             "queue_broker_url",
             must_exist=True,
             neq="",
+            when=Validator("player.queue.broker.transport", eq="rabbitmq"),
         ),
         Validator(
             "spotify.secret",
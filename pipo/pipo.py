@@ -1,7 +1,9 @@
 #!usr/bin/env python3
 import asyncio
+import functools
 import signal
-from typing import List
+import time
+from typing import Callable, List, Optional
 
 import discord.ext.commands
 from discord.ext.commands import Context as Dctx
@@ -11,6 +13,9 @@ import pipo.player
 import pipo.states.disconnected_state
 import pipo.states.idle_state
 from pipo.config import settings
+from pipo.player.audio_source.youtube_handler import YoutubeHandler
+from pipo.player.music_queue._remote_music_queue import extraction_executor
+from pipo.player.music_queue.models.music import Music
 
 
 class Pipo(pipo.states.Context):
@@ -23,6 +28,7 @@ class Pipo(pipo.states.Context):
     voice_client: discord.VoiceClient
     music_channel: discord.VoiceChannel
     player: pipo.player.Player
+    __music_over: Optional[asyncio.Future]
 
     def __init__(self, bot: discord.ext.commands.Bot):
         super().__init__(pipo.states.disconnected_state.DisconnectedState())
@@ -31,6 +37,7 @@ class Pipo(pipo.states.Context):
         self.bot = bot
         self.voice_client = None
         self.music_channel = None
+        self.__music_over = None
         self.player = pipo.player.Player(self)
 
     def current_state(self) -> str:
@@ -89,48 +96,119 @@ class Pipo(pipo.states.Context):
             self.music_channel = self.bot.get_channel(self.channel_id)
         await self.music_channel.send(message)
 
-    async def submit_music(self, url: str) -> None:  # noqa
+    @staticmethod
+    def __passthrough(music: Music) -> bool:
+        """Whether music is known to be Opus in a container Discord accepts as is."""
+        config = settings.pipo.passthrough
+        return music.codec in config.codecs and music.container in config.containers
+
+    async def __stream_url(self, music: Music) -> str:
+        """Provide music audio url, resolved again if it expires before music ends.
+
+        Music may wait in remote and local queues for longer than its audio url
+        remains valid, which would then be refused once streamed.
+        """
+        url = str(music.source)
+        expire = YoutubeHandler.stream_expires_at(url)
+        valid_for = (music.duration or 0) + settings.pipo.stream_refresh_margin
+        if music.origin is None or expire is None or expire >= time.time() + valid_for:
+            return url
+        self._logger.info("Audio url about to expire, resolving it: %s", music.uuid)
+        audio = await YoutubeHandler.fetch_audio(
+            str(music.origin), extraction_executor, valid_for
+        )
+        return audio.url if audio else url
+
+    async def load_music(self, music: Music) -> Callable[[], discord.AudioSource]:
+        """Prepare music to be played, leaving its audio stream unopened.
+
+        Music whose codec and container were reported upstream as Opus in WebM or
+        Ogg is streamed as is, skipping both stream probing and re-encoding. Any
+        other music is probed to find out its format. Audio urls expiring before
+        music would end are resolved again from the video music originates from.
+        Prepared music holds neither an ffmpeg process nor a connection, which are
+        only started once its audio source is opened.
+
+        Parameters
+        ----------
+        music : Music
+            Music to prepare.
+
+        Returns
+        -------
+        Callable[[], discord.AudioSource]
+            Opens audio source streaming music.
+        """
+        url = await self.__stream_url(music)
+        if self.__passthrough(music):
+            self._logger.debug("Streaming music without probing: %s", music.uuid)
+            codec, bitrate = "copy", round(music.bitrate) if music.bitrate else None
+        else:
+            codec, bitrate = await discord.FFmpegOpusAudio.probe(url, method="fallback")
+        return functools.partial(
+            discord.FFmpegOpusAudio,
+            url,
+            codec=codec,
+            bitrate=bitrate,
+            **settings.pipo.ffmpeg_config,
+        )
+
+    async def submit_music(  # noqa
+        self,
+        music: Music,
+        open_source: Optional[Callable[[], discord.AudioSource]] = None,
+    ) -> None:
         """Submit a music to be played on Discord voice channel.
 
         Submits a music to Discord voice channel and waits until it is over to
-        proceed to terminate task. This waiting mechanism makes use o sequential voice
-        client state checks and asyncio.sleep invocations.
+        proceed to terminate task. Completion is signalled by the voice client once
+        the audio player stops, either because music ended, was stopped or failed,
+        or by :meth:`~Pipo.stop_music`, whichever happens first.
         Active reconnection is attempted if a music cannot be played due to connection
         issues and discarded in all other cases.
 
         Parameters
         ----------
-        url : str
-            URL of music to play.
+        music : Music
+            Music to play.
+        open_source : Optional[Callable[[], discord.AudioSource]], optional
+            Opens music audio source, as prepared by :meth:`~Pipo.load_music`.
+            Music is prepared on demand if not provided.
 
         Raises
         ------
         asyncio.CancelledError
             Asyncio task was cancelled.
         """
+        source = None
         try:
+            open_source = open_source or await self.load_music(music)
+            loop = asyncio.get_running_loop()
+            music_over = self.__music_over = loop.create_future()
+            source = open_source()
             self.voice_client.play(
-                await discord.FFmpegOpusAudio.from_probe(
-                    url, method="fallback", **settings.pipo.ffmpeg_config
-                )
+                source,
+                after=lambda error: loop.is_closed()
+                or loop.call_soon_threadsafe(self.__end_music, music_over, error),
             )
-            while self.voice_client.is_playing() or self.voice_client.is_paused():  # noqa
-                await asyncio.sleep(settings.pipo.check_if_playing_frequency)
+            await music_over
         except asyncio.CancelledError:
-            self._logger.debug("Cancelling asyncio sleep")
+            self._logger.debug("Cancelling music playback wait")
             await asyncio.shield(
                 asyncio.wait_for(
                     asyncio.gather(self.voice_client.disconnect()),
                     timeout=settings.pipo.on_exit_disconnect_timeout,
                 )
             )
-            self._logger.debug("Cancelled asyncio sleep")
+            self._logger.debug("Cancelled music playback wait")
             raise
         except discord.ClientException:
+            if source:
+                source.cleanup()
             if not self.voice_client.is_connected():
                 self._logger.info("Detected connection issues, attempting reconnection")
                 await self.ensure_connection()
-                await self.submit_music(url)
+                await self.submit_music(music, open_source)
                 return
             else:
                 self._logger.warning(
@@ -140,6 +218,22 @@ class Pipo(pipo.states.Context):
             self.player.can_play.set()
             self._logger.debug("'can_play' flag was set")
 
+    def __end_music(
+        self, music_over: asyncio.Future, error: Optional[Exception] = None
+    ) -> None:
+        """Signal music is over, if not yet signalled."""
+        if error:
+            self._logger.warning("Music playback failed", exc_info=error)
+        if not music_over.done():
+            music_over.set_result(None)
+
+    def stop_music(self) -> None:
+        """Stop currently playing music, releasing its waiting submission."""
+        if self.voice_client:
+            self.voice_client.stop()
+        if self.__music_over:
+            self.__end_music(self.__music_over)
+
     async def join(self, ctx: Dctx):
         """Join a channel defined in discord context."""
         await self._state.join(ctx)
@@ -1 +1,7 @@
-from .player import Player  # noqa
+def __getattr__(name: str):
+    # player loads discord, which processes without voice, such as workers, avoid
+    if name == "Player":
+        from .player import Player
+
+        return Player
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class AudioInfo:
+    """Resolved audio stream and its format.
+
+    Attributes
+    ----------
+    url : str
+        Audio stream url.
+    codec : Optional[str]
+        Audio codec, such as opus or mp4a.
+    container : Optional[str]
+        Stream container format, such as webm or m4a.
+    bitrate : Optional[float]
+        Audio bitrate in kbit/s.
+    duration : Optional[float]
+        Audio duration in seconds.
+    """
+
+    url: str
+    codec: Optional[str] = None
+    container: Optional[str] = None
+    bitrate: Optional[float] = None
+    duration: Optional[float] = None
+
+    @staticmethod
+    def from_info(info: Dict[str, Any]) -> Optional["AudioInfo"]:
+        """Build from the information yt-dlp extracted for the chosen format."""
+        url = info.get("url")
+        if not url:
+            return None
+        codec = info.get("acodec")
+        return AudioInfo(
+            url=url,
+            codec=codec.split(".")[0] if codec and codec != "none" else None,
+            container=info.get("ext"),
+            bitrate=info.get("abr") or info.get("tbr"),
+            duration=info.get("duration"),
+        )
@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    """Cache usage counters."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class ExpiringLRUCache(Generic[V]):
+    """Bounded least recently used cache whose entries expire.
+
+    Every entry carries its own absolute expiry time. Expired entries are dropped
+    when looked up, while the least recently used entry is evicted whenever the
+    cache is full.
+
+    Attributes
+    ----------
+    max_size : int
+        Maximum number of stored entries.
+    """
+
+    max_size: int
+    __clock: Callable[[], float]
+    __entries: OrderedDict[Hashable, Tuple[V, float]]
+    __lock: threading.Lock
+    __stats: CacheStats
+
+    def __init__(self, max_size: int, clock: Callable[[], float] = time.time) -> None:
+        self.max_size = max_size
+        self.__clock = clock
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__stats = CacheStats()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Get a non expired value, marking it as recently used."""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__stats.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= self.__clock():
+                del self.__entries[key]
+                self.__stats.expirations += 1
+                self.__stats.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__stats.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, expires_at: float) -> None:
+        """Store value until expiry time, evicting least recently used if full.
+
+        Parameters
+        ----------
+        key : Hashable
+            Entry key.
+        value : V
+            Value to store.
+        expires_at : float
+            Time, as provided by the cache clock, after which value is invalid.
+        """
+        if expires_at <= self.__clock():
+            return
+        with self.__lock:
+            self.__entries[key] = (value, expires_at)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.__stats.evictions += 1
+
+    def remove(self, key: Hashable) -> None:
+        """Drop entry, if present."""
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self) -> int:
+        """Count stored entries, including not yet dropped expired ones."""
+        return len(self.__entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Provide usage counters and current size."""
+        with self.__lock:
+            return {**asdict(self.__stats), "size": len(self.__entries)}
@@ -0,0 +1,107 @@
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import multiprocessing
+import os
+from enum import StrEnum
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ExecutionMode(StrEnum):
+    """Where blocking extraction work is executed."""
+
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class ExtractionExecutor:
+    """Run blocking extraction work away from the asyncio event loop.
+
+    Extraction calls, such as the ones performed by yt-dlp, are CPU heavy and
+    blocking. Depending on :attr:`mode` they are executed in a pool of threads,
+    a pool of processes or directly on the caller, in which case the event loop
+    is blocked. Every worker runs :attr:`initializer` once when started, so it
+    can be warmed up before receiving work.
+
+    Attributes
+    ----------
+    mode : ExecutionMode
+        Execution strategy.
+    workers : int
+        Number of pool workers, uses available CPU count if not positive.
+    initializer : Optional[Callable[[], None]]
+        Worker warm-up callable, must be picklable in process mode.
+    """
+
+    mode: ExecutionMode
+    workers: int
+    initializer: Optional[Callable[[], None]]
+    start_method: str
+    _logger: logging.Logger
+    __pool: Optional[concurrent.futures.Executor]
+
+    def __init__(
+        self,
+        mode: str,
+        workers: int,
+        initializer: Optional[Callable[[], None]] = None,
+        start_method: str = "spawn",
+    ) -> None:
+        self._logger = logging.getLogger(__name__)
+        self.mode = ExecutionMode(mode)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.initializer = initializer
+        self.start_method = start_method
+        self.__pool = None
+
+    def __build_pool(self) -> Optional[concurrent.futures.Executor]:
+        self._logger.info(
+            "Starting %s extraction executor with %s workers", self.mode, self.workers
+        )
+        if self.mode == ExecutionMode.PROCESS:
+            return concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=self.initializer,
+            )
+        if self.mode == ExecutionMode.THREAD:
+            return concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="extractor",
+                initializer=self.initializer,
+            )
+        return None
+
+    async def run(self, function: Callable[..., T], *args) -> T:
+        """Execute function according to execution mode.
+
+        Parameters
+        ----------
+        function : Callable[..., T]
+            Blocking callable, must be picklable in process mode.
+        *args
+            Function positional arguments.
+
+        Returns
+        -------
+        T
+            Function result.
+        """
+        if self.mode == ExecutionMode.INLINE:
+            return function(*args)
+        if self.__pool is None:
+            self.__pool = self.__build_pool()
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__pool, functools.partial(function, *args)
+        )
+
+    def shutdown(self) -> None:
+        """Stop pool workers, cancelling pending work."""
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=False, cancel_futures=True)
+            self.__pool = None
+            self._logger.info("Stopped %s extraction executor", self.mode)
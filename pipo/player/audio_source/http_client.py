@@ -0,0 +1,104 @@
+import asyncio
+import importlib.util
+import logging
+from typing import Optional, Set
+
+import httpx
+
+from pipo.config import settings
+
+
+class HttpClient:
+    """Process wide pooled asynchronous HTTP client.
+
+    Keeps a single :class:`httpx.AsyncClient` whose connection pool is shared by
+    every request, so consecutive requests to the same host reuse established
+    connections instead of performing new TCP and TLS handshakes. The client is
+    bound to the event loop it was opened in, being closed and reopened if used from
+    another. Requests not stating their own :class:`httpx.Timeout` use the client
+    default one.
+    """
+
+    _client: Optional[httpx.AsyncClient] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _closing: Set[asyncio.Future] = set()
+
+    @staticmethod
+    def __http2() -> bool:
+        """Whether HTTP/2 is requested and supported."""
+        if not settings.player.url_fetch.client.http2:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            logging.getLogger(__name__).warning(
+                "HTTP/2 unavailable, install 'httpx[http2]' to enable it"
+            )
+            return False
+        return True
+
+    @classmethod
+    def open(cls) -> httpx.AsyncClient:
+        """Open shared client, configured with connection limits from settings.
+
+        Returns
+        -------
+        httpx.AsyncClient
+            Shared client.
+        """
+        config = settings.player.url_fetch.client
+        cls._client = httpx.AsyncClient(
+            http2=cls.__http2(),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(config.timeout),
+        )
+        cls._loop = asyncio.get_running_loop()
+        logging.getLogger(__name__).info("Opened shared HTTP client")
+        return cls._client
+
+    @classmethod
+    def get(cls) -> httpx.AsyncClient:
+        """Provide shared client, opening it if not yet available."""
+        if cls._client is None or cls._client.is_closed:
+            return cls.open()
+        if cls._loop is not asyncio.get_running_loop():
+            cls.__discard(cls._client, cls._loop)
+            return cls.open()
+        return cls._client
+
+    @classmethod
+    def __discard(
+        cls, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        """Close client opened in another event loop, releasing its connections.
+
+        Client is closed by the event loop it was opened in while such loop runs,
+        otherwise by the running one.
+        """
+        if loop.is_running():
+            closing = asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            )
+        else:
+            closing = asyncio.ensure_future(client.aclose())
+        cls._closing.add(closing)
+        closing.add_done_callback(cls.__closed)
+
+    @classmethod
+    def __closed(cls, closing: asyncio.Future) -> None:
+        """Forget discarded client closing, logging its failure."""
+        cls._closing.discard(closing)
+        if not closing.cancelled() and closing.exception():
+            logging.getLogger(__name__).debug(
+                "Unable to close discarded HTTP client", exc_info=closing.exception()
+            )
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close shared client and its pooled connections."""
+        if cls._client is not None:
+            client, cls._client, cls._loop = cls._client, None, None
+            await client.aclose()
+            logging.getLogger(__name__).info("Closed shared HTTP client")
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Callable, Dict, Optional, Tuple
+
+from pipo.player.audio_source.expiring_cache import ExpiringLRUCache
+
+
+class QueryCache:
+    """Two tier cache mapping search queries to youtube video ids.
+
+    An in memory least recently used tier is checked first, falling back to an
+    on disk SQLite store which outlives the process. Queries are normalised before
+    lookup so trivially different spellings share the same entry, while every
+    entry expires after :attr:`ttl` seconds.
+
+    Attributes
+    ----------
+    path : str
+        SQLite database location, disk tier is disabled if empty.
+    ttl : float
+        Seconds an entry remains valid.
+    """
+
+    path: str
+    ttl: float
+    _logger: logging.Logger
+    __clock: Callable[[], float]
+    __memory: ExpiringLRUCache[str]
+    __connection: Optional[sqlite3.Connection]
+    __lock: threading.Lock
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._logger = logging.getLogger(__name__)
+        self.path = os.path.expanduser(path) if path else ""
+        self.ttl = ttl
+        self.__clock = clock
+        self.__memory = ExpiringLRUCache(size, clock=clock)
+        self.__connection = None
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalise query case, punctuation and whitespace."""
+        query = unicodedata.normalize("NFKC", query).casefold()
+        query = "".join(
+            " " if unicodedata.category(char).startswith("P") else char
+            for char in query
+        )
+        return re.sub(r"\s+", " ", query).strip()
+
+    def __database(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.__connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                "query TEXT PRIMARY KEY, "
+                "video_id TEXT NOT NULL, "
+                "expires_at REAL NOT NULL)"
+            )
+            self.__connection.execute(
+                "DELETE FROM queries WHERE expires_at <= ?", (self.__clock(),)
+            )
+            self.__connection.commit()
+            self._logger.info("Opened query cache store '%s'", self.path)
+        return self.__connection
+
+    def __load(self, key: str) -> Optional[Tuple[str, float]]:
+        with self.__lock:
+            return (
+                self.__database()
+                .execute(
+                    "SELECT video_id, expires_at FROM queries "
+                    "WHERE query = ? AND expires_at > ?",
+                    (key, self.__clock()),
+                )
+                .fetchone()
+            )
+
+    def __store(self, key: str, video_id: str, expires_at: float) -> None:
+        with self.__lock:
+            database = self.__database()
+            database.execute(
+                "INSERT OR REPLACE INTO queries (query, video_id, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, video_id, expires_at),
+            )
+            database.commit()
+
+    async def get(self, query: str) -> Optional[str]:
+        """Get video id previously associated with query.
+
+        Parameters
+        ----------
+        query : str
+            Search query, normalised before lookup.
+
+        Returns
+        -------
+        Optional[str]
+            Video id, None if unknown or expired.
+        """
+        key = self.normalize(query)
+        video_id = self.__memory.get(key)
+        if video_id is None and self.path:
+            try:
+                row = await asyncio.to_thread(self.__load, key)
+            except sqlite3.Error:
+                self._logger.warning("Unable to read query cache", exc_info=True)
+                row = None
+            if row:
+                video_id, expires_at = row
+                self.__memory.set(key, video_id, expires_at)
+        return video_id
+
+    async def set(self, query: str, video_id: str) -> None:
+        """Associate video id with query for :attr:`ttl` seconds."""
+        key = self.normalize(query)
+        expires_at = self.__clock() + self.ttl
+        self.__memory.set(key, video_id, expires_at)
+        if self.path:
+            try:
+                await asyncio.to_thread(self.__store, key, video_id, expires_at)
+            except sqlite3.Error:
+                self._logger.warning("Unable to write query cache", exc_info=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Provide in memory tier usage counters."""
+        return self.__memory.stats()
+
+    def close(self) -> None:
+        """Close disk tier connection."""
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
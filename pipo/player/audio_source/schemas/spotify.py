@@ -10,11 +10,19 @@ class SpotifyArtist(BaseModel):
     name: str
 
 
+class SpotifyExternalIds(BaseModel):
+    """Spotify external identifiers."""
+
+    isrc: Optional[str] = None
+
+
 class SpotifyTrack(BaseModel):
     """Spotify Track, composed by name and artists."""
 
+    id: Optional[str] = None
     name: str
     artists: Optional[List[SpotifyArtist]]
+    external_ids: Optional[SpotifyExternalIds] = None
 
 
 def __get_track(v: Any) -> SpotifyTrack:
@@ -23,18 +31,20 @@ def __get_track(v: Any) -> SpotifyTrack:
 
 
 CustomTrack = Annotated[
-    Dict[str, SpotifyTrack],
+    Dict[str, Optional[SpotifyTrack]],
     AfterValidator(__get_track),
 ]
 
 
 class SpotifyPlaylist(BaseModel):
-    """Spotify Playlist."""
+    """Spotify Playlist page, along with total number of playlist items."""
 
-    items: List[CustomTrack]
+    items: List[Optional[CustomTrack]]
+    total: int = 0
 
 
 class SpotifyAlbum(BaseModel):
-    """Spotify Album."""
+    """Spotify Album page, along with total number of album tracks."""
 
     items: List[SpotifyTrack]
+    total: int = 0
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent executions sharing the same key.
+
+    While a call for a given key is in flight, further calls for such key await
+    its result instead of starting their own execution. The shared execution
+    runs in its own task, so cancelling any of the callers does not affect the
+    remaining ones.
+
+    Attributes
+    ----------
+    name : str
+        Identifies coalesced operation in logs.
+    saved : int
+        Number of executions avoided by awaiting an in flight one.
+    """
+
+    name: str
+    saved: int
+    __flights: Dict[Hashable, asyncio.Task]
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.saved = 0
+        self.__flights = {}
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """Execute function, unless an execution for key is already in flight.
+
+        Parameters
+        ----------
+        key : Hashable
+            Execution identifier.
+        function : Callable[[], Awaitable[T]]
+            Provides awaitable to execute if none is in flight for key.
+
+        Returns
+        -------
+        T
+            Result of the in flight execution for key.
+        """
+        flight = self.__flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(function())
+            self.__flights[key] = flight
+            flight.add_done_callback(lambda _: self.__land(key, flight))
+        else:
+            self.saved += 1
+            logging.getLogger(__name__).debug(
+                "Joined in flight %s execution: %s", self.name, key
+            )
+        return await asyncio.shield(flight)
+
+    def __land(self, key: Hashable, flight: asyncio.Task) -> None:
+        """Forget completed execution."""
+        if self.__flights.get(key) is flight:
+            del self.__flights[key]
+
+    def in_flight(self) -> int:
+        """Count executions currently in flight."""
+        return len(self.__flights)
+
+    def stats(self) -> Dict[str, int]:
+        """Provide usage counters."""
+        return {"saved": self.saved, "in_flight": self.in_flight()}
@@ -1,10 +1,16 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
 class SourcePair:
-    """Keeps track of a query and its source handler."""
+    """Keeps track of a query and its source handler.
+
+    Queries derived from a provider track also keep such track identifiers.
+    """
 
     query: str
     handler_type: str
     operation: str = "url"  # TODO define operation types
+    track_id: Optional[str] = None
+    isrc: Optional[str] = None
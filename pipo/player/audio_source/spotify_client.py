@@ -0,0 +1,478 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from pipo.config import settings
+from pipo.player.audio_source.http_client import HttpClient
+from pipo.player.audio_source.schemas.spotify import (
+    SpotifyAlbum,
+    SpotifyPlaylist,
+    SpotifyTrack,
+)
+
+
+class SpotifyError(Exception):
+    """Spotify Web API request failed.
+
+    Attributes
+    ----------
+    status_code : Optional[int]
+        Response status code, None if no response was obtained.
+    """
+
+    status_code: Optional[int]
+
+    def __init__(
+        self, status_code: Optional[int] = None, message: str = "Spotify request failed"
+    ) -> None:
+        super().__init__(f"{message} ({status_code})" if status_code else message)
+        self.status_code = status_code
+
+
+class SpotifyAuthError(SpotifyError):
+    """Spotify access token could not be obtained."""
+
+    def __init__(
+        self,
+        status_code: Optional[int] = None,
+        message: str = "Unable to obtain Spotify access token, "
+        "confirm API credentials are correct",
+    ) -> None:
+        super().__init__(status_code, message)
+
+
+class SpotifyCredentialsError(SpotifyAuthError):
+    """Spotify API credentials are not configured."""
+
+    def __init__(self) -> None:
+        super().__init__(message="Spotify API credentials are not set")
+
+
+class SpotifyIdError(SpotifyError):
+    """Query does not identify a Spotify resource."""
+
+    def __init__(self, kind: str, query: str) -> None:
+        super().__init__(message=f"Unable to find spotify {kind} id in '{query}'")
+
+
+class RateGovernor:
+    """Shared request pacing for a rate limited API.
+
+    Once the API asks clients to back off, every request waits until the
+    requested delay elapses, instead of only the one which was rejected.
+
+    Attributes
+    ----------
+    deferrals : int
+        Number of times requests were asked to back off.
+    """
+
+    deferrals: int
+    __clock: Callable[[], float]
+    __resume_at: float
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.deferrals = 0
+        self.__clock = clock
+        self.__resume_at = 0
+
+    def delay(self) -> float:
+        """Seconds requests should still wait before being sent."""
+        return max(self.__resume_at - self.__clock(), 0)
+
+    async def wait(self) -> None:
+        """Wait until requests are allowed."""
+        # deferral may be extended while waiting
+        while (delay := self.delay()) > 0:  # noqa: ASYNC110
+            await asyncio.sleep(delay)
+
+    def defer(self, delay: float) -> None:
+        """Hold every request for, at least, delay seconds."""
+        self.deferrals += 1
+        self.__resume_at = max(self.__resume_at, self.__clock() + delay)
+
+
+class TokenCache:
+    """Access token kept in memory."""
+
+    __token: Optional[Dict[str, Any]]
+
+    def __init__(self) -> None:
+        self.__token = None
+
+    def get_cached_token(self) -> Optional[Dict[str, Any]]:
+        """Provide cached token, None if there is none."""
+        return self.__token
+
+    def save_token_to_cache(self, token: Dict[str, Any]) -> None:
+        """Replace cached token."""
+        self.__token = token
+
+
+class FileTokenCache(TokenCache):
+    """Access token kept in a JSON file, shared by processes using the same path.
+
+    Files written by spotipy cache handlers, formerly used, are read as well.
+
+    Attributes
+    ----------
+    path : str
+        Token file path.
+    """
+
+    path: str
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+
+    def get_cached_token(self) -> Optional[Dict[str, Any]]:
+        """Provide token stored in file, None if unavailable."""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logging.getLogger(__name__).warning(
+                "Unable to read Spotify token cache '%s'", self.path, exc_info=True
+            )
+            return None
+
+    def save_token_to_cache(self, token: Dict[str, Any]) -> None:
+        """Replace token stored in file, readers never seeing a partial write."""
+        partial = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(partial, "w", encoding="utf-8") as file:
+                json.dump(token, file)
+            os.replace(partial, self.path)
+        except OSError:
+            logging.getLogger(__name__).warning(
+                "Unable to write Spotify token cache '%s'", self.path, exc_info=True
+            )
+
+
+class SpotifyClient:
+    """Process wide asyncio Spotify Web API client.
+
+    Requests are sent through the shared :class:`~HttpClient` connection pool, while
+    responses are decoded straight into Spotify schemas. Requests rejected due to
+    rate limiting are retried after the delay stated by Spotify, every other
+    request waiting for such delay as well. The client credentials token is reused
+    by every request, a background task refreshing it shortly before it expires.
+    Tokens are kept in memory, or in a file shared by every process configured
+    with the same path. The client is bound to the event loop it was opened in,
+    being reopened if used from another.
+    """
+
+    _governor: RateGovernor = RateGovernor()
+    _cache: Optional[TokenCache] = None
+    _token_lock: Optional[asyncio.Lock] = None
+    _refresher: Optional[asyncio.Task] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def __token_cache() -> TokenCache:
+        """Provide token cache, file based if a cache path is set."""
+        path = settings.player.source.spotify.token.cache_path
+        if path:
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            return FileTokenCache(path)
+        return TokenCache()
+
+    @classmethod
+    def open(cls) -> None:
+        """Open shared client and start refreshing its token in background."""
+        cls.__stop_refresh()
+        cls._cache = cls.__token_cache()
+        cls._token_lock = asyncio.Lock()
+        cls._loop = asyncio.get_running_loop()
+        cls._refresher = asyncio.create_task(
+            cls.__refresh(), name=settings.player.source.spotify.token.task_name
+        )
+        logging.getLogger(__name__).info("Opened shared Spotify client")
+
+    @classmethod
+    def __ensure_open(cls) -> None:
+        """Open shared client, if not yet available for running event loop."""
+        if cls._cache is None or cls._loop is not asyncio.get_running_loop():
+            cls.open()
+
+    @staticmethod
+    def token_ttl(cache: TokenCache) -> float:
+        """Seconds until cached token should be refreshed, zero if already due."""
+        token = cache.get_cached_token()
+        if not token:
+            return 0
+        margin = settings.player.source.spotify.token.refresh_margin
+        return max(token["expires_at"] - margin - time.time(), 0)
+
+    @classmethod
+    async def __request_token(cls) -> Dict[str, Any]:
+        """Exchange client credentials for a new access token, caching it."""
+        client, secret = settings.get("spotify_client"), settings.get("spotify_secret")
+        if not client or not secret:
+            raise SpotifyCredentialsError
+        try:
+            response = await HttpClient.get().post(
+                settings.player.source.spotify.api.token_url,
+                data={"grant_type": "client_credentials"},
+                auth=(client, secret),
+                timeout=httpx.Timeout(settings.player.source.spotify.api.timeout),
+            )
+        except httpx.HTTPError as error:
+            raise SpotifyAuthError from error
+        if response.is_error:
+            raise SpotifyAuthError(response.status_code)
+        token = response.json()
+        token["expires_at"] = int(time.time()) + token["expires_in"]
+        cls._cache.save_token_to_cache(token)
+        logging.getLogger(__name__).debug("Obtained Spotify token")
+        return token
+
+    @classmethod
+    async def access_token(
+        cls, margin: float = 60, rejected: Optional[str] = None
+    ) -> str:
+        """Provide a valid access token, requesting a new one if needed.
+
+        Requests whose token was rejected at the same time renew it only once, the
+        others reusing the token which replaced it.
+
+        Parameters
+        ----------
+        margin : float, optional
+            Seconds before expiry from which cached token is replaced, by default 60.
+        rejected : Optional[str], optional
+            Token rejected by the API, replaced even if it did not expire, unless
+            already replaced. By default None.
+
+        Returns
+        -------
+        str
+            Access token.
+        """
+        cls.__ensure_open()
+        async with cls._token_lock:
+            token = cls._cache.get_cached_token()
+            if (
+                not token
+                or token["access_token"] == rejected
+                or token["expires_at"] - margin < time.time()
+            ):
+                token = await cls.__request_token()
+        return token["access_token"]
+
+    @staticmethod
+    def refresh_retry_delay(failures: int) -> float:
+        """Seconds to wait before retrying, doubled after each consecutive failure.
+
+        Parameters
+        ----------
+        failures : int
+            Consecutive failed refreshes, at least one.
+
+        Returns
+        -------
+        float
+            Delay, capped by ``max_retry_delay`` setting.
+        """
+        config = settings.player.source.spotify.token
+        return min(config.retry_delay * 2 ** (failures - 1), config.max_retry_delay)
+
+    @classmethod
+    async def __refresh(cls) -> None:
+        """Refresh token whenever it is about to expire.
+
+        Tokens refreshed by other processes sharing the token cache file are
+        picked up instead of requesting a new one. Failed refreshes back off
+        exponentially, only the first of consecutive failures being warned about.
+        """
+        config = settings.player.source.spotify.token
+        logger = logging.getLogger(__name__)
+        failures = 0
+        while True:
+            try:
+                await cls.access_token(margin=config.refresh_margin)
+                delay = cls.token_ttl(cls._cache) or config.retry_delay
+                failures = 0
+            except SpotifyCredentialsError:
+                if not failures:
+                    logger.warning("Spotify credentials not set, token not refreshed")
+                failures += 1
+                delay = cls.refresh_retry_delay(failures)
+            except SpotifyError:
+                logger.log(
+                    logging.DEBUG if failures else logging.WARNING,
+                    "Unable to refresh Spotify token",
+                    exc_info=True,
+                )
+                failures += 1
+                delay = cls.refresh_retry_delay(failures)
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def __retry_after(response: httpx.Response) -> float:
+        """Seconds to wait before retrying a rate limited request."""
+        config = settings.player.source.spotify.api
+        try:
+            delay = float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            delay = config.retry_delay
+        return min(max(delay, 0), config.max_retry_after)
+
+    @classmethod
+    async def __request(cls, path: str, params: Dict[str, Any]) -> bytes:
+        """Send request to Spotify Web API, retrying if rate limited or unauthorized.
+
+        Parameters
+        ----------
+        path : str
+            Endpoint path, relative to API base url.
+        params : Dict[str, Any]
+            Query parameters.
+
+        Returns
+        -------
+        bytes
+            Response body.
+
+        Raises
+        ------
+        SpotifyError
+            Request failed.
+        """
+        config = settings.player.source.spotify.api
+        rejected = None
+        for _ in range(config.retries + 1):
+            await cls._governor.wait()
+            token = await cls.access_token(rejected=rejected)
+            try:
+                response = await HttpClient.get().get(
+                    f"{config.base_url}/{path}",
+                    params=params,
+                    headers={"Authorization": f"Bearer {token}"},
+                    timeout=httpx.Timeout(config.timeout),
+                )
+            except httpx.HTTPError as error:
+                raise SpotifyError from error
+            unauthorized = response.status_code == httpx.codes.UNAUTHORIZED
+            rejected = token if unauthorized else None
+            if response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+                delay = cls.__retry_after(response)
+                logging.getLogger(__name__).warning(
+                    "Spotify rate limit reached, retrying in %s seconds", delay
+                )
+                cls._governor.defer(delay)
+            elif not unauthorized:
+                break
+        if response.is_error:
+            raise SpotifyError(response.status_code)
+        return response.content
+
+    @staticmethod
+    def resource_id(kind: str, query: str) -> str:
+        """Obtain Spotify id from an url, uri or id.
+
+        Parameters
+        ----------
+        kind : str
+            Resource type, such as track, album or playlist.
+        query : str
+            Spotify url, uri or id.
+
+        Returns
+        -------
+        str
+            Resource id.
+
+        Raises
+        ------
+        SpotifyIdError
+            Query does not identify a resource of given type.
+        """
+        match = re.fullmatch(r"[0-9A-Za-z]{22}", query) or re.search(
+            rf"{kind}[/:]([0-9A-Za-z]{{22}})", query
+        )
+        if not match:
+            raise SpotifyIdError(kind, query)
+        return match.group(match.lastindex or 0)
+
+    @classmethod
+    async def track(cls, query: str) -> SpotifyTrack:
+        """Get track by url, uri or id."""
+        track_id = cls.resource_id("track", query)
+        return SpotifyTrack.model_validate_json(
+            await cls.__request(f"tracks/{track_id}", {})
+        )
+
+    @classmethod
+    async def album_tracks(
+        cls, query: str, limit: int, offset: int = 0
+    ) -> SpotifyAlbum:
+        """Get page of album tracks by album url, uri or id."""
+        album_id = cls.resource_id("album", query)
+        return SpotifyAlbum.model_validate_json(
+            await cls.__request(
+                f"albums/{album_id}/tracks", {"limit": limit, "offset": offset}
+            )
+        )
+
+    @classmethod
+    async def playlist_items(
+        cls, query: str, fields: str, limit: int, offset: int = 0
+    ) -> SpotifyPlaylist:
+        """Get page of playlist tracks by playlist url, uri or id.
+
+        Parameters
+        ----------
+        query : str
+            Playlist url, uri or id.
+        fields : str
+            Comma separated fields to obtain.
+        limit : int
+            Page size.
+        offset : int, optional
+            Index of first item, by default 0.
+
+        Returns
+        -------
+        SpotifyPlaylist
+            Playlist page.
+        """
+        playlist_id = cls.resource_id("playlist", query)
+        return SpotifyPlaylist.model_validate_json(
+            await cls.__request(
+                f"playlists/{playlist_id}/tracks",
+                {
+                    "fields": fields,
+                    "limit": limit,
+                    "offset": offset,
+                    "additional_types": "track",
+                },
+            )
+        )
+
+    @classmethod
+    def __stop_refresh(cls) -> None:
+        """Cancel background token refresh."""
+        if cls._refresher is not None:
+            cls._refresher.cancel()
+            cls._refresher = None
+
+    @classmethod
+    async def close(cls) -> None:
+        """Stop token refresh and release shared client."""
+        refresher = cls._refresher
+        cls.__stop_refresh()
+        cls._cache, cls._token_lock, cls._loop = None, None, None
+        if refresher is not None and refresher.get_loop() is asyncio.get_running_loop():
+            await asyncio.gather(refresher, return_exceptions=True)
+        logging.getLogger(__name__).info("Closed shared Spotify client")
@@ -1,20 +1,29 @@
 import asyncio
+import functools
 from enum import StrEnum
 import logging
 import random
-from typing import Iterable, Iterator, List
-
-import spotipy
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
 from pipo.config import settings
 from pipo.player.audio_source.base_handler import BaseHandler
-from pipo.player.audio_source.schemas.spotify import (
-    SpotifyAlbum,
-    SpotifyPlaylist,
-    SpotifyTrack,
-)
+from pipo.player.audio_source.schemas.spotify import SpotifyTrack
 from pipo.player.audio_source.source_pair import SourcePair
+from pipo.player.audio_source.spotify_client import (
+    SpotifyAuthError,
+    SpotifyClient,
+    SpotifyError,
+)
 from pipo.player.audio_source.source_type import SourceType
+from pipo.player.audio_source.track_mapping import TrackMapping
 from pipo.player.audio_source.youtube_handler import YoutubeQueryHandler
 
 
@@ -28,12 +37,23 @@ class SpotifyHandler(BaseHandler):
     """Handles spotify url music."""
 
     name = SourceType.SPOTIFY
+    _track_mapping: Optional[TrackMapping] = None
 
     @staticmethod
     def __valid_source(source: Iterable[str]) -> bool:
         """Check whether source is a spotify url."""
         return source and ("spotify" in source) and SpotifyHandler.is_url(source)
 
+    @classmethod
+    def track_mapping(cls) -> TrackMapping:
+        """Provide process wide mapping of tracks to youtube video ids."""
+        if cls._track_mapping is None:
+            config = settings.player.source.spotify.track_mapping
+            cls._track_mapping = TrackMapping(
+                config.path, size=config.size, ttl=config.ttl
+            )
+        return cls._track_mapping
+
     def handle(self, source: str) -> SourcePair:
         if self.__valid_source(source):
             logging.getLogger(__name__).info(
@@ -53,87 +73,178 @@ class SpotifyHandler(BaseHandler):
         return SourcePair(
             query=entry,
             handler_type=YoutubeQueryHandler.name,
+            track_id=track.id,
+            isrc=track.external_ids.isrc if track.external_ids else None,
         )
 
     @staticmethod
-    def _get_playlist(
-        client: spotipy.Spotify, query: str, fields: Iterable[str], limit: int
-    ) -> List[SpotifyTrack]:
-        tracks = client.playlist_items(
+    async def _get_playlist(
+        query: str, fields: str, limit: int, offset: int = 0
+    ) -> Tuple[List[SpotifyTrack], int]:
+        playlist = await SpotifyClient.playlist_items(
             query,
             fields=fields,
             limit=limit,
-            additional_types="track",
+            offset=offset,
         )
-        return SpotifyPlaylist(**tracks).items
+        # unavailable items, such as local files, carry no track
+        return [track for track in playlist.items if track], playlist.total
 
     @staticmethod
-    def _get_album(
-        client: spotipy.Spotify, query: str, limit: int
-    ) -> List[SpotifyTrack]:
-        tracks = client.album_tracks(
+    async def _get_album(
+        query: str, limit: int, offset: int = 0
+    ) -> Tuple[List[SpotifyTrack], int]:
+        album = await SpotifyClient.album_tracks(
             query,
             limit=limit,
+            offset=offset,
         )
-        return SpotifyAlbum(**tracks).items
+        return album.items, album.total
 
     @staticmethod
-    def _get_track(client: spotipy.Spotify, query: str) -> List[SpotifyTrack]:
-        track = client.track(
-            query,
-        )
-        return [SpotifyTrack(**track)]
+    async def _get_track(query: str) -> List[SpotifyTrack]:
+        return [await SpotifyClient.track(query)]
 
     @staticmethod
-    async def tracks_from_query(
-        query: str, shuffle: bool = False
-    ) -> Iterable[SourcePair]:
-        """
-        TODO
-
-        asyncio.to_thread is used to avoid blocking asyncio event loop, considering Spotipy
-        library is not CPU nor asyncio friendly.
+    async def _paginate(
+        get_page: Callable[[int], Awaitable[Tuple[List[SpotifyTrack], int]]],
+        limit: int,
+    ) -> AsyncIterator[List[SpotifyTrack]]:
+        """Fetch every page of a paginated resource.
+
+        The first page reveals how many items are available, the remaining pages
+        being then fetched concurrently, at most
+        ``settings.player.source.spotify.pagination.workers`` at a time. Pages are
+        yielded in order, each as soon as it and every preceding page arrived.
+
+        Parameters
+        ----------
+        get_page : Callable[[int], Awaitable[Tuple[List[SpotifyTrack], int]]]
+            Fetches page starting at given offset, providing its tracks and the
+            total number of items.
+        limit : int
+            Page size.
+
+        Yields
+        ------
+        List[SpotifyTrack]
+            Page tracks.
         """
-        tracks = []
-        try:
-            spotify = spotipy.Spotify(
-                client_credentials_manager=spotipy.SpotifyClientCredentials(
-                    client_id=settings.spotify_client,
-                    client_secret=settings.spotify_secret,
-                )
+        tracks, total = await get_page(0)
+        yield tracks
+        workers = asyncio.Semaphore(settings.player.source.spotify.pagination.workers)
+
+        async def fetch(offset: int) -> List[SpotifyTrack]:
+            async with workers:
+                return (await get_page(offset))[0]
+
+        pages = [
+            asyncio.ensure_future(fetch(offset))
+            for offset in range(limit, total, limit)
+        ]
+        if pages:
+            logging.getLogger(__name__).debug(
+                "Fetching %s remaining spotify pages", len(pages)
             )
-            if "playlist" in query:
-                logging.getLogger(__name__).info(
-                    "Processing spotify playlist '%s'", query
-                )
-                task = asyncio.to_thread(
+        try:
+            for page in pages:
+                yield await page
+        finally:
+            for page in pages:
+                page.cancel()
+
+    @staticmethod
+    async def __tracks(query: str) -> AsyncIterator[List[SpotifyTrack]]:
+        """Fetch query tracks, page by page."""
+        if "playlist" in query:
+            logging.getLogger(__name__).info("Processing spotify playlist '%s'", query)
+            limit = settings.player.source.spotify.playlist.limit
+            pages = SpotifyHandler._paginate(
+                functools.partial(
                     SpotifyHandler._get_playlist,
-                    spotify,
-                    query,
-                    [settings.player.source.spotify.playlist.filter],
-                    settings.player.source.spotify.playlist.limit,
-                )
-            elif "album" in query:
-                logging.getLogger(__name__).info("Processing spotify album '%s'", query)
-                task = asyncio.to_thread(
-                    SpotifyHandler._get_album,
-                    spotify,
                     query,
-                    settings.player.source.spotify.album.limit,
-                )
-            else:
-                logging.getLogger(__name__).info("Processing spotify track '%s'", query)
-                task = asyncio.to_thread(SpotifyHandler._get_track, spotify, query)
-            tracks = (await asyncio.gather(task))[0]
-        except spotipy.oauth2.SpotifyOauthError:
+                    settings.player.source.spotify.playlist.filter,
+                    limit,
+                ),
+                limit,
+            )
+        elif "album" in query:
+            logging.getLogger(__name__).info("Processing spotify album '%s'", query)
+            limit = settings.player.source.spotify.album.limit
+            pages = SpotifyHandler._paginate(
+                functools.partial(SpotifyHandler._get_album, query, limit),
+                limit,
+            )
+        else:
+            logging.getLogger(__name__).info("Processing spotify track '%s'", query)
+            yield await SpotifyHandler._get_track(query)
+            return
+        async for tracks in pages:
+            yield tracks
+
+    @staticmethod
+    async def pages_from_query(
+        query: str, shuffle: bool = False
+    ) -> AsyncIterator[List[SourcePair]]:
+        """Obtain youtube queries for every track of a spotify url, page by page.
+
+        Playlists and albums are fully paginated, each page being yielded as soon
+        as available so its tracks can be processed while later pages are still
+        being fetched. Shuffling requires every page, tracks being then yielded
+        as a single page.
+
+        Parameters
+        ----------
+        query : str
+            Spotify track, playlist or album url.
+        shuffle : bool, optional
+            Randomize tracks order, by default False.
+
+        Yields
+        ------
+        List[SourcePair]
+            Youtube queries of a page of tracks.
+        """
+        shuffled = []
+        try:
+            async for tracks in SpotifyHandler.__tracks(query):
+                if shuffle:
+                    shuffled.extend(tracks)
+                else:
+                    yield [SpotifyHandler.__format_query(track) for track in tracks]
+        except SpotifyAuthError:
             logging.getLogger(__name__).exception(
                 "Unable to access spotify API. \
                 Confirm API credentials are correct."
             )
-        except spotipy.exceptions.SpotifyException:
+        except SpotifyError:
             logging.getLogger(__name__).exception(
                 "Unable to process spotify query '%s'", query
             )
-        if shuffle:
-            random.shuffle(tracks)
-        return [SpotifyHandler.__format_query(track) for track in tracks]
+        if shuffled:
+            random.shuffle(shuffled)
+            yield [SpotifyHandler.__format_query(track) for track in shuffled]
+
+    @staticmethod
+    async def tracks_from_query(
+        query: str, shuffle: bool = False
+    ) -> Iterable[SourcePair]:
+        """Obtain youtube queries for every track of a spotify url.
+
+        Parameters
+        ----------
+        query : str
+            Spotify track, playlist or album url.
+        shuffle : bool, optional
+            Randomize tracks order, by default False.
+
+        Returns
+        -------
+        Iterable[SourcePair]
+            Youtube queries, one per track.
+        """
+        return [
+            track
+            async for tracks in SpotifyHandler.pages_from_query(query, shuffle)
+            for track in tracks
+        ]
@@ -0,0 +1,52 @@
+from typing import Optional
+
+from pipo.player.audio_source.query_cache import QueryCache
+
+
+class TrackMapping(QueryCache):
+    """Persistent mapping from Spotify tracks to youtube video ids.
+
+    Tracks are identified by their Spotify id and, when available, by their ISRC,
+    which is shared by every release of the same recording. Unlike search queries,
+    identifiers are stored as is, since they are case sensitive.
+    """
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Keep identifier unchanged."""
+        return query
+
+    @staticmethod
+    def __keys(track_id: Optional[str], isrc: Optional[str]) -> list[str]:
+        keys = [f"spotify:{track_id}"] if track_id else []
+        return [*keys, f"isrc:{isrc.upper()}"] if isrc else keys
+
+    async def video_id(
+        self, track_id: Optional[str], isrc: Optional[str] = None
+    ) -> Optional[str]:
+        """Get video id previously resolved for track.
+
+        Parameters
+        ----------
+        track_id : Optional[str]
+            Spotify track id, looked up first.
+        isrc : Optional[str], optional
+            Track International Standard Recording Code, by default None.
+
+        Returns
+        -------
+        Optional[str]
+            Video id, None if track was not resolved yet or mapping expired.
+        """
+        for key in self.__keys(track_id, isrc):
+            video_id = await self.get(key)
+            if video_id:
+                return video_id
+        return None
+
+    async def remember(
+        self, track_id: Optional[str], isrc: Optional[str], video_id: str
+    ) -> None:
+        """Associate video id with track id and ISRC."""
+        for key in self.__keys(track_id, isrc):
+            await self.set(key, video_id)
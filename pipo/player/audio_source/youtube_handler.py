@@ -1,6 +1,9 @@
 import logging
-from typing import Iterable, Iterator, Optional
+import os
+import time
+from typing import Iterable, Iterator, List, Optional
 from enum import StrEnum
+from urllib.parse import parse_qs, urlparse
 
 import re
 import httpx
@@ -9,9 +12,16 @@ from yt_dlp import YoutubeDL
 from requests.utils import requote_uri
 
 from pipo.config import settings
+from pipo.player.audio_source.audio_info import AudioInfo
 from pipo.player.audio_source.base_handler import BaseHandler
+from pipo.player.audio_source.expiring_cache import ExpiringLRUCache
+from pipo.player.audio_source.extraction_executor import ExtractionExecutor
+from pipo.player.audio_source.http_client import HttpClient
+from pipo.player.audio_source.query_cache import QueryCache
+from pipo.player.audio_source.single_flight import SingleFlight
 from pipo.player.audio_source.source_pair import SourcePair
 from pipo.player.audio_source.source_type import SourceType
+from pipo.player.audio_source.youtube_pool import YoutubeDLPool
 
 
 try:
@@ -34,12 +44,157 @@ class YoutubeHandler(BaseHandler):
     """Handles youtube url music."""
 
     name = SourceType.YOUTUBE
+    _extractors: Optional[YoutubeDLPool] = None
+    _extractors_pid: Optional[int] = None
+    _stream_cache: Optional[ExpiringLRUCache[AudioInfo]] = None
+    _extractions: SingleFlight[Optional[AudioInfo]] = SingleFlight("audio extraction")
 
     @staticmethod
     def __valid_source(source: Iterable[str]) -> bool:
         """Check whether source is a youtube url."""
         return source and ("youtube" in source) and YoutubeHandler.is_url(source)
 
+    @classmethod
+    def extractor_pool(cls) -> YoutubeDLPool:
+        """Provide process wide pool of audio extractors, built on first usage.
+
+        Forked processes build their own pool instead of sharing the parent one.
+        """
+        if cls._extractors is None or cls._extractors_pid != os.getpid():
+            config = settings.player.source.youtube.extractor_pool
+            cls._extractors = YoutubeDLPool(
+                settings.player.source.youtube.downloader_config,
+                size=config.size,
+                max_uses=config.max_uses,
+                lease_timeout=config.lease_timeout,
+            )
+            cls._extractors_pid = os.getpid()
+        return cls._extractors
+
+    @classmethod
+    def stream_cache(cls) -> ExpiringLRUCache[AudioInfo]:
+        """Provide process wide cache of resolved audio streams by video id."""
+        if cls._stream_cache is None:
+            cls._stream_cache = ExpiringLRUCache(
+                settings.player.source.youtube.stream_cache.size
+            )
+        return cls._stream_cache
+
+    @staticmethod
+    def video_id(url: str) -> Optional[str]:
+        """Obtain canonical video id from a youtube url.
+
+        Parameters
+        ----------
+        url : str
+            Youtube video url, in any of its watch, short link, shorts or embed forms.
+
+        Returns
+        -------
+        Optional[str]
+            Video id, None if url does not identify a single video.
+        """
+        try:
+            parsed = urlparse(url)
+        except ValueError:
+            return None
+        video_id = None
+        if parsed.netloc.endswith("youtu.be"):
+            video_id = parsed.path.lstrip("/").split("/")[0]
+        elif parsed.path == "/watch":
+            video_id = parse_qs(parsed.query).get("v", [None])[0]
+        elif parsed.path.startswith(("/shorts/", "/embed/", "/live/")):
+            video_id = parsed.path.split("/")[2]
+        if video_id and re.fullmatch(r"[\w-]{11}", video_id):
+            return video_id
+        return None
+
+    @staticmethod
+    def video_url(video_id: str) -> str:
+        """Build canonical youtube url of a video id."""
+        return f"https://www.youtube.com/watch?v={video_id}"
+
+    @staticmethod
+    def stream_expires_at(url: str) -> Optional[int]:
+        """Epoch at which a resolved audio url expires, None if not stated.
+
+        Googlevideo urls carry such epoch in their ``expire`` parameter.
+        """
+        expire = re.search(r"[?&/]expire[=/](\d+)", url)
+        return int(expire.group(1)) if expire else None
+
+    @staticmethod
+    def stream_expiry(url: str) -> float:
+        """Time after which a resolved audio url should no longer be used.
+
+        A safety margin is subtracted from the url expiry, so cached urls are not
+        handed out right before becoming invalid. Urls lacking their expiry use a
+        default time to live.
+        """
+        config = settings.player.source.youtube.stream_cache
+        expire = YoutubeHandler.stream_expires_at(url)
+        if expire is not None:
+            return expire - config.expiry_margin
+        return time.time() + config.default_ttl
+
+    @staticmethod
+    async def fetch_audio(
+        query: str, executor: ExtractionExecutor, valid_for: float = 0
+    ) -> Optional[AudioInfo]:
+        """Obtain a youtube audio stream, reusing still valid previous resolutions.
+
+        Resolved audio streams are cached by video id until shortly before they
+        expire. On cache miss :meth:`~YoutubeHandler.get_audio_info` is run by
+        executor, concurrent requests for the same video sharing a single
+        extraction.
+
+        Parameters
+        ----------
+        query : str
+            Youtube video url.
+        executor : ExtractionExecutor
+            Executor running extraction on cache miss.
+        valid_for : float, optional
+            Seconds a cached audio url must remain valid to be reused, by default
+            any not yet discarded by cache.
+
+        Returns
+        -------
+        Optional[AudioInfo]
+            Youtube audio stream or None if no audio url was found.
+        """
+        video_id = YoutubeHandler.video_id(query)
+        if video_id:
+            cache = YoutubeHandler.stream_cache()
+            audio = cache.get(video_id)
+            expire = audio and YoutubeHandler.stream_expires_at(audio.url)
+            if expire and expire < time.time() + valid_for:
+                cache.remove(video_id)
+            elif audio:
+                logging.getLogger(__name__).debug("Reusing audio url for %s", video_id)
+                return audio
+        return await YoutubeHandler._extractions.do(
+            video_id or query,
+            lambda: YoutubeHandler.__extract_audio(query, video_id, executor),
+        )
+
+    @staticmethod
+    async def __extract_audio(
+        query: str, video_id: Optional[str], executor: ExtractionExecutor
+    ) -> Optional[AudioInfo]:
+        """Run audio extraction, caching its result."""
+        audio = await executor.run(YoutubeHandler.get_audio_info, query)
+        if audio and video_id:
+            YoutubeHandler.stream_cache().set(
+                video_id, audio, YoutubeHandler.stream_expiry(audio.url)
+            )
+        return audio
+
+    @staticmethod
+    def warm_up() -> None:
+        """Prepare audio extractors ahead of first request."""
+        YoutubeHandler.extractor_pool().warm_up()
+
     def handle(self, source: str) -> SourcePair:
         if self.__valid_source(source):
             logging.getLogger(__name__).info(
@@ -77,12 +232,20 @@ class YoutubeHandler(BaseHandler):
                 "Unable to obtain information from youtube"
             )
 
+    @staticmethod
+    def get_playlist(url: str) -> List[str]:
+        """Obtain every music url of a youtube playlist.
+
+        Eagerly consumes :meth:`~YoutubeHandler.parse_playlist`, being suitable for
+        execution in another process.
+        """
+        return list(YoutubeHandler.parse_playlist(url))
+
     @staticmethod
     def get_audio(query: str) -> Optional[str]:
         """Obtain a youtube audio url.
 
         Given a query or a youtube url obtains the best quality audio url.
-        Retries fetching audio url in case of error waiting between attempts.
 
         Parameters
         ----------
@@ -94,28 +257,52 @@ class YoutubeHandler(BaseHandler):
         Optional[str]
             Youtube audio url or None if no audio url was found.
         """
+        audio = YoutubeHandler.get_audio_info(query)
+        return audio.url if audio else None
+
+    @staticmethod
+    def get_audio_info(query: str) -> Optional[AudioInfo]:
+        """Obtain a youtube audio stream along with its format.
+
+        Given a query or a youtube url obtains the best quality audio url, as well
+        as the codec, container, bitrate and duration reported by the extractor,
+        sparing consumers from probing the stream. Extraction makes use of an
+        extractor leased from :meth:`~YoutubeHandler.extractor_pool`.
+
+        Parameters
+        ----------
+        query : str
+            Youtube video url or query.
+
+        Returns
+        -------
+        Optional[AudioInfo]
+            Youtube audio stream or None if no audio url was found.
+        """
         logging.getLogger(__name__).debug(
             "Trying to obtain youtube audio url %s", query
         )
-        url = None
+        audio = None
         if query:
             logging.getLogger(__name__).debug(
                 "Attempting to obtain youtube audio url %s", query
             )
             try:
-                with YoutubeDL(settings.player.source.youtube.downloader_config) as ydl:
-                    url = ydl.extract_info(url=query, download=False).get("url", None)
+                with YoutubeHandler.extractor_pool().lease() as ydl:
+                    audio = AudioInfo.from_info(
+                        ydl.extract_info(url=query, download=False)
+                    )
             except Exception:
                 logging.getLogger(__name__).warning(
                     "Unable to obtain audio url %s",
                     query,
                     exc_info=True,
                 )
-            if url:
+            if audio:
                 logging.getLogger(__name__).info(
                     "Obtained audio url for query '%s'", query
                 )
-                return url
+                return audio
         logging.getLogger(__name__).warning("Unable to obtain audio url %s", query)
         return None
 
@@ -128,12 +315,25 @@ class YoutubeQueryHandler(BaseHandler):
     """
 
     name = SourceType.YOUTUBE
+    _query_cache: Optional[QueryCache] = None
+    _searches: SingleFlight[Optional[str]] = SingleFlight("query search")
+    _video_id_pattern = re.compile(rb"watch\?v=([\w-]{11})")
+    # longest byte sequence which may hold an incomplete video id match
+    _video_id_overlap = len(b"watch?v=") + 11 - 1
 
     @staticmethod
     def __valid_source(source: str) -> bool:
         """Check whether source is an url."""
         return source and (not source.startswith(("https", "http")))
 
+    @classmethod
+    def query_cache(cls) -> QueryCache:
+        """Provide process wide cache of search results."""
+        if cls._query_cache is None:
+            config = settings.player.source.youtube.query_cache
+            cls._query_cache = QueryCache(config.path, size=config.size, ttl=config.ttl)
+        return cls._query_cache
+
     def handle(self, source: str) -> SourcePair:
         if self.__valid_source(source):
             logging.getLogger(__name__).info(
@@ -151,11 +351,68 @@ class YoutubeQueryHandler(BaseHandler):
     def encode_url(url: str) -> str:
         return requote_uri(url)
 
+    @staticmethod
+    async def _read_video_id(response: httpx.Response) -> Optional[str]:
+        """Find first video id after downloading the whole search results page."""
+        await response.aread()
+        match = YoutubeQueryHandler._video_id_pattern.search(response.content)
+        return match.group(1).decode() if match else None
+
+    @staticmethod
+    async def _stream_video_id(response: httpx.Response) -> Optional[str]:
+        """Find first video id while search results page is being downloaded.
+
+        Page chunks are scanned as they arrive, keeping enough trailing bytes from
+        the previous chunk to match video ids split across chunks. Scanning stops
+        at the first video id, leaving the rest of the page undownloaded.
+        """
+        tail = b""
+        async for chunk in response.aiter_bytes():
+            buffer = tail + chunk
+            match = YoutubeQueryHandler._video_id_pattern.search(buffer)
+            if match:
+                return match.group(1).decode()
+            tail = buffer[-YoutubeQueryHandler._video_id_overlap :]
+        return None
+
+    @staticmethod
+    async def search_video_id(uri: str) -> Optional[str]:
+        """Obtain first video id listed in a youtube search results page.
+
+        Depending on settings the page is either scanned while it is streamed,
+        closing the response as soon as a video id is found, or fully downloaded.
+
+        Parameters
+        ----------
+        uri : str
+            Search results page uri.
+
+        Returns
+        -------
+        Optional[str]
+            First video id, None if page lists no video.
+
+        Raises
+        ------
+        httpx.HTTPError
+            Page could not be obtained, including error responses.
+        """
+        async with HttpClient.get().stream(
+            "GET", uri, timeout=httpx.Timeout(settings.player.url_fetch.timeout)
+        ) as response:
+            response.raise_for_status()
+            if settings.player.url_fetch.streaming:
+                return await YoutubeQueryHandler._stream_video_id(response)
+            return await YoutubeQueryHandler._read_video_id(response)
+
     @staticmethod
     async def url_from_query(query: str) -> Optional[str]:
         """Get youtube audio url based on search query.
 
         Perform a youtube query to obtain the related video with the most views.
+        Results are cached, so repeated queries skip searching youtube, while
+        concurrent identical queries share a single search. Searches reuse the
+        pooled connections of the process wide :class:`HttpClient`.
 
         Parameters
         ----------
@@ -169,22 +426,29 @@ class YoutubeQueryHandler(BaseHandler):
         """
         url = None
         if query:
-            uri = YoutubeQueryHandler.encode_url(
-                f"https://www.youtube.com/results?search_query={query}"
+            video_id = await YoutubeQueryHandler._searches.do(
+                QueryCache.normalize(query),
+                lambda: YoutubeQueryHandler.__search(query),
             )
-            async with httpx.AsyncClient() as client:
-                try:
-                    response = await client.get(
-                        uri, timeout=settings.player.url_fetch.timeout
-                    )
-                    video_id = re.search(r"watch\?v=(\S{11})", response.text).group(1)
-                    url = (
-                        f"https://www.youtube.com/watch?v={video_id}"
-                        if video_id
-                        else None
-                    )
-                except httpx.TimeoutException:
-                    logging.getLogger(__name__).exception(
-                        "Unable to search for query: %s", query
-                    )
+            url = YoutubeHandler.video_url(video_id) if video_id else None
         return url
+
+    @staticmethod
+    async def __search(query: str) -> Optional[str]:
+        """Obtain video id best matching query, from cache or searching youtube."""
+        cache = YoutubeQueryHandler.query_cache()
+        video_id = await cache.get(query)
+        if video_id:
+            return video_id
+        uri = YoutubeQueryHandler.encode_url(
+            f"https://www.youtube.com/results?search_query={query}"
+        )
+        try:
+            video_id = await YoutubeQueryHandler.search_video_id(uri)
+        except httpx.HTTPError:
+            logging.getLogger(__name__).warning(
+                "Unable to search for query: %s", query, exc_info=True
+            )
+        if video_id:
+            await cache.set(query, video_id)
+        return video_id
@@ -0,0 +1,124 @@
+import contextlib
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterator
+
+from yt_dlp import YoutubeDL
+
+
+class ExtractorLeaseTimeoutError(TimeoutError):
+    """No extractor became available before lease timeout."""
+
+    def __init__(self) -> None:
+        super().__init__("No youtube extractor available")
+
+
+class _PooledExtractor:
+    """Extractor instance and its usage count."""
+
+    __slots__ = ("extractor", "uses")
+
+    def __init__(self, extractor: YoutubeDL) -> None:
+        self.extractor = extractor
+        self.uses = 0
+
+
+class YoutubeDLPool:
+    """Bounded pool of warm YoutubeDL extractors.
+
+    Building a YoutubeDL instance registers every extractor, sets up the cookie jar
+    and discards any player code previously fetched. Pooled instances are leased
+    to a single caller at a time and reused afterwards, being recycled once they
+    were used :attr:`max_uses` times.
+
+    Attributes
+    ----------
+    config : Dict[str, Any]
+        YoutubeDL configuration used to build extractors.
+    size : int
+        Maximum number of concurrently leased extractors.
+    max_uses : int
+        Number of leases after which an extractor is discarded.
+    lease_timeout : float
+        Maximum time in seconds to wait for an extractor to become available.
+    """
+
+    config: Dict[str, Any]
+    size: int
+    max_uses: int
+    lease_timeout: float
+    _logger: logging.Logger
+    __idle: Deque[_PooledExtractor]
+    __leases: threading.BoundedSemaphore
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        size: int,
+        max_uses: int,
+        lease_timeout: float,
+    ) -> None:
+        self._logger = logging.getLogger(__name__)
+        self.config = dict(config)
+        self.size = size
+        self.max_uses = max_uses
+        self.lease_timeout = lease_timeout
+        self.__idle = deque()
+        self.__leases = threading.BoundedSemaphore(size)
+
+    def __build(self) -> _PooledExtractor:
+        self._logger.debug("Building youtube extractor")
+        return _PooledExtractor(YoutubeDL(self.config))
+
+    @staticmethod
+    def __close(pooled: _PooledExtractor) -> None:
+        pooled.extractor.close()
+
+    def warm_up(self) -> None:
+        """Fill pool with ready to use extractors."""
+        missing = self.size - len(self.__idle)
+        self.__idle.extend(self.__build() for _ in range(max(missing, 0)))
+        self._logger.info("Youtube extractor pool warmed up with %s", self.size)
+
+    def idle(self) -> int:
+        """Count built extractors not currently leased."""
+        return len(self.__idle)
+
+    @contextlib.contextmanager
+    def lease(self) -> Iterator[YoutubeDL]:
+        """Lease an extractor for exclusive use.
+
+        Yields
+        ------
+        YoutubeDL
+            Extractor to be used until context exit.
+
+        Raises
+        ------
+        ExtractorLeaseTimeoutError
+            No extractor became available within :attr:`lease_timeout` seconds.
+        """
+        if not self.__leases.acquire(timeout=self.lease_timeout):
+            raise ExtractorLeaseTimeoutError
+        try:
+            try:
+                pooled = self.__idle.pop()
+            except IndexError:
+                pooled = self.__build()
+            pooled.uses += 1
+            try:
+                yield pooled.extractor
+            finally:
+                if pooled.uses >= self.max_uses:
+                    self._logger.debug("Recycling youtube extractor")
+                    self.__close(pooled)
+                else:
+                    self.__idle.append(pooled)
+        finally:
+            self.__leases.release()
+
+    def close(self) -> None:
+        """Close every idle extractor."""
+        while self.__idle:
+            self.__close(self.__idle.pop())
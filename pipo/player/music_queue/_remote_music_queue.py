@@ -1,5 +1,19 @@
 import ssl
 import logging
+import time
+import zlib
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from opentelemetry import trace
 from opentelemetry.sdk.resources import Resource
@@ -10,37 +24,121 @@ from faststream.rabbit import (
     RabbitBroker,
     RabbitExchange,
     RabbitQueue,
+    RabbitRouter,
 )
 from faststream.rabbit.opentelemetry import RabbitTelemetryMiddleware
 from faststream.security import BaseSecurity
 
 from pipo.config import settings
+from pipo.player.audio_source.expiring_cache import ExpiringLRUCache
+from pipo.player.audio_source.extraction_executor import ExtractionExecutor
 from pipo.player.audio_source.source_oracle import SourceOracle
+from pipo.player.audio_source.source_pair import SourcePair
 from pipo.player.audio_source.spotify_handler import SpotifyHandler
 from pipo.player.audio_source.youtube_handler import (
     YoutubeHandler,
     YoutubeOperations,
     YoutubeQueryHandler,
 )
-from pipo.player.music_queue.models import ProviderOperation, Music, MusicRequest
+from pipo.player.music_queue.batch_publisher import BatchPublisher
+from pipo.player.music_queue.batch_resolver import BatchResolver
+from pipo.player.music_queue.codec import CodecMiddleware, decode_message
+from pipo.player.music_queue.fair_scheduler import FairScheduler
+from pipo.player.music_queue.memory_broker import (
+    MemoryBroker,
+    Transport,
+    topic_matches,
+)
+from pipo.player.music_queue.models import (
+    Lane,
+    Music,
+    MusicRequest,
+    ProgressReport,
+    ProviderBatchOperation,
+    ProviderItem,
+    ProviderOperation,
+)
 
 tracer_provider = TracerProvider(
     resource=Resource.create(attributes={"service.name": "faststream"})
 )
 trace.set_tracer_provider(tracer_provider)
 
-broker = RabbitBroker(
-    app_id=settings.app,
-    url=settings.queue_broker_url,
-    host=settings.player.queue.broker.host,
-    virtualhost=settings.player.queue.broker.vhost,
-    port=settings.player.queue.broker.port,
-    timeout=settings.player.queue.broker.timeout,
-    max_consumers=settings.player.queue.broker.max_consumers,
-    graceful_timeout=settings.player.queue.broker.graceful_timeout,
-    logger=logging.getLogger(__name__),
-    security=BaseSecurity(ssl_context=ssl.create_default_context()),
-    middlewares=(RabbitTelemetryMiddleware(tracer_provider=tracer_provider),),
+transport = Transport(settings.player.queue.broker.transport)
+
+
+def build_broker(max_consumers: Optional[int] = None) -> RabbitBroker:
+    """Build broker of configured transport, connection and middlewares.
+
+    Parameters
+    ----------
+    max_consumers : Optional[int], optional
+        Deliveries processed at once by each subscriber, by default
+        ``broker.max_consumers`` setting.
+
+    Returns
+    -------
+    RabbitBroker
+        Broker, not yet connected.
+    """
+    # in memory transport runs every subscriber in process, without RabbitMQ
+    return (MemoryBroker if transport == Transport.MEMORY else RabbitBroker)(
+        app_id=settings.app,
+        url=settings.queue_broker_url,
+        host=settings.player.queue.broker.host,
+        virtualhost=settings.player.queue.broker.vhost,
+        port=settings.player.queue.broker.port,
+        timeout=settings.player.queue.broker.timeout,
+        max_consumers=max_consumers or settings.player.queue.broker.max_consumers,
+        graceful_timeout=settings.player.queue.broker.graceful_timeout,
+        logger=logging.getLogger(__name__),
+        security=BaseSecurity(ssl_context=ssl.create_default_context()),
+        decoder=decode_message,
+        middlewares=(
+            RabbitTelemetryMiddleware(tracer_provider=tracer_provider),
+            CodecMiddleware,
+        ),
+    )
+
+
+broker = build_broker()
+
+# pipeline subscribers, by the group of pipo-worker processes running them
+dispatch_router = RabbitRouter()
+youtube_router = RabbitRouter()
+youtube_query_router = RabbitRouter()
+spotify_router = RabbitRouter()
+
+extraction_executor = ExtractionExecutor(
+    mode=settings.player.source.youtube.executor.mode,
+    workers=settings.player.source.youtube.executor.workers,
+    initializer=YoutubeHandler.warm_up,
+    start_method=settings.player.source.youtube.executor.start_method,
+)
+
+search_schedulers = {
+    lane: FairScheduler(
+        workers=settings.player.queue.service.transmuter.fairness[lane].search_workers,
+        quantum=settings.player.queue.service.transmuter.fairness.quantum,
+        weights=settings.player.queue.service.transmuter.fairness.weights,
+    )
+    for lane in Lane
+}
+
+extraction_schedulers = {
+    lane: FairScheduler(
+        workers=settings.player.queue.service.transmuter.fairness[
+            lane
+        ].extraction_workers,
+        quantum=settings.player.queue.service.transmuter.fairness.quantum,
+        weights=settings.player.queue.service.transmuter.fairness.weights,
+    )
+    for lane in Lane
+}
+
+# ordinals of batch items already published or reported failed, by request position
+settled_items: ExpiringLRUCache[Set[int]] = ExpiringLRUCache(
+    settings.player.queue.service.transmuter.batch.settled.size
 )
 
 plq = RabbitQueue(
@@ -85,6 +183,54 @@ provider_exch = RabbitExchange(
     durable=True,
 )
 
+
+def bulk_shard(server_id: str) -> int:
+    """Bulk lane queue of a guild, among the queues of each transmuter stage."""
+    shards = max(settings.player.queue.service.transmuter.bulk_shards, 1)
+    return zlib.crc32(server_id.encode()) % shards
+
+
+def lane_routing_key(routing_key: str, lane: Lane, server_id: str) -> str:
+    """Routing key of a transmuter stage for given lane and guild."""
+    if lane == Lane.INTERACTIVE:
+        return routing_key
+    suffix = settings.player.queue.service.transmuter.bulk_suffix
+    return f"{routing_key}.{suffix}.{bulk_shard(server_id)}"
+
+
+def bulk_queues(config) -> List[RabbitQueue]:
+    """Bulk lane queues of a transmuter stage, alongside its interactive queue.
+
+    Guilds are spread among queues by :func:`bulk_shard`, so a guild backlog only
+    fills the prefetch window of its queue consumer, leaving deliveries of other
+    queues flowing to the fair schedulers.
+    """
+    suffix = settings.player.queue.service.transmuter.bulk_suffix
+    return [
+        RabbitQueue(
+            f"{config.queue}_{suffix}_{shard}",
+            routing_key=f"{config.routing_key}.{suffix}.{shard}",
+            durable=True,
+            arguments=config.args,
+        )
+        for shard in range(max(settings.player.queue.service.transmuter.bulk_shards, 1))
+    ]
+
+
+H = TypeVar("H")
+
+
+def subscribed(subscribers: List[Callable[[H], H]]) -> Callable[[H], H]:
+    """Decorate handler with each of given subscribers."""
+
+    def decorator(handler: H) -> H:
+        for subscriber in subscribers:
+            handler = subscriber(handler)
+        return handler
+
+    return decorator
+
+
 youtube_playlist_queue = RabbitQueue(
     settings.player.queue.service.transmuter.youtube_playlist.queue,
     routing_key=settings.player.queue.service.transmuter.youtube_playlist.routing_key,
@@ -92,6 +238,10 @@ youtube_playlist_queue = RabbitQueue(
     arguments=settings.player.queue.service.transmuter.youtube_playlist.args,
 )
 
+youtube_playlist_bulk_queues = bulk_queues(
+    settings.player.queue.service.transmuter.youtube_playlist
+)
+
 youtube_playlist_publisher = broker.publisher(
     exchange=provider_exch,
     routing_key=settings.player.queue.service.transmuter.youtube.routing_key,
@@ -105,6 +255,10 @@ youtube_query_queue = RabbitQueue(
     arguments=settings.player.queue.service.transmuter.youtube_query.args,
 )
 
+youtube_query_bulk_queues = bulk_queues(
+    settings.player.queue.service.transmuter.youtube_query
+)
+
 youtube_queue = RabbitQueue(
     settings.player.queue.service.transmuter.youtube.queue,
     routing_key=settings.player.queue.service.transmuter.youtube.routing_key,
@@ -112,6 +266,8 @@ youtube_queue = RabbitQueue(
     arguments=settings.player.queue.service.transmuter.youtube.args,
 )
 
+youtube_bulk_queues = bulk_queues(settings.player.queue.service.transmuter.youtube)
+
 spotify_queue = RabbitQueue(
     settings.player.queue.service.transmuter.spotify.queue,
     routing_key=settings.player.queue.service.transmuter.spotify.routing_key,
@@ -119,12 +275,26 @@ spotify_queue = RabbitQueue(
     arguments=settings.player.queue.service.transmuter.spotify.args,
 )
 
+spotify_bulk_queues = bulk_queues(settings.player.queue.service.transmuter.spotify)
+
 spotify_publisher = broker.publisher(
     exchange=provider_exch,
     routing_key=settings.player.queue.service.transmuter.youtube_query.routing_key,
     description="Produces to provider exchange with key provider.spotify.url",
 )
 
+youtube_query_publisher = broker.publisher(
+    exchange=provider_exch,
+    routing_key=settings.player.queue.service.transmuter.youtube.routing_key,
+    description="Produces to provider topic with provider.youtube.url key",
+)
+
+spotify_mapped_publisher = broker.publisher(
+    exchange=provider_exch,
+    routing_key=settings.player.queue.service.transmuter.youtube.routing_key,
+    description="Produces to provider exchange with key provider.youtube.url",
+)
+
 hub_exch = RabbitExchange(
     settings.player.queue.service.hub.exchange,
     type=ExchangeType.TOPIC,
@@ -139,146 +309,556 @@ hub_queue = RabbitQueue(
     arguments=settings.player.queue.service.hub.args,
 )
 
+progress_queue = RabbitQueue(
+    settings.player.queue.service.progress.queue,
+    routing_key=settings.player.queue.service.progress.routing_key,
+    durable=settings.player.queue.service.progress.durable,
+    exclusive=settings.player.queue.service.progress.exclusive,
+    arguments=settings.player.queue.service.progress.args,
+)
+
+
+async def report_progress(
+    request: Union[MusicRequest, ProviderBatchOperation, ProviderOperation],
+    expected: int = 0,
+    failed: int = 0,
+    expansions: int = 0,
+) -> None:
+    """Report change in expected outcome of request to the guild which made it.
+
+    Parameters
+    ----------
+    request : Union[MusicRequest, ProviderBatchOperation, ProviderOperation]
+        Request, or operation derived from it.
+    expected : int, optional
+        Change in number of musics expected, by default 0.
+    failed : int, optional
+        Number of musics which could not be obtained, by default 0.
+    expansions : int, optional
+        Change in number of expansions yet to finish, by default 0.
+    """
+    if not expected and not failed and not expansions:
+        return
+    await broker.publish(
+        ProgressReport(
+            uuid=request.uuid,
+            server_id=request.server_id,
+            expected=expected,
+            failed=failed,
+            expansions=expansions,
+        ),
+        routing_key=f"{settings.player.queue.service.progress.base_routing_key}.{request.server_id}",
+        exchange=hub_exch,
+    )
+
+
+def _expands(provider: str) -> bool:
+    """Whether provider stage expands an operation into a number of musics."""
+    transmuter = settings.player.queue.service.transmuter
+    return any(
+        topic_matches(config.routing_key, provider)
+        for config in (transmuter.youtube_playlist, transmuter.spotify)
+    )
 
-@broker.subscriber(
+
+dispatch_subscriber = dispatch_router.subscriber(
     queue=dispatcher_queue,
     description="Consumes from dispatch topic and produces to provider exchange",
 )
+
+
+@dispatch_subscriber
 async def dispatch(
     logger: Logger,
     request: MusicRequest,
 ) -> None:
     logger.debug("Processing request: %s", request)
-    sources = SourceOracle.process_queries(request.query, request.shuffle)
-    for source in sources:
-        logger.debug("Processing source: %s", source)
-        provider = f"{settings.player.queue.service.transmuter.routing_key}.{source.handler_type}.{source.operation}"
-        request = ProviderOperation(
+    sources = list(SourceOracle.process_queries(request.query, request.shuffle))
+    providers = [
+        f"{settings.player.queue.service.transmuter.routing_key}"
+        f".{source.handler_type}.{source.operation}"
+        for source in sources
+    ]
+    # this expansion is finished, replaced by those of the sources
+    await report_progress(
+        request,
+        expected=len(sources) - len(request.query),
+        expansions=sum(map(_expands, providers)) - 1,
+    )
+    async with BatchPublisher(settings.player.queue.broker.max_in_flight) as batch:
+        for index, (source, provider) in enumerate(zip(sources, providers)):
+            logger.debug("Processing source: %s", source)
+            lane = Lane.INTERACTIVE if index == 0 else Lane.BULK
+            request = ProviderOperation(
+                uuid=request.uuid,
+                server_id=request.server_id,
+                provider=provider,
+                operation=source.operation,
+                shuffle=request.shuffle,
+                query=source.query,
+                lane=lane,
+                position=index,
+            )
+            logger.debug("Will publish to provider %s request: %s", provider, request)
+            await batch.publish(
+                broker.publish,
+                request,
+                routing_key=lane_routing_key(provider, lane, request.server_id),
+                exchange=provider_exch,
+            )
+    logger.info("Published request: %s", request.uuid)
+
+
+async def _search_video(
+    request: Union[ProviderBatchOperation, ProviderOperation],
+    query: str,
+    spotify_id: Optional[str] = None,
+    isrc: Optional[str] = None,
+) -> Optional[str]:
+    """Search youtube video url, remembering it for the originating spotify track.
+
+    Searches take turns among guilds of the request lane, as scheduled by
+    :data:`search_schedulers`.
+    """
+    async with search_schedulers[request.lane].slot(request.server_id):
+        source = await YoutubeQueryHandler.url_from_query(query)
+    if source:
+        video_id = YoutubeHandler.video_id(source)
+        if video_id and (spotify_id or isrc):
+            await SpotifyHandler.track_mapping().remember(spotify_id, isrc, video_id)
+    return source
+
+
+async def _fetch_music(
+    request: Union[ProviderBatchOperation, ProviderOperation], item: ProviderItem
+) -> Optional[Music]:
+    """Obtain playable music from youtube video url of item.
+
+    Extractions take turns among guilds of the request lane, as scheduled by
+    :data:`extraction_schedulers`.
+    """
+    async with extraction_schedulers[request.lane].slot(request.server_id):
+        audio = await YoutubeHandler.fetch_audio(item.query, extraction_executor)
+    logging.getLogger(__name__).debug("Obtained youtube audio: %s", audio)
+    if audio:
+        return Music(
             uuid=request.uuid,
             server_id=request.server_id,
-            provider=provider,
-            operation=source.operation,
-            shuffle=request.shuffle,
-            query=source.query,
+            source=audio.url,
+            origin=item.query,
+            codec=audio.codec,
+            container=audio.container,
+            bitrate=audio.bitrate,
+            duration=audio.duration,
+            lane=request.lane,
+            position=request.position,
+            ordinal=item.ordinal,
+            final=item.final,
         )
-        logger.debug("Will publish to provider %s request: %s", provider, request)
-        await broker.publish(
-            request,
-            routing_key=provider,
-            exchange=provider_exch,
+
+
+def _settled_ordinals(request: ProviderBatchOperation) -> Set[int]:
+    """Ordinals of batch items already published or reported failed.
+
+    Batches redelivered after a partial failure skip such items, if previously
+    delivered to this process.
+    """
+    key = (request.uuid, request.position)
+    settled = settled_items.get(key)
+    if settled is None:
+        settled = set()
+        settled_items.set(
+            key,
+            settled,
+            time.time() + settings.player.queue.service.transmuter.batch.settled.ttl,
+        )
+    return settled
+
+
+def _chunks(items: List[ProviderItem]) -> Iterator[List[ProviderItem]]:
+    """Split items into batches of at most the configured batch size."""
+    size = max(settings.player.queue.service.transmuter.batch.size, 1)
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _provider_message(
+    request: Union[ProviderBatchOperation, ProviderOperation],
+    provider: str,
+    operation: str,
+    items: List[ProviderItem],
+    lane: Lane,
+) -> Union[ProviderBatchOperation, ProviderOperation]:
+    """Build a single operation for one item, or a batch operation for several."""
+    if len(items) == 1:
+        (item,) = items
+        return ProviderOperation(
+            uuid=request.uuid,
+            server_id=request.server_id,
+            provider=provider,
+            operation=operation,
+            query=item.query,
+            spotify_id=item.spotify_id,
+            isrc=item.isrc,
+            lane=lane,
+            position=request.position,
+            ordinal=item.ordinal,
+            final=item.final,
         )
-        logger.info("Published request: %s", request.uuid)
+    return ProviderBatchOperation(
+        uuid=request.uuid,
+        server_id=request.server_id,
+        provider=provider,
+        operation=operation,
+        items=items,
+        lane=lane,
+        position=request.position,
+    )
 
 
-@broker.subscriber(
+youtube_query_subscriber = youtube_query_router.subscriber(
     queue=youtube_query_queue,
     exchange=provider_exch,
     description="Consumes from provider topic with provider.youtube.query key",
 )
-@broker.publisher(
-    exchange=provider_exch,
-    routing_key=settings.player.queue.service.transmuter.youtube.routing_key,
-    description="Produces to provider topic with provider.youtube.url key with increased priority",
-    priority=settings.player.queue.service.transmuter.youtube_query.message_priority,
-)
+
+youtube_query_bulk_subscribers = [
+    youtube_query_router.subscriber(
+        queue=queue,
+        exchange=provider_exch,
+        description=f"Consumes from provider topic with {queue.routing_key} key",
+    )
+    for queue in youtube_query_bulk_queues
+]
+
+
+@youtube_query_subscriber
+@subscribed(youtube_query_bulk_subscribers)
 async def transmute_youtube_query(
-    request: ProviderOperation,
+    request: Union[ProviderBatchOperation, ProviderOperation],
     logger: Logger,
-) -> ProviderOperation:
+    correlation_id: str = Context("message.correlation_id"),
+) -> None:
     logger.debug("Received request: %s", request)
-    source = await YoutubeQueryHandler.url_from_query(request.query)
-    if source:
-        request = ProviderOperation(
+    provider = settings.player.queue.service.transmuter.youtube.routing_key
+    if isinstance(request, ProviderBatchOperation):
+        resolver = BatchResolver(settings.player.queue.service.transmuter.batch.workers)
+        items = [
+            ProviderItem(ordinal=item.ordinal, query=source, final=item.final)
+            async for item, source in resolver.resolve(
+                request.items,
+                lambda item: _search_video(
+                    request, item.query, item.spotify_id, item.isrc
+                ),
+            )
+            if source
+        ]
+        await report_progress(request, failed=len(request.items) - len(items))
+        if not items:
+            return
+        message = ProviderBatchOperation(
             uuid=request.uuid,
             server_id=request.server_id,
-            provider=settings.player.queue.service.transmuter.youtube.routing_key,
+            provider=provider,
+            operation=YoutubeOperations.URL,
+            items=items,
+            lane=request.lane,
+            position=request.position,
+        )
+        logger.info(
+            "Transmuted %s of %s youtube queries: %s",
+            len(items),
+            len(request.items),
+            request.uuid,
+        )
+    else:
+        source = await _search_video(
+            request, request.query, request.spotify_id, request.isrc
+        )
+        if not source:
+            await report_progress(request, failed=1)
+            return
+        message = ProviderOperation(
+            uuid=request.uuid,
+            server_id=request.server_id,
+            provider=provider,
             operation=YoutubeOperations.URL,
             query=source,
+            lane=request.lane,
+            position=request.position,
+            ordinal=request.ordinal,
+            final=request.final,
         )
         logger.info("Transmuted youtube query: %s", request.uuid)
-        return request
+    await youtube_query_publisher.publish(
+        message,
+        routing_key=lane_routing_key(provider, request.lane, request.server_id),
+        correlation_id=correlation_id,
+    )
 
 
-@broker.subscriber(
+# playlists are expanded with yt-dlp, as done by youtube extraction
+youtube_playlist_subscriber = youtube_router.subscriber(
     queue=youtube_playlist_queue,
     exchange=provider_exch,
     description="Consumes from provider topic with provider.youtube.playlist key",
 )
+
+youtube_playlist_bulk_subscribers = [
+    youtube_router.subscriber(
+        queue=queue,
+        exchange=provider_exch,
+        description=f"Consumes from provider topic with {queue.routing_key} key",
+    )
+    for queue in youtube_playlist_bulk_queues
+]
+
+
+@youtube_playlist_subscriber
+@subscribed(youtube_playlist_bulk_subscribers)
 async def transmute_youtube_playlist(
     request: ProviderOperation,
     logger: Logger,
     correlation_id: str = Context("message.correlation_id"),
 ) -> None:
     logger.debug("Received request: %s", request)
-    tracks = YoutubeHandler.parse_playlist(request.query)
-    for url in tracks:
-        query = ProviderOperation(
-            uuid=request.uuid,
-            server_id=request.server_id,
-            provider=settings.player.queue.service.transmuter.youtube.routing_key,
-            operation=YoutubeOperations.URL,
-            query=url,
-        )
-        await youtube_playlist_publisher.publish(
-            query,
-            correlation_id=correlation_id,
+    async with extraction_schedulers[request.lane].slot(request.server_id):
+        tracks = await extraction_executor.run(
+            YoutubeHandler.get_playlist, request.query
         )
+    items = [
+        ProviderItem(ordinal=ordinal, query=url, final=ordinal == len(tracks) - 1)
+        for ordinal, url in enumerate(tracks)
+    ]
+    # playlist is replaced by its tracks, finishing its expansion
+    await report_progress(request, expected=len(items) - 1, expansions=-1)
+    provider = settings.player.queue.service.transmuter.youtube.routing_key
+    async with BatchPublisher(settings.player.queue.broker.max_in_flight) as batch:
+        # first track keeps request lane, so playback starts promptly
+        for chunk, lane in [
+            (items[:1], request.lane),
+            *((chunk, Lane.BULK) for chunk in _chunks(items[1:])),
+        ]:
+            if not chunk:
+                continue
+            await batch.publish(
+                youtube_playlist_publisher.publish,
+                _provider_message(
+                    request, provider, YoutubeOperations.URL, chunk, lane
+                ),
+                routing_key=lane_routing_key(provider, lane, request.server_id),
+                correlation_id=correlation_id,
+            )
     logger.info("Transmuted youtube playlist: %s", request.uuid)
 
 
-@broker.subscriber(
+youtube_subscriber = youtube_router.subscriber(
     queue=youtube_queue,
     exchange=provider_exch,
-    description="Consumes from provider topic with provider.youtube.url key and produces to hub exchange",
+    description="Consumes from provider topic with provider.youtube.url key "
+    "and produces to hub exchange",
 )
+
+youtube_bulk_subscribers = [
+    youtube_router.subscriber(
+        queue=queue,
+        exchange=provider_exch,
+        description=f"Consumes from provider topic with {queue.routing_key} key "
+        "and produces to hub exchange",
+    )
+    for queue in youtube_bulk_queues
+]
+
+
+@youtube_subscriber
+@subscribed(youtube_bulk_subscribers)
 async def transmute_youtube(
-    request: ProviderOperation,
+    request: Union[ProviderBatchOperation, ProviderOperation],
     logger: Logger,
     correlation_id: str = Context("message.correlation_id"),
 ) -> None:
     logger.debug("Received request: %s", request)
-    source = YoutubeHandler.get_audio(request.query)
-    logger.debug("Obtained youtube audio url: %s", source)
-    if source:
-        music = Music(
-            uuid=request.uuid,
-            server_id=request.server_id,
-            source=source,
-        )
-        routing_key = (
-            f"{settings.player.queue.service.hub.base_routing_key}.{music.server_id}"
-        )
-        await broker.publish(
-            music,
-            routing_key=routing_key,
-            exchange=hub_exch,
-            correlation_id=correlation_id,
+    routing_key = (
+        f"{settings.player.queue.service.hub.base_routing_key}.{request.server_id}"
+    )
+    if isinstance(request, ProviderOperation):
+        music = await _fetch_music(
+            request,
+            ProviderItem(
+                ordinal=request.ordinal, query=request.query, final=request.final
+            ),
         )
-        logger.info("Transmuted youtube music: %s", music.uuid)
+        if music:
+            await broker.publish(
+                music,
+                routing_key=routing_key,
+                exchange=hub_exch,
+                correlation_id=correlation_id,
+            )
+            logger.info("Transmuted youtube music: %s", music.uuid)
+        else:
+            await report_progress(request, failed=1)
+        return
+    settled = _settled_ordinals(request)
+    items = [item for item in request.items if item.ordinal not in settled]
+    missing: List[int] = []
+
+    async def publish(music: Music, **kwargs) -> None:
+        await broker.publish(music, **kwargs)
+        settled.add(music.ordinal)
+
+    resolver = BatchResolver(settings.player.queue.service.transmuter.batch.workers)
+    try:
+        async with BatchPublisher(settings.player.queue.broker.max_in_flight) as batch:
+            async for item, music in resolver.resolve(
+                items, lambda item: _fetch_music(request, item)
+            ):
+                if music:
+                    await batch.publish(
+                        publish,
+                        music,
+                        routing_key=routing_key,
+                        exchange=hub_exch,
+                        correlation_id=correlation_id,
+                    )
+                else:
+                    missing.append(item.ordinal)
+    finally:
+        # items whose publication failed are left to batch redelivery
+        await report_progress(request, failed=len(missing))
+        settled.update(missing)
+    logger.info(
+        "Transmuted %s of %s youtube musics: %s",
+        batch.published,
+        len(items),
+        request.uuid,
+    )
+
 
+async def _spotify_item(track: SourcePair, ordinal: int) -> Tuple[ProviderItem, bool]:
+    """Build item of spotify track, whether its youtube video is already known.
 
-@broker.subscriber(
+    Tracks with a remembered youtube video skip the youtube search.
+    """
+    video_id = await SpotifyHandler.track_mapping().video_id(track.track_id, track.isrc)
+    if video_id:
+        return ProviderItem(
+            ordinal=ordinal, query=YoutubeHandler.video_url(video_id)
+        ), True
+    return (
+        ProviderItem(
+            ordinal=ordinal,
+            query=track.query,
+            spotify_id=track.track_id,
+            isrc=track.isrc,
+        ),
+        False,
+    )
+
+
+async def _spotify_items(
+    request: ProviderOperation,
+) -> AsyncIterator[Tuple[ProviderItem, bool]]:
+    """Provide items of the tracks of a spotify request, reporting their number.
+
+    Tracks are yielded one behind, so the last one is known to be final.
+
+    Yields
+    ------
+    Tuple[ProviderItem, bool]
+        Item and whether its youtube video is already known.
+    """
+    previous: Optional[Tuple[ProviderItem, bool]] = None
+    ordinal = 0
+    # request is replaced by its tracks, reported page by page
+    expected = -1
+    async for tracks in SpotifyHandler.pages_from_query(request.query, request.shuffle):
+        await report_progress(request, expected=expected + len(tracks))
+        expected = 0
+        for track in tracks:
+            if previous:
+                yield previous
+            previous = await _spotify_item(track, ordinal)
+            ordinal += 1
+    await report_progress(request, expected=expected, expansions=-1)
+    if previous:
+        previous[0].final = True
+        yield previous
+
+
+spotify_subscriber = spotify_router.subscriber(
     queue=spotify_queue,
     exchange=provider_exch,
-    description="Consumes from provider topic with provider.spotify.* key and produces to providers topic with provider.youtube.query",
+    description="Consumes from provider topic with provider.spotify.* key "
+    "and produces to providers topic with provider.youtube.query",
 )
+
+spotify_bulk_subscribers = [
+    spotify_router.subscriber(
+        queue=queue,
+        exchange=provider_exch,
+        description=f"Consumes from provider topic with {queue.routing_key} key "
+        "and produces to providers topic with provider.youtube.query",
+    )
+    for queue in spotify_bulk_queues
+]
+
+
+@spotify_subscriber
+@subscribed(spotify_bulk_subscribers)
 async def transmute_spotify(
     request: ProviderOperation,
     logger: Logger,
     correlation_id: str = Context("message.correlation_id"),
 ) -> None:
     logger.debug("Received request: %s", request)
-    tracks = await SpotifyHandler.tracks_from_query(request.query, request.shuffle)
-    for track in tracks:
-        query = ProviderOperation(
-            uuid=request.uuid,
-            server_id=request.server_id,
-            provider=settings.player.queue.service.transmuter.youtube_query.routing_key,
-            operation=YoutubeOperations.QUERY,
-            query=track.query,
-        )
-        await spotify_publisher.publish(
-            query,
-            correlation_id=correlation_id,
-        )
-    logger.info("Transmuted spotify request: %s", query.uuid)
+    transmuter = settings.player.queue.service.transmuter
+    size = max(transmuter.batch.size, 1)
+    # mapped tracks skip youtube search
+    targets = {
+        True: (
+            spotify_mapped_publisher,
+            transmuter.youtube.routing_key,
+            YoutubeOperations.URL,
+        ),
+        False: (
+            spotify_publisher,
+            transmuter.youtube_query.routing_key,
+            YoutubeOperations.QUERY,
+        ),
+    }
+    pending: Dict[bool, List[ProviderItem]] = {True: [], False: []}
+
+    async def flush(mapped: bool, lane: Lane) -> None:
+        publisher, provider, operation = targets[mapped]
+        if pending[mapped]:
+            await batch.publish(
+                publisher.publish,
+                _provider_message(request, provider, operation, pending[mapped], lane),
+                routing_key=lane_routing_key(provider, lane, request.server_id),
+                correlation_id=correlation_id,
+            )
+        pending[mapped] = []
+
+    async with BatchPublisher(settings.player.queue.broker.max_in_flight) as batch:
+        async for item, mapped in _spotify_items(request):
+            pending[mapped].append(item)
+            # first track keeps request lane, so playback starts promptly
+            if item.ordinal == 0:
+                await flush(mapped, request.lane)
+            elif len(pending[mapped]) >= size:
+                await flush(mapped, Lane.BULK)
+        for mapped in pending:
+            await flush(mapped, Lane.BULK)
+    logger.info("Transmuted spotify request: %s", request.uuid)
+
+
+# once workers are deployed, they run the pipeline rather than the bot
+if not settings.worker.enabled or transport == Transport.MEMORY:
+    for router in (
+        dispatch_router,
+        youtube_router,
+        youtube_query_router,
+        spotify_router,
+    ):
+        broker.include_router(router)
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Set
+
+
+class BatchPublisher:
+    """Pipelines publications, bounding those awaiting broker confirmation.
+
+    Each publication is started without waiting for previous ones to be confirmed,
+    so many messages share the same broker round-trip. At most
+    :attr:`max_in_flight` publications are pending at any time, further
+    publications waiting for a free slot. Leaving the context waits for every
+    pending publication, raising the first error found, or cancels and waits for
+    them if the batch failed.
+
+    Attributes
+    ----------
+    max_in_flight : int
+        Maximum number of pending publications.
+    published : int
+        Number of confirmed publications.
+    """
+
+    max_in_flight: int
+    published: int
+    __slots: asyncio.Semaphore
+    __pending: Set[asyncio.Task]
+    __errors: List[BaseException]
+
+    def __init__(self, max_in_flight: int) -> None:
+        self.max_in_flight = max(max_in_flight, 1)
+        self.published = 0
+        self.__slots = asyncio.Semaphore(self.max_in_flight)
+        self.__pending = set()
+        self.__errors = []
+
+    async def __aenter__(self) -> "BatchPublisher":
+        """Start batch."""
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        """Wait for pending publications, cancelling them if batch failed."""
+        if exc_type is None:
+            await self.flush()
+        else:
+            self.cancel()
+            if self.__pending:
+                await asyncio.wait(set(self.__pending))
+
+    async def publish(
+        self, publish: Callable[..., Awaitable[Any]], message: Any, **kwargs: Any
+    ) -> None:
+        """Start publication, once fewer than max in flight are pending.
+
+        Parameters
+        ----------
+        publish : Callable[..., Awaitable[Any]]
+            Publishing coroutine function, such as a publisher or broker publish.
+        message : Any
+            Message to publish.
+        **kwargs : Any
+            Publication arguments, such as routing key or correlation id.
+        """
+        await self.__slots.acquire()
+        task = asyncio.create_task(publish(message, **kwargs))
+        self.__pending.add(task)
+        task.add_done_callback(self.__done)
+
+    def __done(self, task: asyncio.Task) -> None:
+        """Release slot of a completed publication, keeping its error."""
+        self.__pending.discard(task)
+        self.__slots.release()
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.__errors.append(task.exception())
+        else:
+            self.published += 1
+
+    async def flush(self) -> None:
+        """Wait for every pending publication.
+
+        Raises
+        ------
+        BaseException
+            First error raised by a publication, if any failed.
+        """
+        if self.__pending:
+            await asyncio.wait(set(self.__pending))
+        if self.__errors:
+            error = self.__errors[0]
+            logging.getLogger(__name__).warning(
+                "%s of %s publications failed",
+                len(self.__errors),
+                len(self.__errors) + self.published,
+            )
+            self.__errors.clear()
+            raise error
+
+    def cancel(self) -> None:
+        """Cancel every pending publication."""
+        for task in list(self.__pending):
+            task.cancel()
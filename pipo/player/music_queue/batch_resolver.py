@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BatchResolver(Generic[T, R]):
+    """Resolves batch items concurrently, yielding results in batch order.
+
+    At most :attr:`workers` items are resolved at a time. Each result is yielded
+    as soon as it and every preceding item are resolved, so the first results are
+    available before the whole batch completes. Items whose resolution fails are
+    logged and yielded without result, instead of failing the whole batch.
+
+    Attributes
+    ----------
+    workers : int
+        Maximum number of items resolved concurrently.
+    failed : int
+        Number of items whose resolution failed.
+    """
+
+    workers: int
+    failed: int
+
+    def __init__(self, workers: int) -> None:
+        self.workers = max(workers, 1)
+        self.failed = 0
+
+    async def resolve(
+        self, items: Sequence[T], function: Callable[[T], Awaitable[Optional[R]]]
+    ) -> AsyncIterator[Tuple[T, Optional[R]]]:
+        """Resolve items, yielding each along with its result.
+
+        Parameters
+        ----------
+        items : Sequence[T]
+            Items to resolve, in the order their results are yielded.
+        function : Callable[[T], Awaitable[Optional[R]]]
+            Resolves a single item.
+
+        Yields
+        ------
+        Tuple[T, Optional[R]]
+            Item and its result, None if resolution failed or found nothing.
+        """
+        slots = asyncio.Semaphore(self.workers)
+
+        async def run(item: T) -> Optional[R]:
+            async with slots:
+                return await function(item)
+
+        tasks = [asyncio.ensure_future(run(item)) for item in items]
+        try:
+            for item, task in zip(items, tasks):
+                try:
+                    result = await task
+                except Exception:
+                    self.failed += 1
+                    logging.getLogger(__name__).warning(
+                        "Unable to resolve batch item: %s", item, exc_info=True
+                    )
+                    result = None
+                yield item, result
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,247 @@
+import hashlib
+import hmac
+import importlib.util
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import pydantic_core
+from faststream import BaseMiddleware
+from faststream.rabbit.message import RabbitMessage
+from faststream.types import DecodedMessage
+
+from pipo.config import settings
+from pipo.player.music_queue.models.trusted import TrustedPayload
+
+
+class MessageCodec(ABC):
+    """Serialises broker messages into a given content type.
+
+    Attributes
+    ----------
+    name : str
+        Identifies codec in settings.
+    content_type : str
+        Content type of encoded messages.
+    """
+
+    name: str
+    content_type: str
+
+    @abstractmethod
+    def encode(self, message: Any) -> bytes:
+        """Serialise message, pydantic models included."""
+        pass
+
+    @abstractmethod
+    def decode(self, body: bytes) -> Any:
+        """Deserialise message body into plain python objects."""
+        pass
+
+
+class JsonCodec(MessageCodec):
+    """JSON codec, as used by default by FastStream."""
+
+    name = "json"
+    content_type = "application/json"
+
+    def encode(self, message: Any) -> bytes:
+        """Serialise message into JSON."""
+        return pydantic_core.to_json(message)
+
+    def decode(self, body: bytes) -> Any:
+        """Deserialise JSON message body."""
+        return json.loads(body)
+
+
+class MsgpackCodec(MessageCodec):
+    """Compact binary MessagePack codec, requires msgpack package."""
+
+    name = "msgpack"
+    content_type = "application/msgpack"
+
+    def encode(self, message: Any) -> bytes:
+        """Serialise message into MessagePack."""
+        import msgpack
+
+        return msgpack.packb(pydantic_core.to_jsonable_python(message))
+
+    def decode(self, body: bytes) -> Any:
+        """Deserialise MessagePack message body."""
+        import msgpack
+
+        return msgpack.unpackb(body)
+
+
+class Codecs:
+    """Registry of message codecs, by name and content type.
+
+    Messages are published with the codec selected by
+    ``player.queue.broker.codec``, JSON by default, while received messages are
+    decoded according to their content type header, so services using distinct
+    codecs interoperate. Unknown content types are left for FastStream to decode.
+    """
+
+    _codecs: Dict[str, MessageCodec] = {}
+    _selected: Optional[MessageCodec] = None
+
+    @classmethod
+    def register(cls, codec: MessageCodec) -> None:
+        """Make codec available for encoding and decoding."""
+        cls._codecs[codec.content_type] = codec
+        cls._selected = None
+
+    @classmethod
+    def by_content_type(cls, content_type: Optional[str]) -> Optional[MessageCodec]:
+        """Provide codec decoding given content type, None if unknown."""
+        return cls._codecs.get(content_type) if content_type else None
+
+    @classmethod
+    def by_name(cls, name: str) -> Optional[MessageCodec]:
+        """Provide codec registered with given name, None if unknown."""
+        return next(
+            (codec for codec in cls._codecs.values() if codec.name == name), None
+        )
+
+    @classmethod
+    def selected(cls) -> MessageCodec:
+        """Provide codec set in settings, falling back to JSON if unavailable."""
+        if cls._selected is None:
+            name = settings.player.queue.broker.codec
+            codec = cls.by_name(name)
+            if codec is None:
+                logging.getLogger(__name__).warning(
+                    "Unknown message codec '%s', using JSON", name
+                )
+                codec = JSON_CODEC
+            elif codec is MSGPACK_CODEC and importlib.util.find_spec("msgpack") is None:
+                logging.getLogger(__name__).warning(
+                    "MessagePack unavailable, install 'msgpack' to enable it"
+                )
+                codec = JSON_CODEC
+            cls._selected = codec
+        return cls._selected
+
+    @classmethod
+    def reset(cls) -> None:
+        """Select codec from settings again on next use."""
+        cls._selected = None
+
+
+JSON_CODEC = JsonCodec()
+MSGPACK_CODEC = MsgpackCodec()
+Codecs.register(JSON_CODEC)
+Codecs.register(MSGPACK_CODEC)
+
+
+class TrustedHops:
+    """Marks messages published by pipeline services as trusted.
+
+    Encoded messages carry a trust header holding the HMAC-SHA256 of the message
+    body, so the receiving hop may skip validating what a previous hop already
+    validated. Trust requires ``queue_signing_key`` to be set, every message
+    being validated otherwise, as anyone allowed to publish to the broker could
+    forge an unsigned header. Settings are read once, as looking them up for
+    every message costs more than the validation being skipped.
+    """
+
+    _config: Optional[Tuple[str, Optional[bytes]]] = None
+
+    @classmethod
+    def config(cls) -> Tuple[str, Optional[bytes]]:
+        """Trust header and signing key, None if trusted hops are disabled."""
+        if cls._config is None:
+            config = settings.player.queue.broker.trusted_hops
+            key = settings.get("queue_signing_key")
+            if config.enabled and not key:
+                logging.getLogger(__name__).warning(
+                    "Trusted hops require queue_signing_key, validating every message"
+                )
+            cls._config = (
+                config.header,
+                key.encode() if config.enabled and key else None,
+            )
+        return cls._config
+
+    @classmethod
+    def reset(cls) -> None:
+        """Read settings again on next use."""
+        cls._config = None
+
+    @classmethod
+    def sign(cls, body: bytes) -> Optional[str]:
+        """Trust header value for message body, None if trusted hops are disabled."""
+        _, key = cls.config()
+        if key is None:
+            return None
+        return hmac.digest(key, body, hashlib.sha256).hex()
+
+    @classmethod
+    def verify(cls, message: RabbitMessage) -> bool:
+        """Whether message was published by a trusted hop."""
+        header, key = cls.config()
+        if key is None:
+            return False
+        value = (message.headers or {}).get(header)
+        if not isinstance(value, str):
+            return False
+        return hmac.compare_digest(
+            value, hmac.digest(key, message.body, hashlib.sha256).hex()
+        )
+
+
+class CodecMiddleware(BaseMiddleware):
+    """Encodes published messages with the selected codec.
+
+    Encoded messages are marked by :class:`TrustedHops`, while raw bytes, text
+    and empty messages are published unchanged.
+    """
+
+    async def publish_scope(
+        self,
+        call_next: Callable[..., Awaitable[Any]],
+        msg: Any,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Encode message and set its content type before publishing it."""
+        if msg is not None and not isinstance(msg, (bytes, str)):
+            codec = Codecs.selected()
+            msg, kwargs["content_type"] = codec.encode(msg), codec.content_type
+            signature = TrustedHops.sign(msg)
+            if signature is not None:
+                header, _ = TrustedHops.config()
+                kwargs["headers"] = {**(kwargs.get("headers") or {}), header: signature}
+        return await super().publish_scope(call_next, msg, *args, **kwargs)
+
+
+async def decode_message(
+    message: RabbitMessage,
+    original_decoder: Callable[[RabbitMessage], Awaitable[DecodedMessage]],
+) -> DecodedMessage:
+    """Decode message according to its content type.
+
+    Bodies of messages published by trusted hops are provided as
+    :class:`TrustedPayload`, so models built from them skip validation.
+
+    Parameters
+    ----------
+    message : RabbitMessage
+        Received message.
+    original_decoder : Callable[[RabbitMessage], Awaitable[DecodedMessage]]
+        FastStream decoder, used for content types without registered codec.
+
+    Returns
+    -------
+    DecodedMessage
+        Decoded message body.
+    """
+    codec = Codecs.by_content_type(message.content_type)
+    if codec is None or codec is JSON_CODEC:
+        body = await original_decoder(message)
+    else:
+        body = codec.decode(message.body)
+    if isinstance(body, dict) and TrustedHops.verify(message):
+        return TrustedPayload(body)
+    return body
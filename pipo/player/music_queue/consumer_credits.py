@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Set
+
+from faststream.__about__ import __version__ as faststream_version
+from faststream.rabbit.subscriber.asyncapi import AsyncAPISubscriber
+
+
+async def _set_consuming(subscriber: AsyncAPISubscriber, consuming: bool) -> None:
+    """Restart or cancel consumer of a started subscriber.
+
+    FastStream offers no way to pause a subscriber, so its private aio-pika queue
+    and consumer tag are handled directly. Both were checked against FastStream
+    0.5.27 and should be checked again whenever it is upgraded. Subscribers
+    lacking them are left consuming, with a warning.
+
+    Parameters
+    ----------
+    subscriber : AsyncAPISubscriber
+        Subscriber to control, nothing being done if not started.
+    consuming : bool
+        Whether subscriber should consume.
+    """
+    try:
+        queue, tag = subscriber._queue_obj, subscriber._consumer_tag
+    except AttributeError:
+        logging.getLogger(__name__).warning(
+            "Unable to control consumer, unsupported FastStream %s", faststream_version
+        )
+        return
+    if queue is None:
+        return
+    if consuming and tag is None:
+        subscriber._consumer_tag = await queue.consume(
+            subscriber.consume, arguments=subscriber.consume_args
+        )
+    elif not consuming and tag is not None:
+        await queue.cancel(tag)
+        subscriber._consumer_tag = None
+
+
+class ConsumerCredits:
+    """Flow control of a RabbitMQ subscriber by credits.
+
+    Credits stand for free capacity downstream of the subscriber, such as room
+    in a local queue. While no credit is available the subscriber consumer is
+    cancelled, so messages stay in RabbitMQ instead of being held by pending
+    deliveries, and it is restarted once credits are available again. Messages
+    delivered before the consumer was cancelled should be requeued by the
+    subscriber handler.
+
+    Attributes
+    ----------
+    paused : bool
+        Whether subscriber consumer is cancelled due to lack of credits.
+    pauses : int
+        Number of times subscriber consumer was cancelled.
+    """
+
+    paused: bool
+    pauses: int
+    __credits: Callable[[], int]
+    __subscriber: Optional[AsyncAPISubscriber]
+    __lock: asyncio.Lock
+    __tasks: Set[asyncio.Task]
+
+    def __init__(self, credits: Callable[[], int]) -> None:
+        self.paused = False
+        self.pauses = 0
+        self.__credits = credits
+        self.__subscriber = None
+        self.__lock = asyncio.Lock()
+        self.__tasks = set()
+
+    def bind(self, subscriber: AsyncAPISubscriber) -> None:
+        """Control consumption of given subscriber."""
+        self.__subscriber = subscriber
+
+    def available(self) -> int:
+        """Count messages which may still be delivered."""
+        return max(self.__credits(), 0)
+
+    async def update(self) -> None:
+        """Cancel or restart subscriber consumer according to available credits."""
+        async with self.__lock:
+            if self.available() and self.paused:
+                await self.__resume()
+            elif not self.available() and not self.paused:
+                await self.__pause()
+
+    def schedule_update(self) -> None:
+        """Update consumer in background, for use outside coroutines."""
+        task = asyncio.get_running_loop().create_task(self.update())
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __pause(self) -> None:
+        """Cancel subscriber consumer, if consuming."""
+        self.paused = True
+        self.pauses += 1
+        if self.__subscriber is not None:
+            await _set_consuming(self.__subscriber, consuming=False)
+        logging.getLogger(__name__).debug("Paused consumer, no credits available")
+
+    async def __resume(self) -> None:
+        """Restart subscriber consumer, if started."""
+        self.paused = False
+        if self.__subscriber is not None:
+            await _set_consuming(self.__subscriber, consuming=True)
+        logging.getLogger(__name__).debug(
+            "Resumed consumer, %s credits available", self.available()
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """Provide credit and pause counters."""
+        return {
+            "credits": self.available(),
+            "paused": int(self.paused),
+            "pauses": self.pauses,
+        }
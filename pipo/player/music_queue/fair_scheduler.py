@@ -0,0 +1,132 @@
+import asyncio
+import contextlib
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Dict, Hashable, Mapping, Optional, Tuple
+
+
+class FairScheduler:
+    """Shares a bounded number of execution slots fairly among keys.
+
+    Work is queued per key, such as a guild, and slots are granted by deficit
+    round robin. Each round, keys still waiting earn credit proportional to their
+    weight, which is spent on the cost of the work they are granted. Keys with a
+    long backlog thus take turns with every other waiting key, instead of
+    delaying it until their whole backlog is done.
+
+    Attributes
+    ----------
+    workers : int
+        Maximum number of slots granted at any time.
+    quantum : float
+        Credit earned by a key of unit weight each round.
+    """
+
+    workers: int
+    quantum: float
+    __weights: Dict[Hashable, float]
+    __queues: "OrderedDict[Hashable, Deque[Tuple[asyncio.Future, float]]]"
+    __deficits: Dict[Hashable, float]
+    __running: int
+
+    def __init__(
+        self,
+        workers: int,
+        quantum: float = 1,
+        weights: Optional[Mapping[Hashable, float]] = None,
+    ) -> None:
+        self.workers = max(workers, 1)
+        self.quantum = quantum if quantum > 0 else 1
+        self.__weights = dict(weights or {})
+        self.__queues = OrderedDict()
+        self.__deficits = {}
+        self.__running = 0
+
+    def weight(self, key: Hashable) -> float:
+        """Share of slots given to key relative to others, by default 1."""
+        weight = self.__weights.get(key, 1)
+        return weight if weight > 0 else 1
+
+    async def acquire(self, key: Hashable, cost: float = 1) -> None:
+        """Wait for an execution slot.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies who the work is done for.
+        cost : float, optional
+            Relative cost of the work, by default 1.
+        """
+        if self.__running < self.workers and not self.__queues:
+            self.__running += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        queue = self.__queues.get(key)
+        if queue is None:
+            queue = self.__queues[key] = deque()
+            self.__deficits[key] = 0
+        queue.append((future, cost))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free an execution slot, granting it to the next waiting work."""
+        self.__running -= 1
+        self.__dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, key: Hashable, cost: float = 1) -> AsyncIterator[None]:
+        """Hold an execution slot while in context."""
+        await self.acquire(key, cost)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def __dispatch(self) -> None:
+        """Grant free slots to waiting work, by deficit round robin."""
+        while self.__running < self.workers:
+            future = self.__next()
+            if future is None:
+                return
+            self.__running += 1
+            future.set_result(None)
+
+    def __next(self) -> Optional[asyncio.Future]:
+        """Remove next work to be granted a slot from its queue."""
+        while self.__queues:
+            key, queue = next(iter(self.__queues.items()))
+            future, cost = queue[0]
+            if future.done():
+                queue.popleft()
+            elif self.__deficits[key] >= cost:
+                queue.popleft()
+                self.__deficits[key] -= cost
+            else:
+                self.__deficits[key] += self.quantum * self.weight(key)
+                self.__queues.move_to_end(key)
+                continue
+            if not queue:
+                del self.__queues[key]
+                del self.__deficits[key]
+            if not future.done():
+                return future
+        return None
+
+    def waiting(self) -> Dict[Hashable, int]:
+        """Count waiting work per key."""
+        return {
+            key: sum(not future.done() for future, _ in queue)
+            for key, queue in self.__queues.items()
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Provide slot usage counters."""
+        return {
+            "running": self.__running,
+            "waiting": sum(self.waiting().values()),
+            "keys": len(self.__queues),
+        }
@@ -0,0 +1,48 @@
+from typing import Dict
+
+
+class LatencyStats:
+    """Running summary of latency samples.
+
+    Attributes
+    ----------
+    count : int
+        Number of samples recorded.
+    total : float
+        Sum of recorded samples, in seconds.
+    max : float
+        Largest recorded sample, in seconds.
+    last : float
+        Latest recorded sample, in seconds.
+    """
+
+    count: int
+    total: float
+    max: float
+    last: float
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.last = 0
+
+    def record(self, seconds: float) -> None:
+        """Add latency sample, in seconds."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def mean(self) -> float:
+        """Average of recorded samples in seconds, zero if none was recorded."""
+        return self.total / self.count if self.count else 0
+
+    def stats(self) -> Dict[str, float]:
+        """Provide sample count and latencies in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean() * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "last_ms": round(self.last * 1000, 3),
+        }
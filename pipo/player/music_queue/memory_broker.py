@@ -0,0 +1,547 @@
+import asyncio
+import collections
+import functools
+import importlib.metadata
+import itertools
+import logging
+import re
+import time
+from enum import StrEnum
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from aio_pika import IncomingMessage, Message
+from aiormq.abc import DeliveredMessage
+from faststream.rabbit import ExchangeType, RabbitBroker, RabbitExchange, RabbitQueue
+from faststream.rabbit.publisher.producer import AioPikaFastProducer
+from faststream.rabbit.schemas import RABBIT_REPLY
+from pamqp import commands as spec
+from pamqp.header import ContentHeader
+
+
+class Transport(StrEnum):
+    """How broker messages are carried between subscribers."""
+
+    RABBITMQ = "rabbitmq"
+    MEMORY = "memory"
+
+
+# FastStream releases whose broker internals MemoryBroker stands in for
+FASTSTREAM_VERSIONS = ((0, 5, 27), (0, 6))
+
+
+class UnsupportedExchangeError(ValueError):
+    """Exchange type has no in memory routing."""
+
+    def __init__(self, type: ExchangeType) -> None:
+        super().__init__(f"Exchange type not supported in memory: {type}")
+
+
+class UnsupportedFastStreamError(RuntimeError):
+    """FastStream release has broker internals unknown to the memory transport."""
+
+    def __init__(self, version: str) -> None:
+        minimum, maximum = (".".join(map(str, v)) for v in FASTSTREAM_VERSIONS)
+        super().__init__(
+            f"Memory transport requires FastStream >={minimum},<{maximum}, "
+            f"found {version}"
+        )
+
+
+@functools.lru_cache(maxsize=4096)
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    """Whether routing key matches topic binding pattern, as done by RabbitMQ."""
+
+    def matches(pattern: Tuple[str, ...], words: Tuple[str, ...]) -> bool:
+        if not pattern:
+            return not words
+        head, rest = pattern[0], pattern[1:]
+        if head == "#":
+            return any(matches(rest, words[skip:]) for skip in range(len(words) + 1))
+        return bool(words) and head in ("*", words[0]) and matches(rest, words[1:])
+
+    return matches(tuple(pattern.split(".")), tuple(routing_key.split(".")))
+
+
+class _Envelope:
+    """Message held by a queue, along with its delivery state."""
+
+    message: Message
+    exchange: str
+    routing_key: str
+    returns: int
+    expires_at: Optional[float]
+
+    def __init__(
+        self,
+        message: Message,
+        exchange: str,
+        routing_key: str,
+        ttl: Optional[int] = None,
+    ) -> None:
+        self.message = message
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.returns = 0
+        self.expires_at = None if ttl is None else time.monotonic() + ttl / 1000
+
+
+class MemoryQueue:
+    """In-process stand-in for an aio-pika queue.
+
+    Messages are delivered to consumers as aio-pika incoming messages, which the
+    queue settles itself, acting as their channel. Queue arguments are honoured
+    as RabbitMQ does for dead lettering: messages rejected without requeue,
+    requeued more than ``x-delivery-limit`` times or older than
+    ``x-message-ttl`` milliseconds are routed to ``x-dead-letter-exchange`` with
+    ``x-dead-letter-routing-key``, or dropped if no exchange is set. Messages
+    requeued are delivered again ahead of the others, as RabbitMQ keeps their
+    position.
+
+    Attributes
+    ----------
+    name : str
+        Queue name.
+    arguments : Dict[str, Any]
+        Queue arguments.
+    passive : bool
+        Whether queue was only looked up, never the case in memory.
+    """
+
+    name: str
+    arguments: Dict[str, Any]
+    passive: bool
+    __vhost: "MemoryVirtualHost"
+    __messages: asyncio.Queue
+    __messages: Deque[_Envelope]
+    __available: asyncio.Event
+    __unacked: Dict[int, _Envelope]
+    __consumers: Dict[str, asyncio.Task]
+    __delivery_tags: itertools.count
+
+    def __init__(
+        self,
+        vhost: "MemoryVirtualHost",
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.arguments = dict(arguments or {})
+        self.passive = False
+        self.__vhost = vhost
+        self.__messages = collections.deque()
+        self.__available = asyncio.Event()
+        self.__unacked = {}
+        self.__consumers = {}
+        self.__delivery_tags = itertools.count(1)
+
+    @property
+    def channel(self) -> "MemoryQueue":
+        """Channel settling deliveries, the queue itself."""
+        return self
+
+    @property
+    def connection(self) -> "MemoryVirtualHost":
+        """Virtual host the queue belongs to."""
+        return self.__vhost
+
+    @property
+    def is_closed(self) -> bool:
+        """Whether virtual host was closed."""
+        return self.__vhost.is_closed
+
+    def size(self) -> int:
+        """Count messages waiting for delivery."""
+        return len(self.__messages)
+
+    async def bind(
+        self,
+        exchange: "MemoryExchange",
+        routing_key: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Route messages published to exchange with matching key to queue."""
+        exchange.add_binding(self, routing_key or self.name)
+
+    async def consume(
+        self,
+        callback: Callable[[IncomingMessage], Awaitable[Any]],
+        **kwargs: Any,
+    ) -> str:
+        """Start delivering messages to callback, providing consumer tag.
+
+        Deliveries being processed by the consumer are limited by the prefetch
+        count of the virtual host when it starts consuming.
+        """
+        tag = f"ctag.{self.name}.{next(self.__vhost.consumer_tags)}"
+        # unlimited deliveries if unset, as done by RabbitMQ
+        prefetch = asyncio.Semaphore(self.__vhost.prefetch_count or 2**31)
+        self.__consumers[tag] = asyncio.get_running_loop().create_task(
+            self.__consume(callback, tag, prefetch), name=tag
+        )
+        return tag
+
+    async def cancel(self, consumer_tag: str, **kwargs: Any) -> None:
+        """Stop delivering messages to consumer, letting ongoing deliveries end."""
+        task = self.__consumers.pop(consumer_tag, None)
+        if task is not None:
+            task.cancel()
+
+    def put(self, message: Message, exchange: str, routing_key: str) -> None:
+        """Enqueue message routed to queue."""
+        self.__messages.append(
+            _Envelope(
+                message, exchange, routing_key, self.arguments.get("x-message-ttl")
+            )
+        )
+        self.__available.set()
+
+    def __requeue(self, envelope: _Envelope) -> None:
+        """Enqueue message again, ahead of messages not delivered yet."""
+        self.__messages.appendleft(envelope)
+        self.__available.set()
+
+    async def __get(self) -> _Envelope:
+        """Wait for a message, dequeuing it."""
+        while not self.__messages:
+            self.__available.clear()
+            await self.__available.wait()
+        return self.__messages.popleft()
+
+    async def __consume(
+        self,
+        callback: Callable[[IncomingMessage], Awaitable[Any]],
+        tag: str,
+        prefetch: asyncio.Semaphore,
+    ) -> None:
+        """Deliver messages to callback, within consumer prefetch limit."""
+        while True:
+            # messages stay queued while prefetch is exhausted, as with RabbitMQ
+            await prefetch.acquire()
+            try:
+                envelope = await self.__get()
+            except asyncio.CancelledError:
+                prefetch.release()
+                raise
+            if (
+                envelope.expires_at is not None
+                and envelope.expires_at <= time.monotonic()
+            ):
+                prefetch.release()
+                self.__dead_letter(envelope)
+                continue
+            self.__vhost.track(self.__deliver(callback, envelope, tag, prefetch))
+
+    async def __deliver(
+        self,
+        callback: Callable[[IncomingMessage], Awaitable[Any]],
+        envelope: _Envelope,
+        tag: str,
+        prefetch: asyncio.Semaphore,
+    ) -> None:
+        delivery_tag = next(self.__delivery_tags)
+        self.__unacked[delivery_tag] = envelope
+        try:
+            await callback(
+                IncomingMessage(
+                    DeliveredMessage(
+                        delivery=spec.Basic.Deliver(
+                            consumer_tag=tag,
+                            delivery_tag=delivery_tag,
+                            redelivered=envelope.returns > 0,
+                            exchange=envelope.exchange,
+                            routing_key=envelope.routing_key,
+                        ),
+                        header=ContentHeader(
+                            body_size=len(envelope.message.body),
+                            properties=envelope.message.properties,
+                        ),
+                        body=envelope.message.body,
+                        channel=self,
+                    )
+                )
+            )
+        except Exception:
+            logging.getLogger(__name__).exception(
+                "Unexpected error consuming from queue %s", self.name
+            )
+        finally:
+            prefetch.release()
+            # unsettled deliveries are requeued, as done when a channel closes
+            if self.__unacked.pop(delivery_tag, None) is not None:
+                self.__requeue(envelope)
+
+    async def basic_ack(self, delivery_tag: int, multiple: bool = False) -> None:
+        """Settle delivery as processed."""
+        self.__unacked.pop(delivery_tag, None)
+
+    async def basic_reject(self, delivery_tag: int, requeue: bool = True) -> None:
+        """Settle delivery as failed, requeuing it within delivery limit."""
+        envelope = self.__unacked.pop(delivery_tag, None)
+        if envelope is None:
+            return
+        if not requeue:
+            self.__dead_letter(envelope)
+            return
+        envelope.returns += 1
+        limit = self.arguments.get("x-delivery-limit")
+        if limit is not None and envelope.returns > limit:
+            self.__dead_letter(envelope)
+        else:
+            self.__requeue(envelope)
+
+    async def basic_nack(
+        self, delivery_tag: int, multiple: bool = False, requeue: bool = True
+    ) -> None:
+        """Settle delivery as failed, as done by :meth:`basic_reject`."""
+        await self.basic_reject(delivery_tag, requeue)
+
+    def __dead_letter(self, envelope: _Envelope) -> None:
+        """Route message to dead letter exchange, dropping it if there is none."""
+        exchange = self.__vhost.exchanges.get(
+            self.arguments.get("x-dead-letter-exchange")
+        )
+        if exchange is None:
+            logging.getLogger(__name__).debug(
+                "Dropped message from queue %s: %s", self.name, envelope.message
+            )
+            return
+        exchange.route(
+            envelope.message,
+            self.arguments.get("x-dead-letter-routing-key", envelope.routing_key),
+        )
+
+    def close(self) -> None:
+        """Stop every consumer."""
+        for tag in list(self.__consumers):
+            self.__consumers.pop(tag).cancel()
+
+
+class MemoryExchange:
+    """In-process stand-in for an aio-pika exchange.
+
+    Direct, fanout and topic exchanges route as RabbitMQ does, every queue
+    receiving a message once regardless of how many of its bindings match. The
+    default exchange, without name, routes to the queue named as the key.
+
+    Attributes
+    ----------
+    name : str
+        Exchange name.
+    type : ExchangeType
+        Routing strategy.
+    """
+
+    name: str
+    type: ExchangeType
+    __vhost: "MemoryVirtualHost"
+    __bindings: List[Tuple[Union[MemoryQueue, "MemoryExchange"], str]]
+
+    def __init__(
+        self, vhost: "MemoryVirtualHost", name: str, type: ExchangeType
+    ) -> None:
+        if type not in (ExchangeType.DIRECT, ExchangeType.FANOUT, ExchangeType.TOPIC):
+            raise UnsupportedExchangeError(type)
+        self.name = name
+        self.type = type
+        self.__vhost = vhost
+        self.__bindings = []
+
+    def add_binding(
+        self, destination: Union[MemoryQueue, "MemoryExchange"], routing_key: str
+    ) -> None:
+        """Route messages with matching key to destination."""
+        if (destination, routing_key) not in self.__bindings:
+            self.__bindings.append((destination, routing_key))
+
+    async def bind(
+        self, exchange: "MemoryExchange", routing_key: str = "", **kwargs: Any
+    ) -> None:
+        """Route messages published to exchange with matching key to this one."""
+        exchange.add_binding(self, routing_key)
+
+    async def publish(self, message: Message, routing_key: str, **kwargs: Any) -> None:
+        """Route message to bound queues, dropping it if none matches."""
+        self.route(message, routing_key)
+
+    def route(self, message: Message, routing_key: str) -> None:
+        """Enqueue message in every queue bound with a matching key."""
+        queues = self.__destinations(routing_key, set())
+        if not queues:
+            logging.getLogger(__name__).debug(
+                "Dropped unroutable message from exchange %s with key %s",
+                self.name,
+                routing_key,
+            )
+        for queue in queues:
+            queue.put(message, self.name, routing_key)
+
+    def __destinations(
+        self, routing_key: str, visited: Set["MemoryExchange"]
+    ) -> Set[MemoryQueue]:
+        visited.add(self)
+        if not self.name:
+            queue = self.__vhost.queues.get(routing_key)
+            return {queue} if queue else set()
+        queues = set()
+        for destination, binding_key in self.__bindings:
+            if not self.__matches(binding_key, routing_key):
+                continue
+            if isinstance(destination, MemoryQueue):
+                queues.add(destination)
+            elif destination not in visited:
+                queues |= destination.__destinations(routing_key, visited)
+        return queues
+
+    def __matches(self, binding_key: str, routing_key: str) -> bool:
+        if self.type == ExchangeType.FANOUT:
+            return True
+        if self.type == ExchangeType.TOPIC:
+            return topic_matches(binding_key, routing_key)
+        return binding_key == routing_key
+
+
+class MemoryVirtualHost:
+    """In-process stand-in for a RabbitMQ virtual host, reached through a channel.
+
+    Declares queues and exchanges in place of a
+    :class:`faststream.rabbit.helpers.declarer.RabbitDeclarer`, and serves as
+    the broker connection. Deliveries being processed across every queue are
+    limited per consumer by a prefetch count, as set on a RabbitMQ channel
+    without global flag.
+
+    Attributes
+    ----------
+    queues : Dict[str, MemoryQueue]
+        Declared queues by name.
+    exchanges : Dict[str, MemoryExchange]
+        Declared exchanges by name, including the default exchange.
+    prefetch_count : int
+        Unsettled deliveries allowed to consumers started from now on,
+        unlimited if zero.
+    consumer_tags : itertools.count
+        Source of consumer tag numbers.
+    basic_nack : bool
+        Server capability checked before nacking messages, always available.
+    """
+
+    queues: Dict[str, MemoryQueue]
+    exchanges: Dict[str, MemoryExchange]
+    prefetch_count: int
+    consumer_tags: itertools.count
+    basic_nack: bool = True
+    __deliveries: Set[asyncio.Task]
+    __closed: bool
+
+    def __init__(self) -> None:
+        self.queues = {}
+        self.exchanges = {"": MemoryExchange(self, "", ExchangeType.DIRECT)}
+        self.prefetch_count = 0
+        self.consumer_tags = itertools.count(1)
+        self.__deliveries = set()
+        self.__closed = False
+
+    @property
+    def is_closed(self) -> bool:
+        """Whether virtual host was closed."""
+        return self.__closed
+
+    async def declare_queue(
+        self, queue: RabbitQueue, passive: bool = False
+    ) -> MemoryQueue:
+        """Declare queue, providing existing one if already declared."""
+        if queue.name not in self.queues:
+            self.queues[queue.name] = MemoryQueue(self, queue.name, queue.arguments)
+        return self.queues[queue.name]
+
+    async def declare_exchange(
+        self, exchange: RabbitExchange, passive: bool = False
+    ) -> MemoryExchange:
+        """Declare exchange and its parents, providing existing one if declared.
+
+        Exchanges looked up passively are declared as well, as there are no
+        exchanges left from previous runs in memory.
+        """
+        if exchange.name not in self.exchanges:
+            self.exchanges[exchange.name] = MemoryExchange(
+                self, exchange.name, exchange.type
+            )
+            if exchange.bind_to is not None:
+                parent = await self.declare_exchange(exchange.bind_to)
+                await self.exchanges[exchange.name].bind(parent, exchange.routing)
+        return self.exchanges[exchange.name]
+
+    def track(self, delivery: Awaitable[None]) -> None:
+        """Run delivery in background until done."""
+        task = asyncio.get_running_loop().create_task(delivery)
+        self.__deliveries.add(task)
+        task.add_done_callback(self.__deliveries.discard)
+
+    async def set_qos(self, prefetch_count: int = 0, **kwargs: Any) -> None:
+        """Limit unsettled deliveries of consumers started from now on."""
+        self.prefetch_count = prefetch_count
+
+    async def close(self) -> None:
+        """Stop consumers and cancel deliveries still being processed."""
+        if self.__closed:
+            return
+        self.__closed = True
+        for queue in self.queues.values():
+            queue.close()
+        for task in list(self.__deliveries):
+            task.cancel()
+        await asyncio.gather(*self.__deliveries, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Provide number of messages waiting in each queue."""
+        return {name: queue.size() for name, queue in self.queues.items()}
+
+
+class MemoryBroker(RabbitBroker):
+    """RabbitMQ broker carrying messages through in-process queues instead.
+
+    Meant for single node deployments, it runs the same subscribers and
+    publishers, with the same routing, dead lettering and ``max_consumers``
+    concurrency limit per subscriber, without reaching RabbitMQ. Messages are
+    still encoded, so middlewares and validation behave as with RabbitMQ, but
+    neither survive restarts nor are shared among processes.
+
+    Connecting stands in for internals of :class:`RabbitBroker`, so only
+    FastStream releases within :data:`FASTSTREAM_VERSIONS` are supported.
+
+    Raises
+    ------
+    UnsupportedFastStreamError
+        If installed FastStream release is not supported.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        version = importlib.metadata.version("faststream")
+        minimum, maximum = FASTSTREAM_VERSIONS
+        if not minimum <= tuple(map(int, re.findall(r"\d+", version)[:3])) < maximum:
+            raise UnsupportedFastStreamError(version)
+        super().__init__(*args, **kwargs)
+
+    async def _connect(self, *args: Any, **kwargs: Any) -> MemoryVirtualHost:
+        vhost = MemoryVirtualHost()
+        # virtual host serves as connection, channel and declarer alike
+        self._channel = self.declarer = vhost
+        self._producer = AioPikaFastProducer(
+            declarer=vhost,
+            decoder=self._decoder,
+            parser=self._parser,
+        )
+        await vhost.declare_queue(RABBIT_REPLY)
+        if self._max_consumers:
+            await vhost.set_qos(prefetch_count=int(self._max_consumers))
+        return vhost
@@ -1,3 +1,10 @@
-from pipo.player.music_queue.models.provider import ProviderOperation
+from pipo.player.music_queue.models.provider import (
+    Lane,
+    ProviderBatchOperation,
+    ProviderItem,
+    ProviderOperation,
+)
 from pipo.player.music_queue.models.music_request import MusicRequest
-from pipo.player.music_queue.models.music import Music
\ No newline at end of file
+from pipo.player.music_queue.models.music import Music
+from pipo.player.music_queue.models.progress_report import ProgressReport
+from pipo.player.music_queue.models.trusted import TrustedModel, TrustedPayload
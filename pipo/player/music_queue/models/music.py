@@ -1,9 +1,23 @@
-from pydantic import BaseModel, Field, HttpUrl
+from typing import Optional
 
+from pydantic import Field, HttpUrl
 
-class Music(BaseModel):
+from pipo.player.music_queue.models.provider import Lane
+from pipo.player.music_queue.models.trusted import TrustedModel
+
+
+class Music(TrustedModel):
     uuid: str = Field(
         pattern=r"^[0-9a-f]{8}-[0-9a-f]{4}-7[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$"
     )
     server_id: str
     source: HttpUrl
+    origin: Optional[HttpUrl] = None
+    codec: Optional[str] = None
+    container: Optional[str] = None
+    bitrate: Optional[float] = Field(default=None, gt=0)
+    duration: Optional[float] = Field(default=None, ge=0)
+    lane: Lane = Lane.INTERACTIVE
+    position: int = Field(default=0, ge=0)
+    ordinal: int = Field(default=0, ge=0)
+    final: bool = True
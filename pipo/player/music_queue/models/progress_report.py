@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+
+
+class ProgressReport(BaseModel):
+    """Change in the expected outcome of a music request.
+
+    Published by pipeline hops to the guild which made the request, as expected
+    musics are only known once playlists and albums are expanded. Hops expanding
+    a request report the expansions they spawn and their own, once finished, as
+    music may reach the guild ahead of the report raising its expected musics.
+    """
+
+    uuid: str = Field(
+        pattern=r"^[0-9a-f]{8}-[0-9a-f]{4}-7[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$"
+    )
+    server_id: str
+    expected: int = 0
+    failed: int = Field(default=0, ge=0)
+    expansions: int = 0
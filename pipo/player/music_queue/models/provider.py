@@ -1,4 +1,5 @@
 from enum import StrEnum
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -10,6 +11,13 @@ class Provider(StrEnum):
     SPOTIFY = "spotify"
 
 
+class Lane(StrEnum):
+    """Pipeline lanes, keeping interactive requests apart from bulk expansions."""
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
 class ProviderOperation(BaseModel):
     uuid: str = Field(
         pattern=r"^[0-9a-f]{8}-[0-9a-f]{4}-7[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$"
@@ -19,3 +27,40 @@ class ProviderOperation(BaseModel):
     operation: str
     shuffle: bool = False
     query: str
+    spotify_id: Optional[str] = None
+    isrc: Optional[str] = None
+    lane: Lane = Lane.INTERACTIVE
+    position: int = Field(default=0, ge=0)
+    ordinal: int = Field(default=0, ge=0)
+    final: bool = True
+
+
+class ProviderItem(BaseModel):
+    """Single query of a batch operation.
+
+    Position is shared by every item of the batch, ordinal telling the item apart.
+    """
+
+    ordinal: int = Field(ge=0)
+    query: str
+    spotify_id: Optional[str] = None
+    isrc: Optional[str] = None
+    final: bool = False
+
+
+class ProviderBatchOperation(BaseModel):
+    """Operation over several queries of the same request, such as playlist tracks.
+
+    Published as a single message, sparing one round trip per query.
+    """
+
+    uuid: str = Field(
+        pattern=r"^[0-9a-f]{8}-[0-9a-f]{4}-7[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$"
+    )
+    provider: str = Field(pattern=r"^[\d\w]*.[\d\w]*.[\d\w]*$")
+    server_id: str
+    operation: str
+    shuffle: bool = False
+    items: List[ProviderItem] = Field(min_length=1)
+    lane: Lane = Lane.BULK
+    position: int = Field(default=0, ge=0)
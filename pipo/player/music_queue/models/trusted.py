@@ -0,0 +1,77 @@
+from typing import Any, Callable, Dict, FrozenSet, Set
+
+from pydantic import BaseModel, model_validator
+
+
+class TrustedPayload(dict):
+    """Decoded message body produced by a trusted internal hop.
+
+    Behaves as the plain decoded dictionary, only marking that its content was
+    built, and thus validated, by a previous hop of the pipeline.
+    """
+
+
+class TrustedModel(BaseModel):
+    """Model skipping validation of trusted payloads.
+
+    Payloads other than :class:`TrustedPayload` are fully validated. Trusted
+    payloads holding every required field are instead set as model state as is,
+    sparing the validation cost of patterns and urls checked by the hop which
+    built the message. Fields of such models keep their decoded values, urls
+    remaining plain strings. Models with nested models are not supported.
+    """
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        """Collect required and default field values of subclass."""
+        super().__pydantic_init_subclass__(**kwargs)
+        fields = cls.model_fields.items()
+        cls.__required: FrozenSet[str] = frozenset(
+            name for name, field in fields if field.is_required()
+        )
+        cls.__defaults: Dict[str, Any] = {
+            name: field.default
+            for name, field in fields
+            if not field.is_required() and field.default_factory is None
+        }
+        cls.__factories: Dict[str, Callable[[], Any]] = {
+            name: field.default_factory
+            for name, field in fields
+            if field.default_factory is not None
+        }
+
+    @classmethod
+    def construct_trusted(cls, data: Dict[str, Any]) -> "TrustedModel":
+        """Build model from trusted data, without validating it.
+
+        Model state is set directly, as :meth:`model_construct` alone costs about
+        as much as validating small models.
+
+        Parameters
+        ----------
+        data : Dict[str, Any]
+            Field values, as dumped from a model of the same type.
+
+        Returns
+        -------
+        TrustedModel
+            Model holding data.
+        """
+        fields_set: Set[str] = set(data)
+        values = {**cls.__defaults, **data}
+        for name, factory in cls.__factories.items():
+            if name not in fields_set:
+                values[name] = factory()
+        model = cls.__new__(cls)
+        object.__setattr__(model, "__dict__", values)
+        object.__setattr__(model, "__pydantic_fields_set__", fields_set)
+        object.__setattr__(model, "__pydantic_extra__", None)
+        object.__setattr__(model, "__pydantic_private__", None)
+        return model
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _trusted_hop(cls, data: Any, handler: Any) -> Any:
+        if isinstance(data, TrustedPayload) and cls.__required <= data.keys():
+            return cls.construct_trusted(data)
+        return handler(data)
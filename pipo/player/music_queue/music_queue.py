@@ -1,19 +1,27 @@
 import asyncio
+import time
 from typing import Dict, Iterable, Optional
 
 from faststream import Logger
+from faststream.exceptions import NackMessage
 import uuid6
 import faststream.rabbit
-from expiringdict import ExpiringDict
 
 from pipo.config import settings
 from pipo.player.queue import PlayerQueue
+from pipo.player.music_queue.consumer_credits import ConsumerCredits
+from pipo.player.music_queue.latency_stats import LatencyStats
 from pipo.player.music_queue.models.music import Music
+from pipo.player.music_queue.models.provider import Lane
 from pipo.player.music_queue.models.music_request import MusicRequest
+from pipo.player.music_queue.models.progress_report import ProgressReport
+from pipo.player.music_queue.reorder_buffer import ReorderBuffer
+from pipo.player.music_queue.request_ledger import RequestLedger
 from pipo.player.music_queue._remote_music_queue import (
     broker,
     hub_queue,
     hub_exch,
+    progress_queue,
     server_publisher,
 )
 
@@ -25,22 +33,65 @@ class __RemoteMusicQueue(PlayerQueue):
     ----------
     __broker : faststream.rabbit.RabbitBroker
         Controls connection to remote queues.
+    ledger : RequestLedger
+        Progress of requests made by guild.
+    reorder : ReorderBuffer
+        Holds music obtained out of order, apart from local music queue capacity.
+    time_to_first_audio : Dict[Lane, LatencyStats]
+        Delay between adding a request and obtaining its first music, per lane.
+    credits : ConsumerCredits
+        Flow control of hub consumer, by free local music queue capacity.
     """
 
     server_id: str
-    __playable_music: asyncio.Queue[str]
+    __capacity: int
+    __playable_music: asyncio.Queue[Music]
     __publisher: faststream.rabbit.RabbitPublisher
-    __requests: Dict[str, int]
+    ledger: RequestLedger
+    reorder: ReorderBuffer
+    time_to_first_audio: Dict[Lane, LatencyStats]
+    credits: ConsumerCredits
 
     def __init__(self, server_id: str, queue_size: int) -> None:
         super().__init__()
-        self.__requests = ExpiringDict(
-            max_len=settings.player.queue.requests.max,
-            max_age_seconds=settings.player.queue.requests.timeout,
+        self.ledger = RequestLedger(
+            ttl=settings.player.queue.requests.timeout,
+            resolution=settings.player.queue.requests.resolution,
         )
+        self.time_to_first_audio = {lane: LatencyStats() for lane in Lane}
         self.server_id = server_id
         self.__publisher = server_publisher
-        self.__playable_music = asyncio.Queue(queue_size)
+        window = settings.player.queue.reorder.window
+        self.reorder = ReorderBuffer(
+            self.__store,
+            # held music may at most double local music queue size
+            window=min(window, queue_size) if queue_size > 0 else window,
+            gap_timeout=settings.player.queue.reorder.gap_timeout,
+            tombstones=settings.player.queue.reorder.tombstones,
+            # requests are forgotten by then, their music being discarded
+            tombstone_ttl=settings.player.queue.requests.timeout,
+        )
+        self.__capacity = queue_size
+        # held music, once released, may exceed capacity by up to a reorder window
+        self.__playable_music = asyncio.Queue(
+            queue_size + self.reorder.window if queue_size > 0 else 0
+        )
+        self.credits = ConsumerCredits(self.__free_slots)
+
+    def __free_slots(self) -> int:
+        """Room left in local music queue, unbounded queues always having some.
+
+        Music held out of order takes no room, as the music it waits for may only
+        be obtained from the remote queue, which would never happen if hub
+        consumption was paused. It is bounded by the reorder window instead.
+        """
+        if self.__capacity <= 0:
+            return 1
+        return self.__capacity - self.__playable_music.qsize()
+
+    def __store(self, music: Music) -> None:
+        """Store music released in order by reorder buffer."""
+        self.__playable_music.put_nowait(music)
 
     @staticmethod
     def __generate_uuid() -> str:
@@ -55,48 +106,122 @@ class __RemoteMusicQueue(PlayerQueue):
             shuffle=shuffle,
             query=query,
         )
-        self.__requests[request.uuid] = 0
+        # dispatch expands queries into sources, some of them expanded further
+        self.ledger.open(request.uuid, expected=len(request.query), expanding=1)
         self._logger.info("Adding request: %s", request.uuid)
         await self.__publisher.publish(request)
 
-    async def _add_music(self, request: Music):
+    async def _add_music(self, request: Music) -> bool:
+        """Store music obtained from remote queue, if there is room for it.
+
+        Hub consumer is paused once local queue is full, so further music is kept
+        in remote queue until some is played.
+
+        Parameters
+        ----------
+        request : Music
+            Music obtained from remote queue.
+
+        Returns
+        -------
+        bool
+            Whether music was handled, False if it should be requeued.
+        """
         music = str(request.source)
-        if request.uuid in self.__requests:
-            self._logger.debug("Item obtained from remote music queue: %s", music)
-            try:
-                self.__requests[request.uuid] = +1
-                await asyncio.wait_for(
-                    self.__playable_music.put(music),
-                    timeout=settings.player.queue.timeout.consume,
-                )
-                self._logger.debug("Item stored in local music queue: %s", music)
-            except asyncio.TimeoutError:
-                self._logger.warning(
-                    "Item consumption from remote queue timed out: %s", request.uuid
-                )
-        else:
+        if self.ledger.get(request.uuid) is None:
             self._logger.warning("Item obtained was discarded: %s", music)
+            return True
+        if self.__free_slots() <= 0:
+            await self.credits.update()
+            self._logger.debug("Local music queue full, requeuing: %s", music)
+            return False
+        self._logger.debug("Item obtained from remote music queue: %s", music)
+        self.__record_first_audio(request)
+        progress = self.ledger.resolve(request.uuid)
+        self.reorder.push(request)
+        if progress.done():
+            self.reorder.flush(request.uuid)
+        self._logger.debug("Item stored in local music queue: %s", music)
+        await self.credits.update()
+        return True
+
+    def __record_first_audio(self, music: Music) -> None:
+        """Record time to first audio of music request lane, if first obtained."""
+        progress = self.ledger.get(music.uuid)
+        if music.lane not in progress.lanes:
+            progress.lanes.add(music.lane)
+            self.time_to_first_audio[music.lane].record(
+                time.monotonic() - progress.submitted_at
+            )
+
+    def _add_progress(self, report: ProgressReport) -> None:
+        """Record progress reported by pipeline for a request."""
+        if not self.ledger.report(
+            report.uuid, report.expected, report.failed, report.expansions
+        ):
+            self._logger.debug("Progress of unknown request discarded: %s", report)
+        elif self.ledger.get(report.uuid).done():
+            # no further music expected, held music needs not wait for missing one
+            self.reorder.flush(report.uuid)
+
+    async def get(self, timeout: int = 0) -> Optional[Music]:
+        """Get one music, waiting for it while requests are outstanding.
 
-    async def get(self, timeout: int = 0) -> Optional[str]:
+        Parameters
+        ----------
+        timeout : int, optional
+            Seconds to wait at most, by default ``timeout.get_op`` setting.
+
+        Returns
+        -------
+        Optional[Music]
+            Music, None if no request is outstanding or no music was obtained
+            before timeout.
+        """
         timeout = timeout if timeout > 0 else settings.player.queue.timeout.get_op
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        getter = asyncio.ensure_future(self.__playable_music.get())
         try:
-            music = await asyncio.wait_for(self.__playable_music.get(), timeout=timeout)
-            self._logger.debug("Item obtained from music queue: %s", music)
-            return music
-        except asyncio.TimeoutError:
+            # requests may be added once idle, before this task is resumed
+            while not getter.done() and loop.time() < deadline:
+                idle = asyncio.ensure_future(self.ledger.wait_idle())
+                try:
+                    await asyncio.wait(
+                        (getter, idle),
+                        timeout=deadline - loop.time(),
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                finally:
+                    idle.cancel()
+                if not getter.done() and self.ledger.idle():
+                    self._logger.debug(
+                        "Get operation ended, no request is outstanding."
+                    )
+                    return None
+        finally:
+            getter.cancel()
+        if not getter.done() or getter.cancelled():
             self._logger.debug("Get operation timed out.")
-        return None
+            return None
+        music = getter.result()
+        self._logger.debug("Item obtained from music queue: %s", music.source)
+        self.ledger.play(music.uuid)
+        await self.credits.update()
+        return music
 
     def size(self) -> int:
         return self.__playable_music.qsize()
 
     def clear(self) -> None:
-        self.__requests.clear()
+        self.ledger.clear()
+        self.reorder.clear()
         try:
             while not self.__playable_music.empty():
                 self.__playable_music.get_nowait()
         except asyncio.QueueEmpty:
             self._logger.warning("There was an error cleaning locally stored music.")
+        self.credits.schedule_update()
         self._logger.info("Locally stored music cleaned.")
 
 
@@ -105,11 +230,32 @@ music_queue = __RemoteMusicQueue(
 )
 
 
-@broker.subscriber(
+hub_subscriber = broker.subscriber(
     queue=hub_queue,
     exchange=hub_exch,
     description="Consumes from hub exchange bound hub client exclusive queue",
 )
+
+
+@hub_subscriber
 async def consume_music(request: Music, logger: Logger) -> None:
+    """Store music obtained for this guild, requeuing it if there is no room."""
     logger.info("Received request: %s", request.uuid)
-    await music_queue._add_music(request)
+    if not await music_queue._add_music(request):
+        raise NackMessage(requeue=True)
+
+
+# credits control the subscriber consumer, not the handler it decorates
+music_queue.credits.bind(hub_subscriber)
+
+
+@broker.subscriber(
+    queue=progress_queue,
+    exchange=hub_exch,
+    description="Consumes request progress from hub exchange "
+    "bound client exclusive queue",
+)
+async def consume_progress(report: ProgressReport, logger: Logger) -> None:
+    """Record progress of a request made by this guild."""
+    logger.debug("Received progress: %s", report)
+    music_queue._add_progress(report)
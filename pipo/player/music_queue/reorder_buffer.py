@@ -0,0 +1,177 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pipo.player.audio_source.expiring_cache import ExpiringLRUCache
+from pipo.player.music_queue.models.music import Music
+
+
+class _Stream:
+    """Reordering state of a single request."""
+
+    uuid: str
+    next: Tuple[int, int]
+    pending: List[Tuple[Tuple[int, int], int, Music]]
+    timer: Optional[asyncio.TimerHandle]
+
+    def __init__(self, uuid: str) -> None:
+        self.uuid = uuid
+        self.next = (0, 0)
+        self.pending = []
+        self.timer = None
+
+
+class ReorderBuffer:
+    """Releases music of each request in the order it was requested.
+
+    Music is sequenced by the position of the query it originates from and its
+    ordinal among the musics that query expands into, the last of which is
+    marked as final. Music arriving ahead of its predecessors is held until they
+    arrive. A missing music is skipped once nothing was released for
+    :attr:`gap_timeout` seconds, or once :attr:`window` musics are held, so a
+    slow or failed extraction delays playback only for a bounded time. Skipped
+    music arriving afterwards is released at once, out of order, rather than
+    dropped, as it was still requested. Likewise, music of a flushed request is
+    released at once, its stream being remembered for :attr:`tombstone_ttl`
+    seconds rather than restarted from its first music.
+
+    Attributes
+    ----------
+    window : int
+        Maximum number of musics held.
+    gap_timeout : float
+        Seconds to wait for a missing music before skipping it.
+    tombstone_ttl : float
+        Seconds flushed requests are remembered.
+    held : int
+        Number of musics currently held.
+    skipped : int
+        Number of times missing music was skipped.
+    """
+
+    window: int
+    gap_timeout: float
+    tombstone_ttl: float
+    held: int
+    skipped: int
+    __release: Callable[[Music], None]
+    __streams: Dict[str, _Stream]
+    __flushed: ExpiringLRUCache[Tuple[int, int]]
+    __counter: itertools.count
+
+    def __init__(
+        self,
+        release: Callable[[Music], None],
+        window: int,
+        gap_timeout: float,
+        tombstones: int = 1024,
+        tombstone_ttl: float = math.inf,
+    ) -> None:
+        self.window = max(window, 1)
+        self.gap_timeout = gap_timeout
+        self.tombstone_ttl = tombstone_ttl
+        self.held = 0
+        self.skipped = 0
+        self.__release = release
+        self.__streams = {}
+        # music expected next by flushed streams, by request
+        self.__flushed = ExpiringLRUCache(tombstones, clock=time.monotonic)
+        self.__counter = itertools.count()
+
+    def push(self, music: Music) -> None:
+        """Add music, releasing it and any held successors if next in order."""
+        if self.__flushed.get(music.uuid) is not None:
+            # no further music was expected, predecessors may never arrive
+            self.__release(music)
+            return
+        stream = self.__streams.get(music.uuid)
+        if stream is None:
+            stream = self.__streams[music.uuid] = _Stream(music.uuid)
+        sequence = (music.position, music.ordinal)
+        if sequence < stream.next:
+            # skipped already, its successors were released, so it is played late
+            self.__release(music)
+            return
+        heapq.heappush(stream.pending, (sequence, next(self.__counter), music))
+        self.held += 1
+        released = self.__drain(stream)
+        while self.held > self.window:
+            fullest = self.__fullest()
+            self.__skip(fullest)
+            if fullest is not stream:
+                self.__reschedule(fullest)
+            released = True
+        if released or stream.timer is None:
+            self.__reschedule(stream)
+
+    def flush(self, uuid: str) -> None:
+        """Release every held music of request, as no further music is expected."""
+        stream = self.__streams.pop(uuid, None)
+        if stream is None:
+            return
+        if stream.timer is not None:
+            stream.timer.cancel()
+        while stream.pending:
+            self.__pop(stream)
+        self.__flushed.set(uuid, stream.next, time.monotonic() + self.tombstone_ttl)
+
+    def clear(self) -> None:
+        """Discard every held music."""
+        for stream in self.__streams.values():
+            if stream.timer is not None:
+                stream.timer.cancel()
+        self.__streams.clear()
+        self.__flushed.clear()
+        self.held = 0
+
+    def __pop(self, stream: _Stream) -> None:
+        """Release first held music of stream, expecting its successor next."""
+        _, _, music = heapq.heappop(stream.pending)
+        self.held -= 1
+        stream.next = (
+            (music.position + 1, 0)
+            if music.final
+            else (music.position, music.ordinal + 1)
+        )
+        self.__release(music)
+
+    def __drain(self, stream: _Stream) -> bool:
+        """Release held music of stream while in order, whether any was released."""
+        released = False
+        while stream.pending and stream.pending[0][0] <= stream.next:
+            self.__pop(stream)
+            released = True
+        return released
+
+    def __skip(self, stream: _Stream) -> None:
+        """Skip missing music of stream, releasing first held one and successors."""
+        self.skipped += 1
+        self.__pop(stream)
+        self.__drain(stream)
+
+    def __fullest(self) -> _Stream:
+        return max(self.__streams.values(), key=lambda stream: len(stream.pending))
+
+    def __reschedule(self, stream: _Stream) -> None:
+        """Restart gap timeout of stream, if it holds any music."""
+        if stream.timer is not None:
+            stream.timer.cancel()
+            stream.timer = None
+        if stream.pending:
+            stream.timer = asyncio.get_running_loop().call_later(
+                self.gap_timeout, self.__timeout, stream
+            )
+
+    def __timeout(self, stream: _Stream) -> None:
+        """Skip missing music of request no longer worth waiting for."""
+        stream.timer = None
+        if stream.pending:
+            self.__skip(stream)
+        self.__reschedule(stream)
+
+    def stats(self) -> Dict[str, int]:
+        """Provide held music and skipped gap counters."""
+        return {"held": self.held, "skipped": self.skipped}
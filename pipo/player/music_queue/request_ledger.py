@@ -0,0 +1,283 @@
+import asyncio
+import contextlib
+import math
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Set
+
+from pipo.player.music_queue.models.provider import Lane
+
+
+class TimerWheel:
+    """Expires keys once a fixed time to live elapses since they were last touched.
+
+    Keys are kept in a ring of slots, one per resolution interval, so touching,
+    discarding and expiring keys costs constant time regardless of how many are
+    tracked. Keys expire up to one resolution interval late, provided the wheel is
+    advanced before touching keys.
+
+    Attributes
+    ----------
+    ttl : float
+        Seconds after which untouched keys expire.
+    resolution : float
+        Seconds spanned by each slot.
+    """
+
+    ttl: float
+    resolution: float
+    __slots: List[Set[Hashable]]
+    __positions: Dict[Hashable, int]
+    __tick: int
+    __clock: Callable[[], float]
+
+    def __init__(
+        self,
+        ttl: float,
+        resolution: float = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.resolution = resolution if resolution > 0 else 1
+        # spare slot, so keys touched late in a slot still live for a whole ttl
+        self.__slots = [set() for _ in range(math.ceil(ttl / self.resolution) + 2)]
+        self.__positions = {}
+        self.__clock = clock
+        self.__tick = self.__now()
+
+    def __now(self) -> int:
+        return int(self.__clock() // self.resolution)
+
+    def touch(self, key: Hashable) -> None:
+        """Track key, restarting its time to live."""
+        self.discard(key)
+        slot = (self.__tick + len(self.__slots) - 1) % len(self.__slots)
+        self.__slots[slot].add(key)
+        self.__positions[key] = slot
+
+    def discard(self, key: Hashable) -> None:
+        """Stop tracking key, if tracked."""
+        slot = self.__positions.pop(key, None)
+        if slot is not None:
+            self.__slots[slot].discard(key)
+
+    def advance(self) -> List[Hashable]:
+        """Move wheel to current time, providing keys which expired meanwhile."""
+        now = self.__now()
+        expired = []
+        for tick in range(
+            self.__tick + 1, min(now, self.__tick + len(self.__slots)) + 1
+        ):
+            slot = self.__slots[tick % len(self.__slots)]
+            for key in slot:
+                del self.__positions[key]
+            expired.extend(slot)
+            slot.clear()
+        self.__tick = max(now, self.__tick)
+        return expired
+
+    def clear(self) -> None:
+        """Stop tracking every key."""
+        for slot in self.__slots:
+            slot.clear()
+        self.__positions.clear()
+
+
+class RequestProgress:
+    """Progress of a music request.
+
+    Attributes
+    ----------
+    expected : int
+        Musics the request is expected to result in.
+    resolved : int
+        Musics obtained.
+    failed : int
+        Musics which could not be obtained.
+    played : int
+        Musics handed to the player.
+    expanding : int
+        Expansions of the request yet to finish reporting expected musics.
+    submitted_at : float
+        Monotonic time at which request was made.
+    lanes : Set[Lane]
+        Lanes from which music was already obtained.
+    """
+
+    expected: int
+    resolved: int
+    failed: int
+    played: int
+    expanding: int
+    submitted_at: float
+    lanes: Set[Lane]
+
+    def __init__(self, expected: int, submitted_at: float, expanding: int = 0) -> None:
+        self.expected = expected
+        self.resolved = 0
+        self.failed = 0
+        self.played = 0
+        self.expanding = expanding
+        self.submitted_at = submitted_at
+        self.lanes = set()
+
+    def done(self) -> bool:
+        """Whether expansions finished and every expected music settled.
+
+        Expected musics are settled once either obtained or failed.
+        """
+        return self.expanding <= 0 and self.resolved + self.failed >= self.expected
+
+
+class RequestLedger:
+    """Tracks progress of the music requests of a guild.
+
+    Requests are expected to result in one music per query, until pipeline hops
+    report otherwise, for instance once a playlist is expanded. Requests are
+    outstanding until their expansions finish and every expected music is either
+    obtained or reported as failed, or until no progress is recorded for :attr:`TimerWheel.ttl` seconds.
+    Every update costs constant time.
+
+    Attributes
+    ----------
+    outstanding : int
+        Number of requests still expecting music.
+    expired : int
+        Number of requests which expired while outstanding.
+    """
+
+    outstanding: int
+    expired: int
+    __requests: Dict[str, RequestProgress]
+    __wheel: TimerWheel
+    __idle: asyncio.Event
+    __clock: Callable[[], float]
+
+    def __init__(
+        self,
+        ttl: float,
+        resolution: float = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.outstanding = 0
+        self.expired = 0
+        self.__requests = {}
+        self.__wheel = TimerWheel(ttl, resolution, clock)
+        self.__idle = asyncio.Event()
+        self.__idle.set()
+        self.__clock = clock
+
+    def __update(self, uuid: str, progress: RequestProgress, was_done: bool) -> None:
+        """Account for a change in request progress, restarting its expiry."""
+        self.outstanding += was_done - progress.done()
+        self.__wheel.touch(uuid)
+        self.__signal()
+
+    def __signal(self) -> None:
+        if self.outstanding:
+            self.__idle.clear()
+        else:
+            self.__idle.set()
+
+    def __expire(self) -> None:
+        """Forget requests without recent progress."""
+        for uuid in self.__wheel.advance():
+            progress = self.__requests.pop(uuid)
+            if not progress.done():
+                self.outstanding -= 1
+                self.expired += 1
+        self.__signal()
+
+    def open(self, uuid: str, expected: int, expanding: int = 0) -> None:
+        """Start tracking request expected to result in given number of musics.
+
+        Parameters
+        ----------
+        uuid : str
+            Request identifier.
+        expected : int
+            Musics the request is expected to result in.
+        expanding : int, optional
+            Expansions which may change expected musics, by default 0.
+        """
+        self.__expire()
+        progress = RequestProgress(expected, self.__clock(), expanding)
+        self.__requests[uuid] = progress
+        self.__update(uuid, progress, was_done=True)
+
+    def get(self, uuid: str) -> Optional[RequestProgress]:
+        """Provide progress of request, None if not tracked."""
+        self.__expire()
+        return self.__requests.get(uuid)
+
+    def report(
+        self, uuid: str, expected: int = 0, failed: int = 0, expansions: int = 0
+    ) -> bool:
+        """Record change in expected musics, musics which failed and expansions.
+
+        Parameters
+        ----------
+        uuid : str
+            Request identifier.
+        expected : int, optional
+            Change in expected musics, by default 0.
+        failed : int, optional
+            Musics which could not be obtained, by default 0.
+        expansions : int, optional
+            Change in expansions yet to finish, by default 0.
+
+        Returns
+        -------
+        bool
+            Whether request is tracked.
+        """
+        progress = self.get(uuid)
+        if progress is None:
+            return False
+        was_done = progress.done()
+        progress.expected += expected
+        progress.failed += failed
+        progress.expanding += expansions
+        self.__update(uuid, progress, was_done)
+        return True
+
+    def resolve(self, uuid: str) -> Optional[RequestProgress]:
+        """Record music obtained for request, None if request is not tracked."""
+        progress = self.get(uuid)
+        if progress is not None:
+            was_done = progress.done()
+            progress.resolved += 1
+            self.__update(uuid, progress, was_done)
+        return progress
+
+    def play(self, uuid: str) -> None:
+        """Record music of request handed to the player."""
+        progress = self.get(uuid)
+        if progress is not None:
+            progress.played += 1
+            self.__wheel.touch(uuid)
+
+    def idle(self) -> bool:
+        """Whether no request is outstanding."""
+        self.__expire()
+        return not self.outstanding
+
+    async def wait_idle(self) -> None:
+        """Wait until no request is outstanding."""
+        while not self.idle():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.__idle.wait(), self.__wheel.resolution)
+
+    def clear(self) -> None:
+        """Stop tracking every request."""
+        self.__requests.clear()
+        self.__wheel.clear()
+        self.outstanding = 0
+        self.__signal()
+
+    def stats(self) -> Dict[str, int]:
+        """Provide request counters."""
+        return {
+            "requests": len(self.__requests),
+            "outstanding": self.outstanding,
+            "expired": self.expired,
+        }
@@ -4,9 +4,12 @@
 import asyncio
 import hashlib
 import logging
-from typing import List, Union
+from typing import Callable, List, Optional, Tuple, Union
+
+import discord
 
 from pipo.config import settings
+from pipo.player.music_queue.models.music import Music
 from pipo.player.music_queue.music_queue import music_queue
 from pipo.player.queue import PlayerQueue
 
@@ -19,6 +22,9 @@ class Player:
     calling :meth:`~Player.play`. A thread is used to stream audio to Discord
     until the music queue is exhausted. Whether such thread is allowed to continue
     consuming the queue is specified using :attr:`~Player.can_play`.
+    While music is playing, a look-ahead task obtains the following music from
+    queue and prepares it, resolving and probing its audio stream, so it is ready
+    once current music ends. Audio streams are only opened once music is played.
 
     Attributes
     ----------
@@ -28,6 +34,13 @@ class Player:
         Class logger.
     __player_thread : asyncio.Task
         Obtains and plays music from :attr:`~Player._music_queue`.
+    __prefetcher : asyncio.Task
+        Prepares upcoming music from :attr:`~Player._music_queue`.
+    __prefetched : asyncio.Queue
+        Music ready to be played along with its audio source opener, `None`
+        signals no more music is available.
+    __prefetch_slots : asyncio.Semaphore
+        Bounds prepared but not yet played music to look-ahead depth.
     _music_queue : :class:`~pipo.player.music_queue.music_queue.MusicQueue`
         Stores music to play.
     can_play : asyncio.Event
@@ -37,6 +50,11 @@ class Player:
     __bot: None
     __logger: logging.Logger
     __player_thread: asyncio.Task
+    __prefetcher: Optional[asyncio.Task]
+    __prefetched: asyncio.Queue[
+        Optional[Tuple[Music, Callable[[], discord.AudioSource]]]
+    ]
+    __prefetch_slots: asyncio.Semaphore
     _player_queue: PlayerQueue
     can_play: asyncio.Event
 
@@ -52,8 +70,16 @@ class Player:
         self.__bot = bot
         self._player_queue = music_queue
         self.__player_thread = None
+        self.__prefetcher = None
+        self.__prefetched = asyncio.Queue()
+        self.__prefetch_slots = asyncio.Semaphore(self.__lookahead_depth())
         self.can_play = asyncio.Event()
 
+    @staticmethod
+    def __lookahead_depth() -> int:
+        """Provide number of musics prepared ahead of currently playing one."""
+        return max(settings.player.prefetch.depth, 1)
+
     def clear(self) -> None:
         """Reset music queue and halt currently playing audio."""
         self.__logger.info("Clearing Player state...")
@@ -62,14 +88,16 @@ class Player:
         if self.__player_thread:
             self.__player_thread.cancel()
         self.__logger.info("Canceled player thread")
-        self.__bot.voice_client.stop()
+        self.__stop_prefetch()
+        self.__logger.info("Discarded prefetched music")
+        self.__bot.stop_music()
         self.__logger.info("Stopped voice client")
         self.can_play.clear()
         self.__logger.info("Clearing operation completed")
 
     def skip(self) -> None:
         """Skip currently playing music."""
-        self.__bot.voice_client.stop()
+        self.__bot.stop_music()
 
     def pause(self) -> None:
         """Pause currently playing music."""
@@ -124,6 +152,7 @@ class Player:
                 queries,
             ]
         await self.__add_music(queries, shuffle)
+        self.__resume_prefetch()
 
     async def __add_music(self, queries: List[str], shuffle: bool) -> None:
         """Add music to play queue.
@@ -148,45 +177,106 @@ class Player:
         Initializes music thread and allows music queue consumption.
         """
         self.can_play.set()
+        self.__stop_prefetch()
+        self.__prefetcher = asyncio.create_task(
+            self.__prefetch_music(), name=settings.player.prefetch.task_name
+        )
         self.__player_thread = asyncio.create_task(
             self.__play_music_queue(), name=settings.player.task_name
         )
 
-    async def _submit_music(self, url: str) -> None:
-        # TODO consider raised exceptions
-        await self.__bot.submit_music(url)
+    def __stop_prefetch(self) -> None:
+        """Stop look-ahead task and discard already prepared music."""
+        if self.__prefetcher:
+            self.__prefetcher.cancel()
+            self.__prefetcher = None
+        while not self.__prefetched.empty():
+            self.__prefetched.get_nowait()
+        self.__prefetch_slots = asyncio.Semaphore(self.__lookahead_depth())
+
+    def __resume_prefetch(self) -> None:
+        """Restart look-ahead task, if it ended while music is still playing.
+
+        Its end of music signal is withdrawn, so player goes on with music added
+        meanwhile once current music ends, instead of becoming idle. Music thread
+        is restarted if it ended while music was being added.
+        """
+        if self.__player_thread is None or self.__player_thread.done():
+            self._start_music_queue()
+            return
+        if self.__prefetcher is not None and not self.__prefetcher.done():
+            return
+        for _ in range(self.__prefetched.qsize()):
+            prepared = self.__prefetched.get_nowait()
+            if prepared is None:
+                # slot taken by look-ahead task before signalling end of music
+                self.__prefetch_slots.release()
+            else:
+                self.__prefetched.put_nowait(prepared)
+        self.__prefetcher = asyncio.create_task(
+            self.__prefetch_music(), name=settings.player.prefetch.task_name
+        )
+
+    async def __prefetch_music(self) -> None:
+        """Look-ahead task.
+
+        Obtains upcoming music from :attr:`~pipo.play.player.Player._music_queue`
+        and prepares it, probing included, while previous music is still playing.
+        At most look-ahead depth musics are kept prepared. Ends as
+        soon as no music is left and every request made is done, or once no music
+        is obtained for ``get_music_timeout`` seconds.
+        """
+        prefetched, slots = self.__prefetched, self.__prefetch_slots
+        while True:
+            await slots.acquire()
+            music = await self._player_queue.get(settings.player.get_music_timeout)
+            if music is None:
+                self.__logger.info("Exiting music prefetch loop due to empty queue")
+                prefetched.put_nowait(None)
+                return
+            try:
+                open_source = await self.__bot.load_music(music)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.__logger.warning(
+                    "Unable to load music %s", music.source, exc_info=True
+                )
+                await self.__bot.send_message(settings.player.messages.play_error)
+                slots.release()
+                continue
+            prefetched.put_nowait((music, open_source))
 
     async def __play_music_queue(self) -> None:
         """Play music task.
 
-        Obtains a music from :attr:`~pipo.play.player.Player._music_queue` and creates
-        a task to submit to the Discord bot to be played.
+        Obtains a prepared music from look-ahead task and submits it to the Discord
+        bot to be played.
         """
         self.__logger.info("Entering music play loop")
+        prefetched, slots = self.__prefetched, self.__prefetch_slots
         while await self.can_play.wait():
             self.can_play.clear()
             self.__logger.debug("Music queue size: %s", self.queue_size())
-            url = await self._player_queue.get(settings.player.get_music_timeout)
-            if url:
-                try:
-                    self.__logger.info(
-                        "Submitting music %s",
-                        hashlib.sha1(url.encode(), usedforsecurity=False).hexdigest(),
-                    )
-                    await self.__bot.submit_music(url)
-                except asyncio.CancelledError:
-                    self.__logger.debug(
-                        "Cancelled task '%s'", settings.player.task_name
-                    )
-                    raise
-                except Exception:
-                    self.__logger.warning("Unable to play music %s", url, exc_info=True)
-                    await self.__bot.send_message(settings.player.messages.play_error)
-            elif url == None:
+            prepared = await prefetched.get()
+            slots.release()
+            if prepared is None:
                 self.__logger.info("Exiting music play loop due to empty queue")
                 break
-            else:
-                self.__logger.warning("Unable to play music with invalid url '%s'", url)
+            music, open_source = prepared
+            url = str(music.source)
+            try:
+                self.__logger.info(
+                    "Submitting music %s",
+                    hashlib.sha1(url.encode(), usedforsecurity=False).hexdigest(),
+                )
+                await self.__bot.submit_music(music, open_source)
+            except asyncio.CancelledError:
+                self.__logger.debug("Cancelled task '%s'", settings.player.task_name)
+                raise
+            except Exception:
+                self.__logger.warning("Unable to play music %s", url, exc_info=True)
+                await self.__bot.send_message(settings.player.messages.play_error)
             self.can_play.set()
             self.__logger.debug(
                 "Will wait for playing music to complete or exit if queue is empty"
@@ -2,6 +2,8 @@ import logging
 from abc import ABC, abstractmethod
 from typing import Iterable, Optional, Union
 
+from pipo.player.music_queue.models.music import Music
+
 
 class PlayerQueue(ABC):
     """Player queue.
@@ -34,7 +36,7 @@ class PlayerQueue(ABC):
         pass
 
     @abstractmethod
-    def get(self) -> Optional[str]:
+    def get(self) -> Optional[Music]:
         """Get one music from queue."""
         return None
 
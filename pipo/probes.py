@@ -1,4 +1,5 @@
 import time
+from typing import Any, Dict
 from fastapi import FastAPI
 import contextlib
 import time
@@ -42,3 +43,43 @@ async def healthiness() -> bool:
 @probe_server.get("/readyz")
 async def readiness() -> bool:
     return True
+
+
+@probe_server.get("/stats")
+async def statistics() -> Dict[str, Dict[str, Any]]:
+    """Provide cache, scheduler and music queue counters.
+
+    Pipeline modules are imported on first request, so serving probes does not
+    require loading them.
+    """
+    from pipo.player.audio_source.spotify_handler import SpotifyHandler
+    from pipo.player.audio_source.youtube_handler import (
+        YoutubeHandler,
+        YoutubeQueryHandler,
+    )
+    from pipo.player.music_queue._remote_music_queue import (
+        extraction_schedulers,
+        search_schedulers,
+    )
+    from pipo.player.music_queue.music_queue import music_queue
+
+    return {
+        "youtube_stream_cache": YoutubeHandler.stream_cache().stats(),
+        "youtube_query_cache": YoutubeQueryHandler.query_cache().stats(),
+        "youtube_extractions": YoutubeHandler._extractions.stats(),
+        "youtube_searches": YoutubeQueryHandler._searches.stats(),
+        "spotify_track_mapping": SpotifyHandler.track_mapping().stats(),
+        "search_scheduler": {
+            lane: scheduler.stats() for lane, scheduler in search_schedulers.items()
+        },
+        "extraction_scheduler": {
+            lane: scheduler.stats() for lane, scheduler in extraction_schedulers.items()
+        },
+        "hub_consumer": music_queue.credits.stats(),
+        "requests": music_queue.ledger.stats(),
+        "reorder": music_queue.reorder.stats(),
+        "time_to_first_audio": {
+            lane: stats.stats()
+            for lane, stats in music_queue.time_to_first_audio.items()
+        },
+    }
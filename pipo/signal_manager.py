@@ -2,11 +2,47 @@
 import asyncio
 import logging
 import signal
-from typing import Iterable
+from typing import Awaitable, Callable, Iterable, List, Optional
 
 
 class SignalManager:
-    """Manage program signals."""
+    """Manage program signals.
+
+    Attributes
+    ----------
+    _cleanup_callbacks : List[Callable[[], Optional[Awaitable]]]
+        Resource release callbacks invoked, in registration order, on shutdown.
+    """
+
+    _cleanup_callbacks: List[Callable[[], Optional[Awaitable]]] = []
+
+    @staticmethod
+    def add_cleanup(callback: Callable[[], Optional[Awaitable]]) -> None:
+        """Register callback to release resources on shutdown.
+
+        Parameters
+        ----------
+        callback : Callable[[], Optional[Awaitable]]
+            Function or coroutine function invoked after all tasks are cancelled.
+        """
+        SignalManager._cleanup_callbacks.append(callback)
+
+    @staticmethod
+    async def __cleanup() -> None:
+        """Invoke registered cleanup callbacks, logging raised exceptions."""
+        for callback in SignalManager._cleanup_callbacks:
+            await SignalManager.__run_cleanup(callback)
+
+    @staticmethod
+    async def __run_cleanup(callback: Callable[[], Optional[Awaitable]]) -> None:
+        try:
+            result = callback()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception:
+            logging.getLogger(__name__).exception(
+                "Unable to complete cleanup '%s'", callback
+            )
 
     @staticmethod
     async def __shutdown(
@@ -15,7 +51,8 @@ class SignalManager:
         """Cancel all running async tasks.
 
         Cancel running asyncio tasks, except this one, so they can perform necessary
-        cleanup by processing an asyncio.CancelledError exception.
+        cleanup by processing an asyncio.CancelledError exception. Registered cleanup
+        callbacks run once all tasks are cancelled.
 
         Parameters
         ----------
@@ -42,6 +79,8 @@ class SignalManager:
 
         await asyncio.gather(*tasks, return_exceptions=True)
         logger.info("All tasks cancelled")
+        await SignalManager.__cleanup()
+        logger.info("Released resources")
         logger.debug("Stopping asyncio loop")
         loop.stop()
         logger.info("Stopped asyncio loop")
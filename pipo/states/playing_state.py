@@ -32,7 +32,7 @@ class PlayingState(pipo.states.state.State):
 
         Music is stopped and bot transition to Idle State.
         """
-        await self.context.player.clear()
+        self.context.player.clear()
         self.context.transition_to(pipo.states.idle_state.IdleState())
 
     async def pause(self) -> None:
@@ -0,0 +1,188 @@
+#!usr/bin/env python3
+"""Transmuter worker.
+
+Run chosen groups of pipeline subscribers, such as the CPU heavy youtube
+transmuters, apart from the discord bot, so music resolution capacity scales
+out across cores and containers. Neither discord nor voice dependencies are
+loaded. Workers require the ``worker.enabled`` setting, which leaves the
+pipeline out of the bot.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+from enum import StrEnum
+from typing import Dict, Iterable, List
+
+from faststream.rabbit import RabbitBroker, RabbitRouter
+
+from pipo.config import settings
+from pipo.player.audio_source.http_client import HttpClient
+from pipo.player.audio_source.spotify_client import SpotifyClient
+from pipo.player.audio_source.spotify_handler import SpotifyHandler
+from pipo.player.audio_source.youtube_handler import YoutubeQueryHandler
+from pipo.player.music_queue._remote_music_queue import (
+    broker,
+    build_broker,
+    declare_dlx,
+    dispatch_router,
+    extraction_executor,
+    hub_exch,
+    provider_exch,
+    spotify_router,
+    youtube_query_router,
+    youtube_router,
+)
+from pipo.player.music_queue.memory_broker import Transport
+from pipo.signal_manager import SignalManager
+
+
+class WorkerGroup(StrEnum):
+    """Group of pipeline subscribers run together by a worker."""
+
+    DISPATCH = "dispatch"
+    YOUTUBE = "youtube"
+    YOUTUBE_QUERY = "youtube_query"
+    SPOTIFY = "spotify"
+
+
+ROUTERS: Dict[WorkerGroup, RabbitRouter] = {
+    WorkerGroup.DISPATCH: dispatch_router,
+    WorkerGroup.YOUTUBE: youtube_router,
+    WorkerGroup.YOUTUBE_QUERY: youtube_query_router,
+    WorkerGroup.SPOTIFY: spotify_router,
+}
+
+
+def group_broker(group: WorkerGroup) -> RabbitBroker:
+    """Build broker consuming for subscribers of given group.
+
+    Each group has a broker of its own, so its channel prefetch limits its
+    subscribers to as many deliveries at once as set in ``worker.concurrency``.
+
+    Parameters
+    ----------
+    group : WorkerGroup
+        Subscriber group.
+
+    Returns
+    -------
+    RabbitBroker
+        Broker, not yet started.
+    """
+    consumer = build_broker(max_consumers=settings.worker.concurrency[group])
+    consumer.include_router(ROUTERS[group])
+    return consumer
+
+
+async def start_groups(groups: Iterable[WorkerGroup]) -> List[RabbitBroker]:
+    """Start consuming for subscribers of given groups.
+
+    Subscribers publish through the shared broker, started without subscribers
+    of its own.
+
+    Parameters
+    ----------
+    groups : Iterable[WorkerGroup]
+        Subscriber groups to run.
+
+    Returns
+    -------
+    List[RabbitBroker]
+        Brokers of the groups, started.
+    """
+    await broker.start()
+    await declare_dlx(broker)
+    # published to, regardless of the subscribers running
+    await broker.declare_exchange(provider_exch)
+    await broker.declare_exchange(hub_exch)
+    consumers = []
+    for group in groups:
+        consumer = group_broker(group)
+        await consumer.start()
+        consumers.append(consumer)
+        logging.getLogger(__name__).info(
+            "Started %s subscribers, processing up to %s messages each",
+            group,
+            settings.worker.concurrency[group],
+        )
+    return consumers
+
+
+async def run_worker(groups: Iterable[WorkerGroup]) -> None:
+    """Run subscribers of given groups until a termination signal is received.
+
+    Parameters
+    ----------
+    groups : Iterable[WorkerGroup]
+        Subscriber groups to run.
+    """
+    asyncio.current_task().set_name(settings.main_task_name)
+    SignalManager.add_handlers(
+        asyncio.get_event_loop(),
+        settings.main_task_name,
+        (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGQUIT),
+    )
+    SignalManager.add_cleanup(extraction_executor.shutdown)
+    SignalManager.add_cleanup(YoutubeQueryHandler.query_cache().close)
+    SignalManager.add_cleanup(SpotifyHandler.track_mapping().close)
+    SignalManager.add_cleanup(HttpClient.close)
+    SignalManager.add_cleanup(SpotifyClient.close)
+
+    HttpClient.open()
+    consumers = await start_groups(groups)
+    # consumers stop before the broker their subscribers publish through
+    for consumer in consumers:
+        SignalManager.add_cleanup(consumer.close)
+    SignalManager.add_cleanup(broker.close)
+    # consumers run in background until a signal cancels this task
+    await asyncio.Event().wait()
+
+
+def main():
+    """Run worker for groups given in command line."""
+    parser = argparse.ArgumentParser(
+        prog="pipo-worker",
+        description="Run pipo pipeline subscribers, without the discord bot.",
+    )
+    parser.add_argument(
+        "groups",
+        nargs="*",
+        type=WorkerGroup,
+        metavar="group",
+        help=f"subscriber groups to run, {', '.join(WorkerGroup)}; "
+        "worker.groups setting by default",
+    )
+    args = parser.parse_args()
+    if Transport(settings.player.queue.broker.transport) == Transport.MEMORY:
+        parser.error("memory transport carries no messages between processes")
+    if not settings.worker.enabled:
+        parser.error("worker.enabled is not set, the bot runs the pipeline itself")
+
+    logging.basicConfig(
+        level=settings.log.level,
+        format=settings.log.format,
+        encoding=settings.log.encoding,
+    )
+
+    logger = logging.getLogger(__name__)
+
+    try:
+        asyncio.run(
+            run_worker(
+                [WorkerGroup(group) for group in args.groups or settings.worker.groups]
+            )
+        )
+    except Exception:
+        logger.exception("Unexpected exception raised")
+    finally:
+        logger.info("Exiting worker")
+        sys.stderr.flush()
+        os._exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import logging
+from functools import partial
+
+import pytest
+from pydantic import BaseModel
+
+from pipo.player.music_queue.codec import JSON_CODEC, MSGPACK_CODEC
+from pipo.player.music_queue.models import (
+    Music,
+    MusicRequest,
+    ProviderBatchOperation,
+    ProviderItem,
+    ProviderOperation,
+)
+from tests.conftest import Helpers
+
+UUID = Helpers.generate_uuid()
+GOOGLEVIDEO_URL = (
+    "https://rr4---sn-apn7en7s.googlevideo.com/videoplayback?expire=1729205742"
+    "&ei=jhARZ4u8JvTE6dsP2JSGyQQ&ip=2001%3A818%3Ae348%3A2d00%3A1d7d%3A52c3"
+    "&id=o-AKt7wR2vHXn0yqX1k6sbEV1mXq5v7b3lb4pR2W4K9b6c&itag=251&source=youtube"
+    "&requiressl=yes&mh=7c&mm=31%2C29&mn=sn-apn7en7s%2Csn-h5q7knes&ms=au%2Crdu"
+    "&mv=m&mvi=4&pl=43&initcwndbps=1433750&vprv=1&svpuc=1&mime=audio%2Fwebm"
+    "&rqh=1&gir=yes&clen=3433514&dur=212.061&lmt=1714829870710566&mt=1729183777"
+    "&fvip=5&keepalive=yes&fexp=51299152&c=IOS&txp=2318224&sparams=expire"
+    "%2Cei%2Cip%2Cid%2Citag%2Csource%2Crequiressl%2Cvprv%2Csvpuc%2Cmime%2Crqh"
+    "%2Cgir%2Cclen%2Cdur%2Clmt&sig=AJfQdSswRQIhAOAn7dtzZtjmRRfUoLr1Yw9ni_3ZmIoO"
+    "&lsparams=mh%2Cmm%2Cmn%2Cms%2Cmv%2Cmvi%2Cpl%2Cinitcwndbps&lsig=ACJ0pHgwRgIh"
+)
+
+MODELS = [
+    MusicRequest(
+        uuid=UUID,
+        server_id="123456789012345678",
+        query=["https://www.youtube.com/watch?v=dQw4w9WgXcQ", "Rick Astley"],
+    ),
+    ProviderOperation(
+        uuid=UUID,
+        server_id="123456789012345678",
+        provider="provider.youtube.query",
+        operation="query",
+        query="Never Gonna Give You Up - Rick Astley",
+        spotify_id="4uLU6hMCjMI75M1A2tKUQC",
+        isrc="GBARL9300135",
+    ),
+    ProviderBatchOperation(
+        uuid=UUID,
+        server_id="123456789012345678",
+        provider="provider.youtube.query",
+        operation="query",
+        items=[
+            ProviderItem(
+                ordinal=ordinal,
+                query=f"Never Gonna Give You Up - Rick Astley {ordinal}",
+                spotify_id="4uLU6hMCjMI75M1A2tKUQC",
+                isrc="GBARL9300135",
+            )
+            for ordinal in range(50)
+        ],
+    ),
+    Music(
+        uuid=UUID,
+        server_id="123456789012345678",
+        source=GOOGLEVIDEO_URL,
+        codec="opus",
+        container="webm",
+        bitrate=129.5,
+        duration=212.061,
+    ),
+]
+
+
+@pytest.mark.benchmark
+class TestCodec:
+    __runs = 10000
+
+    @pytest.mark.parametrize("model", MODELS, ids=lambda model: type(model).__name__)
+    def test_codec(self, model: BaseModel):
+        pytest.importorskip("msgpack")
+        results = {}
+        for codec in (JSON_CODEC, MSGPACK_CODEC):
+            body = codec.encode(model)
+            encode, _ = Helpers.measure(partial(codec.encode, model), self.__runs)
+            decode, _ = Helpers.measure(partial(codec.decode, body), self.__runs)
+            results[codec.name] = (len(body), encode, decode)
+            assert type(model).model_validate(codec.decode(body)) == model
+            logging.getLogger(__name__).info(
+                "%s %s: %s bytes, encode %.2fus, decode %.2fus",
+                type(model).__name__,
+                codec.name,
+                len(body),
+                encode * 1e6,
+                decode * 1e6,
+            )
+        assert results["msgpack"][0] < results["json"][0]
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Tuple
+
+import pytest
+from faststream.rabbit import RabbitBroker, RabbitQueue, TestRabbitBroker
+
+from pipo.config import settings
+from pipo.player.music_queue.batch_publisher import BatchPublisher
+
+MESSAGES = 1000
+CONFIRM_DELAY = 0.001  # seconds, stands in for a broker round-trip
+
+
+async def measure(function: Callable[[], Awaitable]) -> Tuple[float, float]:
+    """Wall clock and CPU time, in seconds, of awaiting function."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    await function()
+    return time.perf_counter() - wall, time.process_time() - cpu
+
+
+@pytest.mark.benchmark
+class TestFanOut:
+    @pytest.fixture(scope="function")
+    def broker(self, request):
+        broker = RabbitBroker()
+        queue = RabbitQueue("fan_out")
+        received = []
+
+        @broker.subscriber(queue)
+        async def consume(message: str) -> None:
+            await asyncio.sleep(request.param)
+            received.append(message)
+
+        broker.received = received
+        broker.publisher_ = broker.publisher(queue)
+        return broker
+
+    @staticmethod
+    async def sequential(broker: RabbitBroker) -> None:
+        for index in range(MESSAGES):
+            await broker.publisher_.publish(str(index))
+
+    @staticmethod
+    async def batched(broker: RabbitBroker) -> None:
+        async with BatchPublisher(settings.player.queue.broker.max_in_flight) as batch:
+            for index in range(MESSAGES):
+                await batch.publish(broker.publisher_.publish, str(index))
+
+    @staticmethod
+    def __report(name: str, baseline, candidate) -> None:
+        logging.getLogger(__name__).info(
+            "%s fan-out of %s messages: sequential %.0f msg/s (%.2fs cpu), "
+            "batched %.0f msg/s (%.2fs cpu)",
+            name,
+            MESSAGES,
+            MESSAGES / baseline[0],
+            baseline[1],
+            MESSAGES / candidate[0],
+            candidate[1],
+        )
+
+    @pytest.mark.parametrize(
+        "broker, name",
+        [(0, "Overhead"), (CONFIRM_DELAY, "Round-trip")],
+        indirect=["broker"],
+    )
+    @pytest.mark.asyncio
+    async def test_fan_out(self, broker, name):
+        async with TestRabbitBroker(broker):
+            baseline = await measure(lambda: self.sequential(broker))
+            candidate = await measure(lambda: self.batched(broker))
+        self.__report(name, baseline, candidate)
+        assert len(broker.received) == 2 * MESSAGES
+        if name == "Round-trip":
+            assert candidate[0] < baseline[0]
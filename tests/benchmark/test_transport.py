@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Tuple
+
+import pytest
+from faststream.rabbit import ExchangeType, RabbitBroker, RabbitExchange, RabbitQueue
+
+from pipo.config import settings
+from pipo.player.music_queue.codec import CodecMiddleware, decode_message
+from pipo.player.music_queue.memory_broker import MemoryBroker, Transport
+from pipo.player.music_queue.models import Music, ProviderOperation
+from tests.conftest import Helpers
+
+MESSAGES = 500
+HOPS = 3
+SERVER_ID = "0"
+
+
+def pipeline(
+    broker: RabbitBroker,
+) -> Tuple[RabbitQueue, Dict[int, float], List[float]]:
+    """Dispatch, transmute and hub hops, recording latency of each message.
+
+    Latency is measured since the time set for message position in returned
+    dictionary.
+    """
+    providers = RabbitExchange("bench_providers", type=ExchangeType.TOPIC)
+    hub = RabbitExchange("bench_hub", type=ExchangeType.TOPIC)
+    dispatcher = RabbitQueue("bench_dispatcher", auto_delete=True)
+    sent = {}
+    latencies = []
+
+    @broker.subscriber(dispatcher)
+    async def dispatch(request: ProviderOperation) -> None:
+        await broker.publish(
+            request, routing_key="provider.youtube.url", exchange=providers
+        )
+
+    @broker.subscriber(
+        RabbitQueue(
+            "bench_youtube", routing_key="provider.youtube.*", auto_delete=True
+        ),
+        providers,
+    )
+    async def transmute(request: ProviderOperation) -> None:
+        await broker.publish(
+            Music(
+                uuid=request.uuid,
+                server_id=request.server_id,
+                source=request.query,
+                position=request.position,
+            ),
+            routing_key=f"hub.{request.server_id}",
+            exchange=hub,
+        )
+
+    @broker.subscriber(
+        RabbitQueue(
+            f"bench_hub_{SERVER_ID}", routing_key=f"hub.{SERVER_ID}", auto_delete=True
+        ),
+        hub,
+    )
+    async def consume(music: Music) -> None:
+        latencies.append(time.perf_counter() - sent[music.position])
+
+    return dispatcher, sent, latencies
+
+
+def operation(position: int) -> ProviderOperation:
+    return ProviderOperation(
+        uuid=Helpers.generate_uuid(),
+        server_id=SERVER_ID,
+        provider="provider.youtube.url",
+        operation="url",
+        query=f"https://www.youtube.com/watch?v={position:011d}",
+        position=position,
+    )
+
+
+@pytest.mark.benchmark
+class TestTransport:
+    @pytest.fixture(scope="function")
+    async def broker(self, request):
+        broker_type = (
+            MemoryBroker if request.param == Transport.MEMORY else RabbitBroker
+        )
+        broker = broker_type(
+            url=settings.get("queue_broker_url"),
+            max_consumers=settings.player.queue.broker.max_consumers,
+            decoder=decode_message,
+            middlewares=(CodecMiddleware,),
+        )
+        broker.dispatcher, broker.sent, broker.latencies = pipeline(broker)
+        try:
+            await asyncio.wait_for(broker.start(), 10)
+        except Exception as e:
+            await broker.close()
+            pytest.skip(f"{request.param} broker unavailable: {e}")
+        yield broker
+        await broker.close()
+
+    @staticmethod
+    async def wait(broker: RabbitBroker, count: int) -> None:
+        while len(broker.latencies) < count:
+            await asyncio.sleep(0.001)
+
+    @pytest.mark.parametrize(
+        "broker", [Transport.MEMORY, Transport.RABBITMQ], indirect=True
+    )
+    async def test_transport(self, broker):
+        # latency, one message through the pipeline at a time
+        for position in range(MESSAGES):
+            broker.sent[position] = time.perf_counter()
+            await broker.publish(operation(position), broker.dispatcher)
+            await asyncio.wait_for(self.wait(broker, position + 1), 10)
+        latency = sum(broker.latencies) / MESSAGES
+        broker.latencies.clear()
+
+        # throughput, every message published at once
+        start = time.perf_counter()
+        for position in range(MESSAGES):
+            broker.sent[position] = time.perf_counter()
+            await broker.publish(operation(position), broker.dispatcher)
+        await asyncio.wait_for(self.wait(broker, MESSAGES), 60)
+        elapsed = time.perf_counter() - start
+
+        logging.getLogger(__name__).info(
+            "%s transport over %s hops: %.3fms latency, %.0f msg/s throughput",
+            type(broker).__name__,
+            HOPS,
+            latency * 1000,
+            MESSAGES / elapsed,
+        )
+        assert len(broker.latencies) == MESSAGES
@@ -0,0 +1,60 @@
+import logging
+from functools import partial
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from pipo.config import settings
+from pipo.player.music_queue.codec import JSON_CODEC, TrustedHops
+from pipo.player.music_queue.models import TrustedModel, TrustedPayload
+from tests.benchmark.test_codec import MODELS
+from tests.conftest import Helpers
+
+
+def receive(model: type, message: SimpleNamespace, trusted: bool) -> BaseModel:
+    """Decode and build handler argument, as done by a subscriber."""
+    body = JSON_CODEC.decode(message.body)
+    if trusted and TrustedHops.verify(message):
+        body = TrustedPayload(body)
+    return model.model_validate(body)
+
+
+@pytest.mark.benchmark
+class TestTrustedHops:
+    __runs = 10000
+
+    @pytest.fixture(scope="function")
+    def mode(self):
+        settings.set("queue_signing_key", "secret")
+        TrustedHops.reset()
+        yield "signed"
+        settings.unset("queue_signing_key", force=True)
+        TrustedHops.reset()
+
+    @pytest.mark.parametrize(
+        "model", MODELS[1:], ids=lambda model: type(model).__name__
+    )
+    def test_trusted_hop(self, model: BaseModel, mode: str):
+        body = JSON_CODEC.encode(model)
+        message = SimpleNamespace(
+            body=body,
+            headers={TrustedHops.config()[0]: TrustedHops.sign(body)},
+        )
+        _, validated = Helpers.measure(
+            partial(receive, type(model), message, False), self.__runs
+        )
+        _, trusted = Helpers.measure(
+            partial(receive, type(model), message, True), self.__runs
+        )
+        logging.getLogger(__name__).info(
+            "%s %s: validated %.2fus, trusted %.2fus cpu per message",
+            type(model).__name__,
+            mode,
+            validated * 1e6,
+            trusted * 1e6,
+        )
+        # transmuter models are validated by pydantic-core faster than
+        # construction in python, so only music takes the trusted path
+        if isinstance(model, TrustedModel):
+            assert trusted < validated
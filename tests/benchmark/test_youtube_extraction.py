@@ -0,0 +1,70 @@
+import logging
+
+import pytest
+from yt_dlp import YoutubeDL
+
+import tests.constants
+from tests.conftest import Helpers
+
+from pipo.config import settings
+from pipo.player.audio_source.youtube_handler import YoutubeHandler
+from pipo.player.audio_source.youtube_pool import YoutubeDLPool
+
+
+def construct_per_call(url: str) -> str:
+    with YoutubeDL(settings.player.source.youtube.downloader_config) as ydl:
+        return ydl.extract_info(url=url, download=False).get("url", None)
+
+
+def pooled(pool: YoutubeDLPool, url: str) -> str:
+    with pool.lease() as ydl:
+        return ydl.extract_info(url=url, download=False).get("url", None)
+
+
+@pytest.mark.benchmark
+class TestYoutubeExtraction:
+    __runs = 20
+
+    @pytest.fixture(scope="function")
+    def pool(self):
+        pool = YoutubeDLPool(
+            settings.player.source.youtube.downloader_config,
+            size=1,
+            max_uses=settings.player.source.youtube.extractor_pool.max_uses,
+            lease_timeout=settings.player.source.youtube.extractor_pool.lease_timeout,
+        )
+        pool.warm_up()
+        yield pool
+        pool.close()
+
+    @staticmethod
+    def __report(name: str, baseline, candidate) -> None:
+        logging.getLogger(__name__).info(
+            "%s per track: construct-per-call %.2fms wall %.2fms cpu, "
+            "pooled %.2fms wall %.2fms cpu",
+            name,
+            *(1000 * value for value in (*baseline, *candidate)),
+        )
+
+    def test_bootstrap_overhead(self, mocker, pool):
+        """Per track cost with extraction itself stubbed out."""
+        mocker.patch.object(
+            YoutubeDL,
+            "extract_info",
+            return_value={"url": tests.constants.YOUTUBE_URL_1},
+        )
+        url = tests.constants.YOUTUBE_URL_1
+        baseline = Helpers.measure(lambda: construct_per_call(url), self.__runs)
+        candidate = Helpers.measure(lambda: pooled(pool, url), self.__runs)
+        self.__report("Bootstrap", baseline, candidate)
+        assert candidate[0] < baseline[0]
+        assert candidate[1] < baseline[1]
+
+    @pytest.mark.youtube
+    def test_playlist_resolution(self, pool):
+        """Per track cost resolving back to back playlist tracks."""
+        urls = iter(tests.constants.YOUTUBE_URL_COMPLEX_LIST * 2)
+        baseline = Helpers.measure(lambda: construct_per_call(next(urls)), 5)
+        candidate = Helpers.measure(lambda: pooled(pool, next(urls)), 5)
+        self.__report("Resolution", baseline, candidate)
+        assert YoutubeHandler.get_audio(tests.constants.YOUTUBE_URL_1)
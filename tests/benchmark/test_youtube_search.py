@@ -0,0 +1,91 @@
+import asyncio
+import gzip
+import logging
+import pathlib
+import time
+from typing import List, Tuple
+
+import httpx
+import pytest
+
+from pipo.player.audio_source.youtube_handler import YoutubeQueryHandler
+
+RECORDED_PAGES = pathlib.Path(__file__).parent / "data"
+CHUNK_SIZE = 16 * 1024  # bytes
+CHUNK_DELAY = 0.002  # seconds, around 8 MB/s
+
+
+def synthetic_page(size: int, first_video: float) -> bytes:
+    """Results page shaped page, with first video id at given fraction of size."""
+    renderer = (
+        '{"videoRenderer":{"videoId":"1V_xRb0x9aw","navigationEndpoint":'
+        '{"commandMetadata":{"webCommandMetadata":{"url":"/watch?v=1V_xRb0x9aw"}}}}},'
+    )
+    head = b"<script>" + b"var f=function(){return 0};" * (
+        int(size * first_video) // 27
+    )
+    body = b"var ytInitialData = {" + renderer.encode() * (
+        (size - len(head)) // len(renderer)
+    )
+    return head + body
+
+
+def recorded_pages() -> List[Tuple[str, bytes]]:
+    """Recorded results pages, stored as '*.html' or '*.html.gz' in data folder."""
+    pages = []
+    for path in sorted(RECORDED_PAGES.glob("*.html*")):
+        content = path.read_bytes()
+        pages.append(
+            (path.name, gzip.decompress(content) if path.suffix == ".gz" else content)
+        )
+    return pages or [
+        (f"synthetic_{int(100 * ratio)}%", synthetic_page(600 * 1024, ratio))
+        for ratio in (0.1, 0.4, 0.7)
+    ]
+
+
+PAGES = recorded_pages()
+
+
+def transport(page: bytes, sent: List[int]) -> httpx.MockTransport:
+    async def chunks():
+        for start in range(0, len(page), CHUNK_SIZE):
+            await asyncio.sleep(CHUNK_DELAY)
+            sent.append(min(CHUNK_SIZE, len(page) - start))
+            yield page[start : start + CHUNK_SIZE]
+
+    return httpx.MockTransport(lambda request: httpx.Response(200, content=chunks()))
+
+
+@pytest.mark.benchmark
+class TestYoutubeSearch:
+    __runs = 5
+
+    async def __measure(self, page: bytes, parser) -> Tuple[float, int, str]:
+        elapsed, transferred, video_id = 0.0, 0, None
+        for _ in range(self.__runs):
+            sent = []
+            async with httpx.AsyncClient(transport=transport(page, sent)) as client:
+                start = time.perf_counter()
+                async with client.stream("GET", "https://www.youtube.com") as response:
+                    video_id = await parser(response)
+                elapsed += time.perf_counter() - start
+            transferred += sum(sent)
+        return elapsed / self.__runs, transferred // self.__runs, video_id
+
+    @pytest.mark.parametrize("name, page", PAGES, ids=[name for name, _ in PAGES])
+    @pytest.mark.asyncio
+    async def test_search_parsing(self, name, page):
+        full = await self.__measure(page, YoutubeQueryHandler._read_video_id)
+        streamed = await self.__measure(page, YoutubeQueryHandler._stream_video_id)
+        logging.getLogger(__name__).info(
+            "%s (%s KB): full download %.1fms %s KB, streaming %.1fms %s KB",
+            name,
+            len(page) // 1024,
+            1000 * full[0],
+            full[1] // 1024,
+            1000 * streamed[0],
+            streamed[1] // 1024,
+        )
+        assert streamed[2] == full[2]
+        assert streamed[1] <= full[1]
@@ -3,7 +3,7 @@ from faststream.rabbit import TestRabbitBroker
 from unittest import mock
 from pipo.player.audio_source.youtube_handler import YoutubeOperations
 from pipo.player.audio_source.spotify_handler import SpotifyOperations
-from pipo.player.music_queue.models.provider import ProviderOperation
+from pipo.player.music_queue.models.provider import Lane, ProviderOperation
 import tests.constants
 from tests.conftest import Helpers
 
@@ -75,10 +75,11 @@ class TestDispatch:
                             query=query,
                             provider="provider.youtube.url",
                             operation=YoutubeOperations.URL,
+                            lane=Lane.INTERACTIVE if index == 0 else Lane.BULK,
                         )
                     )
                 )
-                for query in queries
+                for index, query in enumerate(queries)
             ]
 
             await br.publish(dispatch_request, queue=dispatcher_queue)
@@ -0,0 +1,214 @@
+import asyncio
+
+import pytest
+from faststream import Logger
+from faststream.rabbit import TestRabbitBroker
+
+from pipo.config import settings
+from pipo.player.audio_source.youtube_handler import (
+    YoutubeHandler,
+    YoutubeOperations,
+    YoutubeQueryHandler,
+)
+from pipo.player.music_queue._remote_music_queue import (
+    broker,
+    bulk_queues,
+    bulk_shard,
+    lane_routing_key,
+    provider_exch,
+    search_schedulers,
+    transmute_youtube_query,
+    youtube_query_publisher,
+)
+from pipo.player.music_queue.memory_broker import MemoryBroker
+from pipo.player.music_queue.models import (
+    Lane,
+    ProviderBatchOperation,
+    ProviderItem,
+    ProviderOperation,
+)
+from tests.conftest import Helpers
+
+BACKLOG = 40
+PREFETCH = 4
+
+
+class Searches(list):
+    """Queries searched, in the order they were granted a slot.
+
+    Searches are held until released, so slots stay taken while the test sets
+    up what waits for them.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def search(self, query: str) -> str:
+        self.append(query)
+        await self.release.wait()
+        return YoutubeHandler.video_url("dQw4w9WgXcQ")
+
+
+def subscribed_to(broker, queues):
+    """Subscribe handler to each of given queues, bound to provider exchange."""
+
+    def decorator(handler):
+        for queue in queues:
+            handler = broker.subscriber(queue, provider_exch)(handler)
+        return handler
+
+    return decorator
+
+
+async def settle(condition, timeout=5):
+    """Wait until condition holds, messages being processed in background."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.001)
+
+
+@pytest.mark.integration
+@pytest.mark.remote_queue
+class TestFairScheduling:
+    @pytest.fixture(scope="function", autouse=True)
+    def searches(self, mocker):
+        searches = Searches()
+        mocker.patch.object(YoutubeQueryHandler, "url_from_query", searches.search)
+        mocker.patch.object(YoutubeHandler, "fetch_audio", return_value=None)
+        return searches
+
+    @staticmethod
+    def backlog(provider: str) -> ProviderBatchOperation:
+        return ProviderBatchOperation(
+            uuid=Helpers.generate_uuid(),
+            server_id="busy",
+            provider=provider,
+            operation=YoutubeOperations.QUERY,
+            items=[
+                ProviderItem(ordinal=ordinal, query=f"busy {ordinal}")
+                for ordinal in range(BACKLOG)
+            ],
+        )
+
+    @pytest.mark.asyncio
+    async def test_bounded_latency(self, mocker, searches):
+        mocker.patch.object(
+            settings.player.queue.service.transmuter.batch, "workers", BACKLOG
+        )
+        provider = settings.player.queue.service.transmuter.youtube_query.routing_key
+        single = ProviderOperation(
+            uuid=Helpers.generate_uuid(),
+            server_id="idle",
+            provider=provider,
+            operation=YoutubeOperations.QUERY,
+            query="idle",
+            lane=Lane.BULK,
+        )
+        bulk = lane_routing_key(provider, Lane.BULK, "busy")
+        scheduler = search_schedulers[Lane.BULK]
+
+        async with TestRabbitBroker(
+            broker, with_real=settings.player.queue.remote
+        ) as br:
+            busy = asyncio.create_task(
+                br.publish(
+                    self.backlog(provider), exchange=provider_exch, routing_key=bulk
+                )
+            )
+            # backlog takes every slot, the rest of it waiting for its turn
+            await settle(
+                lambda: scheduler.waiting().get("busy") == BACKLOG - scheduler.workers
+            )
+            idle = asyncio.create_task(
+                br.publish(
+                    single,
+                    exchange=provider_exch,
+                    routing_key=lane_routing_key(provider, Lane.BULK, "idle"),
+                )
+            )
+            await settle(lambda: "idle" in scheduler.waiting())
+            searches.release.set()
+            await asyncio.gather(busy, idle)
+        assert len(searches) == BACKLOG + 1
+        # waits for searches already running, not for the whole backlog
+        assert searches.index("idle") <= scheduler.workers + 1
+
+    @pytest.mark.asyncio
+    async def test_interactive_lane(self, mocker, searches):
+        mocker.patch.object(
+            settings.player.queue.service.transmuter.batch, "workers", BACKLOG
+        )
+        provider = settings.player.queue.service.transmuter.youtube_query.routing_key
+        single = ProviderOperation(
+            uuid=Helpers.generate_uuid(),
+            server_id="busy",
+            provider=provider,
+            operation=YoutubeOperations.QUERY,
+            query="interactive",
+        )
+        scheduler = search_schedulers[Lane.BULK]
+
+        async with TestRabbitBroker(
+            broker, with_real=settings.player.queue.remote
+        ) as br:
+            busy = asyncio.create_task(
+                br.publish(
+                    self.backlog(provider),
+                    exchange=provider_exch,
+                    routing_key=lane_routing_key(provider, Lane.BULK, "busy"),
+                )
+            )
+            await settle(
+                lambda: scheduler.waiting().get("busy") == BACKLOG - scheduler.workers
+            )
+            interactive = asyncio.create_task(
+                br.publish(single, exchange=provider_exch, routing_key=provider)
+            )
+            # searched while every bulk slot is still taken
+            await settle(lambda: "interactive" in searches)
+            assert searches.index("interactive") == scheduler.workers
+            searches.release.set()
+            await asyncio.gather(busy, interactive)
+        assert len(searches) == BACKLOG + 1
+
+    @pytest.mark.asyncio
+    async def test_separate_messages(self, mocker, searches):
+        mocker.patch.object(youtube_query_publisher, "publish")
+        config = settings.player.queue.service.transmuter.youtube_query
+        assert bulk_shard("busy") != bulk_shard("idle")
+        # prefetch bounds deliveries of each queue, as RabbitMQ does
+        memory = MemoryBroker(max_consumers=PREFETCH)
+
+        @subscribed_to(memory, bulk_queues(config))
+        async def transmute(request: ProviderOperation, logger: Logger) -> None:
+            await transmute_youtube_query(request, logger, None)
+
+        def request(server_id: str, query: str) -> ProviderOperation:
+            return ProviderOperation(
+                uuid=Helpers.generate_uuid(),
+                server_id=server_id,
+                provider=config.routing_key,
+                operation=YoutubeOperations.QUERY,
+                query=query,
+                lane=Lane.BULK,
+            )
+
+        async with memory:
+            await memory.start()
+            for ordinal in range(BACKLOG):
+                await memory.publish(
+                    request("busy", f"busy {ordinal}"),
+                    exchange=provider_exch,
+                    routing_key=lane_routing_key(config.routing_key, Lane.BULK, "busy"),
+                )
+            await memory.publish(
+                request("idle", "idle"),
+                exchange=provider_exch,
+                routing_key=lane_routing_key(config.routing_key, Lane.BULK, "idle"),
+            )
+            # delivered despite the backlog queued ahead of it
+            await settle(lambda: "idle" in searches)
+            assert searches.index("idle") == PREFETCH
+            searches.release.set()
+            await settle(lambda: len(searches) == BACKLOG + 1)
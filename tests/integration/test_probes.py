@@ -21,3 +21,8 @@ class TestHealthProbes:
     def test_readyz(self, server_url):
         response = requests.get(f"{server_url}/readyz")
         assert response.status_code == 200
+
+    def test_stats(self, server_url):
+        response = requests.get(f"{server_url}/stats")
+        assert response.status_code == 200
+        assert "hits" in response.json()["youtube_stream_cache"]
@@ -0,0 +1,244 @@
+import logging
+
+import pytest
+from faststream.rabbit import TestRabbitBroker
+
+import tests.constants
+from pipo.config import settings
+from pipo.player.audio_source.audio_info import AudioInfo
+from pipo.player.audio_source.source_pair import SourcePair
+from pipo.player.audio_source.spotify_handler import SpotifyHandler, SpotifyOperations
+from pipo.player.audio_source.track_mapping import TrackMapping
+from pipo.player.audio_source.youtube_handler import (
+    YoutubeHandler,
+    YoutubeOperations,
+    YoutubeQueryHandler,
+)
+from pipo.player.music_queue._remote_music_queue import (
+    broker,
+    hub_queue,
+    provider_exch,
+    transmute_spotify,
+    transmute_youtube,
+    transmute_youtube_query,
+)
+from pipo.player.music_queue.models import (
+    Lane,
+    ProviderBatchOperation,
+    ProviderItem,
+    ProviderOperation,
+)
+from pipo.player.music_queue.music_queue import consume_music, music_queue
+from tests.conftest import Helpers
+
+TRACKS = ["track 0", "track 1", "track 2"]
+
+
+@pytest.mark.integration
+@pytest.mark.remote_queue
+class TestProviderBatch:
+    @pytest.fixture(scope="function", autouse=True)
+    def tracks(self, mocker):
+        mocker.patch.object(
+            SpotifyHandler, "_track_mapping", TrackMapping(":memory:", size=8, ttl=60)
+        )
+
+        async def pages(query, shuffle=False):
+            yield [
+                SourcePair(query=track, handler_type=YoutubeQueryHandler.name)
+                for track in TRACKS
+            ]
+
+        async def search(query):
+            if query == "fail":
+                raise RuntimeError(query)
+            return f"https://www.youtube.com/watch?v={query.replace(' ', '_')}"
+
+        async def audio(url, executor):
+            return AudioInfo(url=f"https://audio.test/{url.rsplit('=', 1)[-1]}")
+
+        mocker.patch.object(SpotifyHandler, "pages_from_query", pages)
+        mocker.patch.object(YoutubeQueryHandler, "url_from_query", search)
+        mocker.patch.object(YoutubeHandler, "fetch_audio", audio)
+
+    @staticmethod
+    def request() -> ProviderOperation:
+        return ProviderOperation(
+            uuid=Helpers.generate_uuid(),
+            # hub queue binding was computed when the module was imported
+            server_id=hub_queue.routing_key.split(".", 1)[1],
+            provider="provider.spotify.url",
+            operation=SpotifyOperations.URL,
+            query="https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M",
+        )
+
+    @staticmethod
+    def played() -> list:
+        return [
+            str(call.args[0]["source"]) for call in consume_music.mock.call_args_list
+        ]
+
+    @pytest.mark.asyncio
+    async def test_single_batch(self):
+        request = self.request()
+        async with TestRabbitBroker(
+            broker, with_real=settings.player.queue.remote
+        ) as br:
+            await br.publish(
+                request, exchange=provider_exch, routing_key=request.provider
+            )
+            await transmute_spotify.wait_call(timeout=tests.constants.SHORT_TIMEOUT)
+            first, batch = (
+                call.args[0] for call in transmute_youtube_query.mock.call_args_list
+            )
+            # first track is searched on its own, in request lane
+            assert first["query"] == TRACKS[0]
+            assert first["lane"] == Lane.INTERACTIVE
+            assert batch["operation"] == YoutubeOperations.QUERY
+            assert batch["lane"] == Lane.BULK
+            assert [item["query"] for item in batch["items"]] == TRACKS[1:]
+            assert [item["ordinal"] for item in batch["items"]] == [1, 2]
+            batch = transmute_youtube.mock.call_args.args[0]
+            assert batch["operation"] == YoutubeOperations.URL
+            assert batch["lane"] == Lane.BULK
+            assert len(batch["items"]) == len(TRACKS) - 1
+            assert self.played() == [
+                "https://audio.test/track_0",
+                "https://audio.test/track_1",
+                "https://audio.test/track_2",
+            ]
+
+    @pytest.mark.asyncio
+    async def test_batch_size(self, mocker):
+        mocker.patch.object(settings.player.queue.service.transmuter.batch, "size", 2)
+        request = self.request()
+        async with TestRabbitBroker(
+            broker, with_real=settings.player.queue.remote
+        ) as br:
+            await br.publish(
+                request, exchange=provider_exch, routing_key=request.provider
+            )
+            await transmute_spotify.wait_call(timeout=tests.constants.SHORT_TIMEOUT)
+            searches = [
+                call.args[0] for call in transmute_youtube_query.mock.call_args_list
+            ]
+            assert searches[0]["query"] == "track 0"
+            assert [item["query"] for item in searches[1]["items"]] == [
+                "track 1",
+                "track 2",
+            ]
+            assert sorted(self.played()) == [
+                "https://audio.test/track_0",
+                "https://audio.test/track_1",
+                "https://audio.test/track_2",
+            ]
+
+    @pytest.mark.asyncio
+    async def test_failed_item(self, mocker):
+        mocker.patch(
+            "tests.integration.test_provider_batch.TRACKS",
+            ["track 0", "fail", "track 2"],
+        )
+        request = self.request()
+        async with TestRabbitBroker(
+            broker, with_real=settings.player.queue.remote
+        ) as br:
+            await br.publish(
+                request, exchange=provider_exch, routing_key=request.provider
+            )
+            await transmute_spotify.wait_call(timeout=tests.constants.SHORT_TIMEOUT)
+            batch = transmute_youtube.mock.call_args.args[0]
+            assert [item["ordinal"] for item in batch["items"]] == [2]
+            assert self.played() == [
+                "https://audio.test/track_0",
+                "https://audio.test/track_2",
+            ]
+
+    @pytest.mark.asyncio
+    async def test_progress(self, mocker):
+        mocker.patch(
+            "tests.integration.test_provider_batch.TRACKS",
+            ["track 0", "fail", "track 2"],
+        )
+        request = self.request()
+        # spotify expansion stands for dispatch, which is skipped
+        music_queue.ledger.open(request.uuid, expected=1, expanding=1)
+        try:
+            async with TestRabbitBroker(
+                broker, with_real=settings.player.queue.remote
+            ) as br:
+                await br.publish(
+                    request, exchange=provider_exch, routing_key=request.provider
+                )
+                await transmute_spotify.wait_call(timeout=tests.constants.SHORT_TIMEOUT)
+                progress = music_queue.ledger.get(request.uuid)
+                assert progress.expected == len(TRACKS)
+                assert (progress.resolved, progress.failed) == (2, 1)
+                assert progress.done()
+        finally:
+            music_queue.clear()
+
+    @pytest.mark.asyncio
+    async def test_music_ahead_of_progress(self, mocker):
+        request = self.request()
+        reports = []
+        add_progress = music_queue._add_progress
+        # progress is held back, as when its queue lags behind the hub queue
+        mocker.patch.object(music_queue, "_add_progress", reports.append)
+        music_queue.ledger.open(request.uuid, expected=1, expanding=1)
+        try:
+            async with TestRabbitBroker(
+                broker, with_real=settings.player.queue.remote
+            ) as br:
+                await br.publish(
+                    request, exchange=provider_exch, routing_key=request.provider
+                )
+                await transmute_spotify.wait_call(timeout=tests.constants.SHORT_TIMEOUT)
+                assert len(self.played()) == len(TRACKS)
+                assert not music_queue.ledger.idle()
+                for report in reports:
+                    add_progress(report)
+                assert music_queue.ledger.idle()
+        finally:
+            music_queue.clear()
+
+    @pytest.mark.asyncio
+    async def test_redelivered_batch(self, mocker):
+        request = ProviderBatchOperation(
+            uuid=Helpers.generate_uuid(),
+            server_id="0",
+            provider="provider.youtube.url",
+            operation=YoutubeOperations.URL,
+            items=[
+                ProviderItem(ordinal=ordinal, query=f"https://youtu.be/{query}")
+                for ordinal, query in enumerate(["track_0", "track_1", "fail"])
+            ],
+            lane=Lane.BULK,
+        )
+        audio = YoutubeHandler.fetch_audio
+
+        async def fetch_audio(url, executor):
+            return None if url.endswith("fail") else await audio(url, executor)
+
+        published = []
+        failures = {1}
+
+        async def publish(music, **kwargs):
+            if music.ordinal in failures:
+                failures.discard(music.ordinal)
+                raise ConnectionError
+            published.append(music.ordinal)
+
+        mocker.patch.object(YoutubeHandler, "fetch_audio", fetch_audio)
+        mocker.patch.object(broker, "publish", publish)
+        report = mocker.patch(
+            "pipo.player.music_queue._remote_music_queue.report_progress"
+        )
+        logger = logging.getLogger(__name__)
+        with pytest.raises(ConnectionError):
+            await transmute_youtube(request, logger, "correlation")
+        # missing item is reported even though batch failed
+        report.assert_awaited_once_with(request, failed=1)
+        await transmute_youtube(request, logger, "correlation")
+        assert sorted(published) == [0, 1]
+        assert report.await_args.kwargs == {"failed": 0}
@@ -0,0 +1,158 @@
+#!usr/bin/env python3
+import asyncio
+import time
+from typing import Dict, List
+
+import pytest
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from pipo.config import settings
+from pipo.player.audio_source.spotify_client import SpotifyAuthError, SpotifyClient
+from pipo.player.audio_source.spotify_handler import SpotifyHandler
+from pipo.probes import ProbeServer
+from tests.conftest import Helpers
+
+TRACK_ID = "0q6LuUqGLUiCPP1cbdwFs3"
+
+
+class SpotifyStub:
+    def __init__(self, total: int = 120) -> None:
+        self.total = total
+        self.tokens = 0
+        self.token_ttl = 3600
+        self.throttled: List[str] = []
+        self.revoked: List[str] = []
+        self.requests: Dict[str, List[float]] = {}
+        self.app = FastAPI()
+        self.app.post("/api/token")(self.token)
+        self.app.get("/v1/tracks/{track_id}")(self.track)
+        self.app.get("/v1/albums/{album_id}/tracks")(self.album_tracks)
+        self.app.get("/v1/playlists/{playlist_id}/tracks")(self.playlist_items)
+
+    def throttle(self, request: Request) -> bool:
+        self.requests.setdefault(request.url.path, []).append(time.monotonic())
+        if request.url.path in self.throttled:
+            self.throttled.remove(request.url.path)
+            return True
+        return False
+
+    async def token(self, request: Request):
+        form = (await request.body()).decode()
+        if "grant_type=client_credentials" not in form:
+            return Response(status_code=400)
+        self.tokens += 1
+        return {
+            "access_token": f"token{self.tokens}",
+            "token_type": "Bearer",
+            "expires_in": self.token_ttl,
+        }
+
+    @staticmethod
+    def item(index: int):
+        return {"name": f"track {index}", "artists": [{"name": "artist"}]}
+
+    def page(self, limit: int, offset: int, item):
+        end = min(offset + limit, self.total)
+        return {"items": [item(i) for i in range(offset, end)], "total": self.total}
+
+    async def track(self, track_id: str, request: Request):
+        if self.throttle(request):
+            return Response(status_code=429, headers={"Retry-After": "1"})
+        if request.headers["Authorization"].removeprefix("Bearer ") in self.revoked:
+            return Response(status_code=401)
+        return {"name": track_id, "artists": [{"name": "artist"}], "popularity": 1}
+
+    async def album_tracks(self, album_id: str, limit: int, offset: int):
+        return self.page(limit, offset, self.item)
+
+    async def playlist_items(self, playlist_id: str, limit: int, offset: int):
+        return self.page(limit, offset, lambda i: {"track": self.item(i)})
+
+
+@pytest.mark.integration
+class TestSpotifyClient:
+    @pytest.fixture(scope="function")
+    async def stub(self, mocker):
+        stub = SpotifyStub()
+        server = ProbeServer(
+            uvicorn.Config(
+                stub.app, port=Helpers.get_available_port(), log_level="warning"
+            )
+        )
+        url = f"http://{server.config.host}:{server.config.port}"
+        api = settings.player.source.spotify.api
+        mocker.patch.object(api, "base_url", f"{url}/v1")
+        mocker.patch.object(api, "token_url", f"{url}/api/token")
+        settings.set("spotify_client", "client")
+        settings.set("spotify_secret", "secret")
+        with server.run_in_thread():
+            yield stub
+            await SpotifyClient.close()
+        settings.unset("spotify_client", force=True)
+        settings.unset("spotify_secret", force=True)
+
+    @pytest.mark.asyncio
+    async def test_track(self, stub):
+        track = await SpotifyClient.track(f"spotify:track:{TRACK_ID}")
+        assert track.name == TRACK_ID
+        assert track.artists[0].name == "artist"
+
+    @pytest.mark.asyncio
+    async def test_token_reused(self, stub):
+        for _ in range(3):
+            await SpotifyClient.track(TRACK_ID)
+        assert stub.tokens == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_token_renewed_once(self, stub):
+        await SpotifyClient.track(TRACK_ID)
+        stub.revoked.append("token1")
+        tracks = await asyncio.gather(
+            *(SpotifyClient.track(TRACK_ID) for _ in range(5))
+        )
+        assert [track.name for track in tracks] == [TRACK_ID] * 5
+        assert stub.tokens == 2
+
+    @pytest.mark.asyncio
+    async def test_token_refreshed_before_expiry(self, stub):
+        margin = settings.player.source.spotify.token.refresh_margin
+        stub.token_ttl = margin + 1
+        await SpotifyClient.track(TRACK_ID)
+        await asyncio.sleep(2)
+        assert stub.tokens > 1
+
+    @pytest.mark.asyncio
+    async def test_missing_credentials(self, stub):
+        settings.set("spotify_client", None)
+        with pytest.raises(SpotifyAuthError):
+            await SpotifyClient.track(TRACK_ID)
+
+    @pytest.mark.parametrize(
+        "url", ["https://open.spotify.com/playlist/x", "spotify:album:x"]
+    )
+    @pytest.mark.asyncio
+    async def test_pagination(self, stub, url):
+        url = url.replace("x", TRACK_ID)
+        tracks = await SpotifyHandler.tracks_from_query(url)
+        assert [track.query for track in tracks] == [
+            f"track {i} - artist" for i in range(stub.total)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_retry_after(self, stub):
+        stub.throttled.append(f"/v1/tracks/{TRACK_ID}")
+        start = time.monotonic()
+        track = await SpotifyClient.track(TRACK_ID)
+        assert track.name == TRACK_ID
+        assert time.monotonic() - start >= 1
+        assert len(stub.requests[f"/v1/tracks/{TRACK_ID}"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_shared_backoff(self, stub):
+        stub.throttled.append(f"/v1/tracks/{TRACK_ID}")
+        await SpotifyClient.track(TRACK_ID)
+        throttled_at = stub.requests[f"/v1/tracks/{TRACK_ID}"][0]
+        SpotifyClient._governor.defer(0.5)
+        await SpotifyClient.track("1q6LuUqGLUiCPP1cbdwFs3")
+        assert stub.requests["/v1/tracks/1q6LuUqGLUiCPP1cbdwFs3"][0] - throttled_at >= 1
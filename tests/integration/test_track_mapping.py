@@ -0,0 +1,105 @@
+import pytest
+from faststream.rabbit import TestRabbitBroker
+
+import tests.constants
+from pipo.config import settings
+from pipo.player.audio_source.source_pair import SourcePair
+from pipo.player.audio_source.spotify_handler import SpotifyHandler, SpotifyOperations
+from pipo.player.audio_source.track_mapping import TrackMapping
+from pipo.player.audio_source.youtube_handler import (
+    YoutubeHandler,
+    YoutubeOperations,
+    YoutubeQueryHandler,
+)
+from pipo.player.music_queue.models.provider import ProviderOperation
+from pipo.player.music_queue._remote_music_queue import (
+    broker,
+    provider_exch,
+    transmute_spotify,
+    transmute_youtube,
+    transmute_youtube_query,
+)
+from tests.conftest import Helpers
+
+TRACK_ID = "4uLU6hMCjMI75M1A2tKUQC"
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+@pytest.mark.integration
+@pytest.mark.remote_queue
+class TestTrackMapping:
+    @pytest.fixture(scope="function", autouse=True)
+    def tracks(self, mocker):
+        mocker.patch.object(
+            SpotifyHandler, "_track_mapping", TrackMapping(":memory:", size=8, ttl=60)
+        )
+
+        async def pages(query, shuffle=False):
+            yield [
+                SourcePair(
+                    query="Never Gonna Give You Up - Rick Astley",
+                    handler_type=YoutubeQueryHandler.name,
+                    track_id=TRACK_ID,
+                    isrc="GBARL9300135",
+                )
+            ]
+
+        mocker.patch.object(SpotifyHandler, "pages_from_query", pages)
+        mocker.patch.object(
+            YoutubeQueryHandler,
+            "url_from_query",
+            return_value=YoutubeHandler.video_url(VIDEO_ID),
+        )
+        mocker.patch.object(YoutubeHandler, "fetch_audio", return_value=None)
+
+    @staticmethod
+    def request() -> ProviderOperation:
+        return ProviderOperation(
+            uuid=Helpers.generate_uuid(),
+            server_id="0",
+            provider="provider.spotify.url",
+            operation=SpotifyOperations.URL,
+            query=f"https://open.spotify.com/track/{TRACK_ID}",
+        )
+
+    @pytest.mark.asyncio
+    async def test_unmapped_track_searched(self):
+        request = self.request()
+        async with TestRabbitBroker(
+            broker, with_real=settings.player.queue.remote
+        ) as br:
+            await br.publish(
+                request, exchange=provider_exch, routing_key=request.provider
+            )
+            await transmute_youtube_query.wait_call(
+                timeout=tests.constants.SHORT_TIMEOUT
+            )
+            search = transmute_youtube_query.mock.call_args.args[0]
+            assert search["spotify_id"] == TRACK_ID
+            assert search["isrc"] == "GBARL9300135"
+        assert await SpotifyHandler.track_mapping().video_id(TRACK_ID) == VIDEO_ID
+
+    @pytest.mark.asyncio
+    async def test_mapped_track_skips_search(self):
+        await SpotifyHandler.track_mapping().remember(TRACK_ID, None, VIDEO_ID)
+        request = self.request()
+        async with TestRabbitBroker(
+            broker, with_real=settings.player.queue.remote
+        ) as br:
+            await br.publish(
+                request, exchange=provider_exch, routing_key=request.provider
+            )
+            await transmute_spotify.wait_call(timeout=tests.constants.SHORT_TIMEOUT)
+            await transmute_youtube.wait_call(timeout=tests.constants.SHORT_TIMEOUT)
+            transmute_youtube.mock.assert_called_once_with(
+                dict(
+                    ProviderOperation(
+                        uuid=request.uuid,
+                        server_id=request.server_id,
+                        provider="provider.youtube.url",
+                        operation=YoutubeOperations.URL,
+                        query=YoutubeHandler.video_url(VIDEO_ID),
+                    )
+                )
+            )
+            transmute_youtube_query.mock.assert_not_called()
@@ -1,5 +1,4 @@
 import pytest
-import mock
 from faststream.rabbit import TestRabbitBroker
 from pipo.player.audio_source.spotify_handler import SpotifyOperations
 from pipo.player.audio_source.youtube_handler import YoutubeOperations
@@ -50,20 +49,6 @@ class TestDispatch:
                 query=query,
             )
 
-            provider_operations = [
-                mock.call(
-                    dict(
-                        ProviderOperation(
-                            uuid=uuid,
-                            server_id=server_id,
-                            query=expected,
-                            provider="provider.youtube.query",
-                            operation=YoutubeOperations.QUERY,
-                        )
-                    )
-                )
-            ]
-
             await br.publish(
                 operation_request,
                 exchange=provider_exch,
@@ -74,6 +59,17 @@ class TestDispatch:
             await transmute_youtube_query.wait_call(
                 timeout=tests.constants.MEDIUM_TIMEOUT
             )
-            transmute_youtube_query.mock.assert_has_calls(
-                provider_operations, any_order=True
-            )
+            searches = [
+                call.args[0] for call in transmute_youtube_query.mock.call_args_list
+            ]
+            for search in searches:
+                assert search["uuid"] == uuid
+                assert search["server_id"] == server_id
+                assert search["provider"] == "provider.youtube.query"
+                assert search["operation"] == YoutubeOperations.QUERY
+            queries = [
+                item["query"]
+                for search in searches
+                for item in search.get("items", [search])
+            ]
+            assert expected in queries
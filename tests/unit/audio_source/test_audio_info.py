@@ -0,0 +1,42 @@
+import pytest
+
+from pipo.player.audio_source.audio_info import AudioInfo
+
+
+@pytest.mark.unit
+class TestAudioInfo:
+    def test_from_info(self):
+        info = {
+            "url": "https://a.googlevideo.com/videoplayback",
+            "acodec": "opus",
+            "ext": "webm",
+            "abr": 129.5,
+            "duration": 212,
+        }
+        assert AudioInfo.from_info(info) == AudioInfo(
+            url=info["url"],
+            codec="opus",
+            container="webm",
+            bitrate=129.5,
+            duration=212,
+        )
+
+    def test_from_info_partial(self):
+        info = {
+            "url": "https://a.googlevideo.com/videoplayback",
+            "acodec": "mp4a.40.2",
+            "ext": "m4a",
+            "tbr": 130,
+        }
+        audio = AudioInfo.from_info(info)
+        assert audio.codec == "mp4a"
+        assert audio.bitrate == 130
+        assert audio.duration is None
+
+    @pytest.mark.parametrize("acodec", [None, "none"])
+    def test_from_info_unknown_codec(self, acodec):
+        info = {"url": "https://a.b/c", "acodec": acodec}
+        assert AudioInfo.from_info(info).codec is None
+
+    def test_from_info_without_url(self):
+        assert AudioInfo.from_info({"acodec": "opus"}) is None
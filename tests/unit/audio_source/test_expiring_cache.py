@@ -0,0 +1,68 @@
+import pytest
+
+from pipo.player.audio_source.expiring_cache import ExpiringLRUCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.unit
+class TestExpiringLRUCache:
+    @pytest.fixture(scope="function")
+    def clock(self):
+        return Clock()
+
+    @pytest.fixture(scope="function")
+    def cache(self, clock):
+        return ExpiringLRUCache(max_size=2, clock=clock)
+
+    def test_miss(self, cache):
+        assert cache.get("a") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_hit(self, cache):
+        cache.set("a", 1, expires_at=10)
+        assert cache.get("a") == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_expiry(self, cache, clock):
+        cache.set("a", 1, expires_at=10)
+        clock.now = 10
+        assert cache.get("a") is None
+        stats = cache.stats()
+        assert stats["expirations"] == 1
+        assert stats["size"] == 0
+
+    def test_already_expired(self, cache, clock):
+        clock.now = 10
+        cache.set("a", 1, expires_at=5)
+        assert len(cache) == 0
+
+    def test_lru_eviction(self, cache):
+        cache.set("a", 1, expires_at=10)
+        cache.set("b", 2, expires_at=10)
+        cache.get("a")
+        cache.set("c", 3, expires_at=10)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_overwrite(self, cache):
+        cache.set("a", 1, expires_at=10)
+        cache.set("a", 2, expires_at=10)
+        assert cache.get("a") == 2
+        assert len(cache) == 1
+
+    def test_remove_and_clear(self, cache):
+        cache.set("a", 1, expires_at=10)
+        cache.set("b", 2, expires_at=10)
+        cache.remove("a")
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,57 @@
+import operator
+import os
+import threading
+
+import pytest
+
+from pipo.player.audio_source.extraction_executor import (
+    ExecutionMode,
+    ExtractionExecutor,
+)
+
+
+@pytest.mark.unit
+class TestExtractionExecutor:
+    @pytest.fixture(scope="function")
+    def executor(self, request):
+        executor = ExtractionExecutor(mode=request.param, workers=2)
+        yield executor
+        executor.shutdown()
+
+    @pytest.mark.parametrize(
+        "executor",
+        [ExecutionMode.INLINE, ExecutionMode.THREAD, ExecutionMode.PROCESS],
+        indirect=True,
+    )
+    @pytest.mark.asyncio
+    async def test_run(self, executor):
+        assert await executor.run(operator.add, 1, 2) == 3
+
+    @pytest.mark.parametrize("executor", [ExecutionMode.THREAD], indirect=True)
+    @pytest.mark.asyncio
+    async def test_thread_execution(self, executor):
+        caller = threading.get_ident()
+        assert await executor.run(threading.get_ident) != caller
+
+    @pytest.mark.parametrize("executor", [ExecutionMode.PROCESS], indirect=True)
+    @pytest.mark.asyncio
+    async def test_process_execution(self, executor):
+        assert await executor.run(os.getpid) != os.getpid()
+
+    @pytest.mark.asyncio
+    async def test_worker_initializer(self, mocker):
+        initializer = mocker.Mock()
+        executor = ExtractionExecutor(
+            mode=ExecutionMode.THREAD, workers=1, initializer=initializer
+        )
+        await executor.run(operator.add, 1, 2)
+        executor.shutdown()
+        initializer.assert_called_once()
+
+    def test_default_workers(self):
+        executor = ExtractionExecutor(mode=ExecutionMode.THREAD, workers=0)
+        assert executor.workers == (os.cpu_count() or 1)
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            ExtractionExecutor(mode="invalid", workers=1)
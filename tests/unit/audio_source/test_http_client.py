@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+import pytest
+
+from pipo.config import settings
+from pipo.player.audio_source.http_client import HttpClient
+
+
+@pytest.mark.unit
+class TestHttpClient:
+    @pytest.fixture(scope="function", autouse=True)
+    async def client(self):
+        yield
+        await HttpClient.close()
+
+    @pytest.mark.asyncio
+    async def test_shared_client(self):
+        assert HttpClient.get() is HttpClient.get()
+
+    @pytest.mark.asyncio
+    async def test_reopen_after_close(self):
+        client = HttpClient.get()
+        await HttpClient.close()
+        assert client.is_closed
+        assert HttpClient.get() is not client
+
+    @pytest.mark.asyncio
+    async def test_open(self):
+        client = HttpClient.open()
+        assert HttpClient.get() is client
+        assert not client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_close_unopened(self):
+        await HttpClient.close()
+        await HttpClient.close()
+
+    @pytest.mark.asyncio
+    async def test_default_timeout(self):
+        timeout = settings.player.url_fetch.client.timeout
+        assert HttpClient.get().timeout == httpx.Timeout(timeout)
+
+    @pytest.mark.asyncio
+    async def test_close_when_reopened_in_other_loop(self, mocker):
+        client = HttpClient.get()
+        other = asyncio.new_event_loop()
+        try:
+            mocker.patch.object(HttpClient, "_loop", other)
+            assert HttpClient.get() is not client
+            await asyncio.gather(*HttpClient._closing)
+            await asyncio.sleep(0)
+            assert client.is_closed
+            assert not HttpClient._closing
+        finally:
+            other.close()
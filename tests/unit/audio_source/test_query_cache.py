@@ -0,0 +1,92 @@
+import pytest
+
+import tests.constants
+from pipo.player.audio_source.query_cache import QueryCache
+from pipo.player.audio_source.youtube_handler import YoutubeQueryHandler
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.unit
+class TestQueryCache:
+    __video_id = "1V_xRb0x9aw"
+
+    @pytest.fixture(scope="function")
+    def clock(self):
+        return Clock()
+
+    @pytest.fixture(scope="function")
+    def path(self, tmp_path):
+        return str(tmp_path / "cache" / "queries.sqlite3")
+
+    @pytest.fixture(scope="function")
+    def cache(self, path, clock):
+        cache = QueryCache(path, size=10, ttl=60, clock=clock)
+        yield cache
+        cache.close()
+
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("Yellow", "yellow"),
+            ("  yellow   submarine ", "yellow submarine"),
+            ("Yellow Submarine - The Beatles", "yellow submarine the beatles"),
+            ("yellow,submarine!", "yellow submarine"),
+            ("ＹＥＬＬＯＷ", "yellow"),
+        ],
+    )
+    def test_normalize(self, query, expected):
+        assert QueryCache.normalize(query) == expected
+
+    @pytest.mark.asyncio
+    async def test_miss(self, cache):
+        assert await cache.get(tests.constants.YOUTUBE_QUERY_1) is None
+
+    @pytest.mark.asyncio
+    async def test_normalized_hit(self, cache):
+        await cache.set("Yellow  Submarine!", self.__video_id)
+        assert await cache.get("yellow submarine") == self.__video_id
+
+    @pytest.mark.asyncio
+    async def test_ttl(self, cache, clock):
+        await cache.set(tests.constants.YOUTUBE_QUERY_1, self.__video_id)
+        clock.now = 60
+        assert await cache.get(tests.constants.YOUTUBE_QUERY_1) is None
+
+    @pytest.mark.asyncio
+    async def test_disk_tier(self, cache, path, clock):
+        await cache.set(tests.constants.YOUTUBE_QUERY_1, self.__video_id)
+        cache.close()
+        restarted = QueryCache(path, size=10, ttl=60, clock=clock)
+        assert await restarted.get(tests.constants.YOUTUBE_QUERY_1) == self.__video_id
+        assert restarted.stats()["size"] == 1
+        restarted.close()
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_expiry(self, cache, path, clock):
+        await cache.set(tests.constants.YOUTUBE_QUERY_1, self.__video_id)
+        cache.close()
+        clock.now = 120
+        restarted = QueryCache(path, size=10, ttl=60, clock=clock)
+        assert await restarted.get(tests.constants.YOUTUBE_QUERY_1) is None
+        restarted.close()
+
+    @pytest.mark.asyncio
+    async def test_memory_only(self, clock):
+        cache = QueryCache("", size=10, ttl=60, clock=clock)
+        await cache.set(tests.constants.YOUTUBE_QUERY_1, self.__video_id)
+        assert await cache.get(tests.constants.YOUTUBE_QUERY_1) == self.__video_id
+
+    @pytest.mark.asyncio
+    async def test_url_from_cached_query(self, mocker):
+        client = mocker.patch("httpx.AsyncClient")
+        await YoutubeQueryHandler.query_cache().set("cached query", self.__video_id)
+        url = await YoutubeQueryHandler.url_from_query("Cached Query")
+        assert url == f"https://www.youtube.com/watch?v={self.__video_id}"
+        client.assert_not_called()
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+import tests.constants
+from pipo.player.audio_source.audio_info import AudioInfo
+from pipo.player.audio_source.extraction_executor import ExtractionExecutor
+from pipo.player.audio_source.single_flight import SingleFlight
+from pipo.player.audio_source.youtube_handler import (
+    YoutubeHandler,
+    YoutubeQueryHandler,
+)
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    @pytest.fixture(scope="function")
+    def flights(self):
+        return SingleFlight("test")
+
+    @pytest.mark.asyncio
+    async def test_coalesce(self, flights):
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return len(calls)
+
+        results = await asyncio.gather(*(flights.do("a", work) for _ in range(5)))
+        assert results == [1] * 5
+        assert flights.saved == 4
+        assert flights.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_distinct_keys(self, flights):
+        async def work(key):
+            await asyncio.sleep(0.1)
+            return key
+
+        results = await asyncio.gather(
+            *(flights.do(key, lambda key=key: work(key)) for key in "abc")
+        )
+        assert results == ["a", "b", "c"]
+        assert flights.saved == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls(self, flights):
+        async def work():
+            return 1
+
+        await flights.do("a", work)
+        await flights.do("a", work)
+        assert flights.saved == 0
+
+    @pytest.mark.asyncio
+    async def test_shared_exception(self, flights):
+        async def work():
+            await asyncio.sleep(0.1)
+            raise ValueError
+
+        results = await asyncio.gather(
+            flights.do("a", work), flights.do("a", work), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_caller_cancellation(self, flights):
+        async def work():
+            await asyncio.sleep(0.1)
+            return 1
+
+        first = asyncio.create_task(flights.do("a", work))
+        second = asyncio.create_task(flights.do("a", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == 1
+
+    @pytest.mark.asyncio
+    async def test_coalesced_audio_extraction(self, mocker):
+        YoutubeHandler.stream_cache().clear()
+        executor = ExtractionExecutor(mode="thread", workers=2)
+        get_audio = mocker.patch.object(
+            YoutubeHandler, "get_audio_info", side_effect=lambda query: AudioInfo(query)
+        )
+        saved = YoutubeHandler._extractions.saved
+        urls = [tests.constants.YOUTUBE_URL_1, "https://youtu.be/1V_xRb0x9aw"] * 3
+        results = await asyncio.gather(
+            *(YoutubeHandler.fetch_audio(url, executor) for url in urls)
+        )
+        executor.shutdown()
+        assert len({audio.url for audio in results}) == 1
+        get_audio.assert_called_once()
+        assert YoutubeHandler._extractions.saved - saved == len(urls) - 1
+        YoutubeHandler.stream_cache().clear()
+
+    @pytest.mark.asyncio
+    async def test_coalesced_query_search(self, mocker):
+        async def search(uri):
+            await asyncio.sleep(0.1)
+            return "1V_xRb0x9aw"
+
+        search_video_id = mocker.patch.object(
+            YoutubeQueryHandler, "search_video_id", side_effect=search
+        )
+        queries = ["Coalesced Query", "coalesced  query!", "COALESCED query"]
+        results = await asyncio.gather(
+            *(YoutubeQueryHandler.url_from_query(query) for query in queries)
+        )
+        assert results == [tests.constants.YOUTUBE_URL_1] * len(queries)
+        search_video_id.assert_called_once()
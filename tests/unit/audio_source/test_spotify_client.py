@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from pipo.config import settings
+from pipo.player.audio_source.spotify_client import (
+    FileTokenCache,
+    RateGovernor,
+    SpotifyClient,
+    SpotifyCredentialsError,
+    SpotifyError,
+    SpotifyIdError,
+)
+
+
+@pytest.mark.unit
+class TestSpotifyClient:
+    @pytest.mark.parametrize(
+        "kind, query",
+        [
+            ("track", "https://open.spotify.com/track/0q6LuUqGLUiCPP1cbdwFs3"),
+            ("track", "http://open.spotify.com/track/0q6LuUqGLUiCPP1cbdwFs3?si=1"),
+            ("track", "spotify:track:0q6LuUqGLUiCPP1cbdwFs3"),
+            ("track", "0q6LuUqGLUiCPP1cbdwFs3"),
+            ("album", "https://open.spotify.com/intl-pt/album/0q6LuUqGLUiCPP1cbdwFs3"),
+        ],
+    )
+    def test_resource_id(self, kind, query):
+        assert SpotifyClient.resource_id(kind, query) == "0q6LuUqGLUiCPP1cbdwFs3"
+
+    @pytest.mark.parametrize(
+        "kind, query",
+        [
+            ("album", "https://open.spotify.com/track/0q6LuUqGLUiCPP1cbdwFs3"),
+            ("track", "https://open.spotify.com/track/short"),
+            ("track", ""),
+        ],
+    )
+    def test_invalid_resource_id(self, kind, query):
+        with pytest.raises(SpotifyIdError):
+            SpotifyClient.resource_id(kind, query)
+
+    def test_token_ttl_without_token(self, mocker):
+        cache = mocker.Mock()
+        cache.get_cached_token.return_value = None
+        assert SpotifyClient.token_ttl(cache) == 0
+
+    def test_token_ttl(self, mocker):
+        margin = settings.player.source.spotify.token.refresh_margin
+        cache = mocker.Mock()
+        cache.get_cached_token.return_value = {"expires_at": time.time() + margin + 60}
+        assert 0 < SpotifyClient.token_ttl(cache) <= 60
+
+    def test_file_token_cache(self, tmp_path):
+        path = str(tmp_path / "token")
+        token = {"access_token": "token", "expires_at": 1}
+        assert FileTokenCache(path).get_cached_token() is None
+        FileTokenCache(path).save_token_to_cache(token)
+        assert FileTokenCache(path).get_cached_token() == token
+        assert [file.name for file in tmp_path.iterdir()] == ["token"]
+
+    def test_refresh_retry_delay(self):
+        config = settings.player.source.spotify.token
+        assert SpotifyClient.refresh_retry_delay(1) == config.retry_delay
+        assert SpotifyClient.refresh_retry_delay(2) == 2 * config.retry_delay
+        assert SpotifyClient.refresh_retry_delay(100) == config.max_retry_delay
+
+    @pytest.mark.parametrize("error", [SpotifyCredentialsError(), SpotifyError(500)])
+    @pytest.mark.asyncio
+    async def test_refresh_backoff(self, mocker, caplog, error):
+        mocker.patch.object(SpotifyClient, "access_token", side_effect=error)
+        sleep = mocker.patch(
+            "pipo.player.audio_source.spotify_client.asyncio.sleep",
+            side_effect=[None, None, asyncio.CancelledError],
+        )
+        with pytest.raises(asyncio.CancelledError):
+            await SpotifyClient._SpotifyClient__refresh()
+        assert [call.args[0] for call in sleep.call_args_list] == [
+            SpotifyClient.refresh_retry_delay(failures) for failures in (1, 2, 3)
+        ]
+        warnings = [r for r in caplog.records if r.levelno >= logging.WARNING]
+        assert len(warnings) == 1
+        assert (warnings[0].exc_info is None) == isinstance(
+            error, SpotifyCredentialsError
+        )
+
+
+@pytest.mark.unit
+class TestRateGovernor:
+    @pytest.mark.asyncio
+    async def test_no_delay(self):
+        governor = RateGovernor()
+        start = time.monotonic()
+        await governor.wait()
+        assert governor.delay() == 0
+        assert time.monotonic() - start < 0.1
+
+    @pytest.mark.asyncio
+    async def test_defer(self):
+        governor = RateGovernor()
+        governor.defer(0.2)
+        start = time.monotonic()
+        await governor.wait()
+        assert time.monotonic() - start >= 0.2
+        assert governor.deferrals == 1
+
+    def test_longest_deferral_kept(self):
+        now = [0]
+        governor = RateGovernor(clock=lambda: now[0])
+        governor.defer(10)
+        governor.defer(1)
+        now[0] = 5
+        assert governor.delay() == 5
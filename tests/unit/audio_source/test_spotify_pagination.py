@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from pipo.config import settings
+from pipo.player.audio_source.schemas.spotify import SpotifyAlbum, SpotifyPlaylist
+from pipo.player.audio_source.spotify_client import SpotifyClient, SpotifyError
+from pipo.player.audio_source.spotify_handler import SpotifyHandler
+
+
+class Spotify:
+    def __init__(self, total: int, delay: float = 0.05) -> None:
+        self.total = total
+        self.delay = delay
+        self.offsets = []
+        self.concurrency = 0
+        self.max_concurrency = 0
+
+    async def __page(self, limit: int, offset: int, item):
+        self.offsets.append(offset)
+        self.concurrency += 1
+        self.max_concurrency = max(self.max_concurrency, self.concurrency)
+        await asyncio.sleep(self.delay)
+        self.concurrency -= 1
+        end = min(offset + limit, self.total)
+        return {"items": [item(i) for i in range(offset, end)], "total": self.total}
+
+    @staticmethod
+    def __track(index: int):
+        return {"name": f"track {index}", "artists": [{"name": "artist"}]}
+
+    async def playlist_items(self, query, fields, limit, offset):
+        page = await self.__page(limit, offset, lambda i: {"track": self.__track(i)})
+        return SpotifyPlaylist(**page)
+
+    async def album_tracks(self, query, limit, offset):
+        return SpotifyAlbum(**await self.__page(limit, offset, self.__track))
+
+
+@pytest.mark.unit
+class TestSpotifyPagination:
+    @pytest.fixture(scope="function")
+    def spotify(self, mocker, request):
+        spotify = Spotify(request.param)
+        mocker.patch.object(SpotifyClient, "playlist_items", spotify.playlist_items)
+        mocker.patch.object(SpotifyClient, "album_tracks", spotify.album_tracks)
+        return spotify
+
+    @pytest.mark.parametrize(
+        "spotify, url",
+        [
+            (0, "https://open.spotify.com/playlist/x"),
+            (1, "https://open.spotify.com/playlist/x"),
+            (50, "https://open.spotify.com/playlist/x"),
+            (51, "https://open.spotify.com/album/x"),
+            (1500, "https://open.spotify.com/playlist/x"),
+            (1500, "https://open.spotify.com/album/x"),
+        ],
+        indirect=["spotify"],
+    )
+    @pytest.mark.asyncio
+    async def test_all_pages(self, spotify, url):
+        tracks = await SpotifyHandler.tracks_from_query(url)
+        assert [track.query for track in tracks] == [
+            f"track {i} - artist" for i in range(spotify.total)
+        ]
+
+    @pytest.mark.parametrize("spotify", [1500], indirect=True)
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self, spotify):
+        await SpotifyHandler.tracks_from_query("https://open.spotify.com/playlist/x")
+        workers = settings.player.source.spotify.pagination.workers
+        assert 1 < spotify.max_concurrency <= workers
+
+    @pytest.mark.parametrize("spotify", [1500], indirect=True)
+    @pytest.mark.asyncio
+    async def test_first_page_early(self, spotify):
+        pages = SpotifyHandler.pages_from_query("https://open.spotify.com/playlist/x")
+        first = await anext(pages)
+        assert len(first) == settings.player.source.spotify.playlist.limit
+        assert len(spotify.offsets) < spotify.total // len(first)
+        await pages.aclose()
+
+    @pytest.mark.parametrize("spotify", [120], indirect=True)
+    @pytest.mark.asyncio
+    async def test_shuffle(self, spotify):
+        tracks = await SpotifyHandler.tracks_from_query(
+            "https://open.spotify.com/album/x", shuffle=True
+        )
+        assert sorted(track.query for track in tracks) == sorted(
+            f"track {i} - artist" for i in range(spotify.total)
+        )
+
+    @pytest.mark.parametrize("spotify", [120], indirect=True)
+    @pytest.mark.asyncio
+    async def test_page_error(self, spotify, mocker):
+        album_tracks = spotify.album_tracks
+
+        async def failing(query, limit, offset):
+            if offset:
+                raise SpotifyError(500)
+            return await album_tracks(query, limit, offset)
+
+        mocker.patch.object(SpotifyClient, "album_tracks", failing)
+        tracks = await SpotifyHandler.tracks_from_query(
+            "https://open.spotify.com/album/x"
+        )
+        assert len(tracks) == settings.player.source.spotify.album.limit
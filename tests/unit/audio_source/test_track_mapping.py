@@ -0,0 +1,43 @@
+import pytest
+
+from pipo.player.audio_source.track_mapping import TrackMapping
+
+
+@pytest.mark.unit
+class TestTrackMapping:
+    @pytest.fixture(scope="function")
+    def mapping(self):
+        mapping = TrackMapping(":memory:", size=8, ttl=60)
+        yield mapping
+        mapping.close()
+
+    @pytest.mark.asyncio
+    async def test_track_id(self, mapping):
+        await mapping.remember("4uLU6hMCjMI75M1A2tKUQC", None, "dQw4w9WgXcQ")
+        assert await mapping.video_id("4uLU6hMCjMI75M1A2tKUQC") == "dQw4w9WgXcQ"
+
+    @pytest.mark.asyncio
+    async def test_case_sensitive(self, mapping):
+        await mapping.remember("4uLU6hMCjMI75M1A2tKUQC", None, "dQw4w9WgXcQ")
+        assert not await mapping.video_id("4ulu6hmcjmi75m1a2tkuqc")
+
+    @pytest.mark.asyncio
+    async def test_isrc(self, mapping):
+        await mapping.remember("4uLU6hMCjMI75M1A2tKUQC", "GBARL9300135", "dQw4w9WgXcQ")
+        assert await mapping.video_id("other", "gbarl9300135") == "dQw4w9WgXcQ"
+        assert await mapping.video_id(None, "GBARL9300135") == "dQw4w9WgXcQ"
+
+    @pytest.mark.asyncio
+    async def test_unknown(self, mapping):
+        assert not await mapping.video_id("4uLU6hMCjMI75M1A2tKUQC", "GBARL9300135")
+        assert not await mapping.video_id(None)
+
+    @pytest.mark.asyncio
+    async def test_persistent(self, tmp_path):
+        path = str(tmp_path / "tracks.sqlite3")
+        mapping = TrackMapping(path, size=8, ttl=60)
+        await mapping.remember("4uLU6hMCjMI75M1A2tKUQC", None, "dQw4w9WgXcQ")
+        mapping.close()
+        mapping = TrackMapping(path, size=8, ttl=60)
+        assert await mapping.video_id("4uLU6hMCjMI75M1A2tKUQC") == "dQw4w9WgXcQ"
+        mapping.close()
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from pipo.player.audio_source.youtube_pool import (
+    ExtractorLeaseTimeoutError,
+    YoutubeDLPool,
+)
+
+
+@pytest.mark.unit
+class TestYoutubeDLPool:
+    @pytest.fixture(scope="function", autouse=True)
+    def extractor(self, mocker):
+        return mocker.patch(
+            "pipo.player.audio_source.youtube_pool.YoutubeDL",
+            side_effect=lambda config: mocker.MagicMock(),
+        )
+
+    @pytest.fixture(scope="function")
+    def pool(self):
+        return YoutubeDLPool({}, size=2, max_uses=3, lease_timeout=0.1)
+
+    def test_extractor_reuse(self, pool, extractor):
+        with pool.lease() as first:
+            pass
+        with pool.lease() as second:
+            pass
+        assert first is second
+        assert extractor.call_count == 1
+
+    def test_concurrent_leases(self, pool, extractor):
+        with pool.lease() as first, pool.lease() as second:
+            assert first is not second
+        assert extractor.call_count == 2
+        assert pool.idle() == 2
+
+    def test_lease_timeout(self, pool):
+        with pool.lease(), pool.lease():
+            with pytest.raises(ExtractorLeaseTimeoutError):
+                with pool.lease():
+                    pass
+
+    def test_lease_released_on_error(self, pool):
+        with pytest.raises(ValueError):
+            with pool.lease():
+                raise ValueError
+        assert pool.idle() == 1
+
+    def test_recycle(self, pool, extractor):
+        leased = []
+        for _ in range(pool.max_uses + 1):
+            with pool.lease() as ydl:
+                leased.append(ydl)
+        assert extractor.call_count == 2
+        assert leased[0] is leased[pool.max_uses - 1]
+        assert leased[0] is not leased[pool.max_uses]
+        leased[0].close.assert_called_once()
+
+    def test_warm_up(self, pool, extractor):
+        pool.warm_up()
+        assert pool.idle() == pool.size
+        with pool.lease():
+            assert pool.idle() == pool.size - 1
+        assert extractor.call_count == pool.size
+
+    def test_close(self, pool):
+        pool.warm_up()
+        pool.close()
+        assert pool.idle() == 0
+
+    def test_threaded_leases(self, pool, extractor):
+        leased = set()
+
+        def lease():
+            for _ in range(10):
+                with pool.lease() as ydl:
+                    leased.add(id(ydl))
+
+        threads = [threading.Thread(target=lease) for _ in range(4)]
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+        assert pool.idle() <= pool.size
@@ -0,0 +1,99 @@
+import httpx
+import pytest
+
+from pipo.player.audio_source.http_client import HttpClient
+from pipo.player.audio_source.youtube_handler import YoutubeQueryHandler
+
+
+def results_page(video_id: str, offset: int) -> bytes:
+    return b"x" * offset + f'"url":"/watch?v={video_id}"'.encode() + b"y" * 4096
+
+
+def chunked_transport(page: bytes, chunk_size: int, sent: list) -> httpx.MockTransport:
+    async def chunks():
+        for start in range(0, len(page), chunk_size):
+            chunk = page[start : start + chunk_size]
+            sent.append(len(chunk))
+            yield chunk
+
+    return httpx.MockTransport(lambda request: httpx.Response(200, content=chunks()))
+
+
+@pytest.mark.unit
+class TestYoutubeSearch:
+    __video_id = "1V_xRb0x9aw"
+    __uri = "https://www.youtube.com/results?search_query=yellow"
+
+    @pytest.fixture(scope="function")
+    def client(self, mocker):
+        def build(page: bytes, chunk_size: int, sent: list) -> None:
+            client = httpx.AsyncClient(
+                transport=chunked_transport(page, chunk_size, sent)
+            )
+            mocker.patch.object(HttpClient, "get", return_value=client)
+
+        return build
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 18, 19, 1024])
+    @pytest.mark.parametrize("offset", [0, 5, 1000])
+    @pytest.mark.asyncio
+    async def test_stream_split_video_id(self, client, offset, chunk_size):
+        client(results_page(self.__video_id, offset), chunk_size, [])
+        assert await YoutubeQueryHandler.search_video_id(self.__uri) == self.__video_id
+
+    @pytest.mark.asyncio
+    async def test_stream_stops_early(self, client):
+        sent = []
+        page = results_page(self.__video_id, 1000) + b"z" * 100_000
+        client(page, 1024, sent)
+        assert await YoutubeQueryHandler.search_video_id(self.__uri) == self.__video_id
+        assert sum(sent) < 3 * 1024
+
+    @pytest.mark.asyncio
+    async def test_stream_no_video(self, client):
+        client(b"no videos here" * 100, 64, [])
+        assert await YoutubeQueryHandler.search_video_id(self.__uri) is None
+
+    @pytest.mark.asyncio
+    async def test_search_timeout(self, mocker):
+        timeouts = []
+
+        def handler(request):
+            timeouts.append(request.extensions["timeout"])
+            return httpx.Response(200, content=results_page(self.__video_id, 0))
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        mocker.patch.object(HttpClient, "get", return_value=client)
+        await YoutubeQueryHandler.search_video_id(self.__uri)
+        assert timeouts == [httpx.Timeout(600).as_dict()]
+
+    @pytest.mark.parametrize(
+        "response",
+        [
+            httpx.Response(429),
+            httpx.Response(500, content=results_page(__video_id, 0)),
+            httpx.ConnectError("unreachable"),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_search_error(self, mocker, response):
+        def handler(request):
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        mocker.patch.object(HttpClient, "get", return_value=client)
+        query = f"unavailable {id(response)}"
+        assert await YoutubeQueryHandler.url_from_query(query) is None
+        assert await YoutubeQueryHandler.query_cache().get(query) is None
+
+    @pytest.mark.asyncio
+    async def test_full_download(self, client, mocker):
+        sent = []
+        settings = mocker.patch("pipo.player.audio_source.youtube_handler.settings")
+        settings.player.url_fetch.streaming = False
+        page = results_page(self.__video_id, 1000) + b"z" * 100_000
+        client(page, 1024, sent)
+        assert await YoutubeQueryHandler.search_video_id(self.__uri) == self.__video_id
+        assert sum(sent) == len(page)
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+import tests.constants
+from pipo.config import settings
+from pipo.player.audio_source.audio_info import AudioInfo
+from pipo.player.audio_source.extraction_executor import ExtractionExecutor
+from pipo.player.audio_source.youtube_handler import YoutubeHandler
+
+
+@pytest.mark.unit
+class TestYoutubeStreamCache:
+    @pytest.fixture(scope="function", autouse=True)
+    def stream_cache(self):
+        YoutubeHandler.stream_cache().clear()
+        yield YoutubeHandler.stream_cache()
+        YoutubeHandler.stream_cache().clear()
+
+    @pytest.fixture(scope="function")
+    def executor(self):
+        return ExtractionExecutor(mode="inline", workers=1)
+
+    @pytest.mark.parametrize(
+        "url, expected",
+        [
+            (tests.constants.YOUTUBE_URL_1, "1V_xRb0x9aw"),
+            (tests.constants.YOUTUBE_URL_NO_HTTPS, "1V_xRb0x9aw"),
+            ("https://youtu.be/1V_xRb0x9aw?t=10", "1V_xRb0x9aw"),
+            ("https://www.youtube.com/shorts/1V_xRb0x9aw", "1V_xRb0x9aw"),
+            ("https://music.youtube.com/watch?v=1V_xRb0x9aw&list=x", "1V_xRb0x9aw"),
+            (tests.constants.YOUTUBE_PLAYLIST_1, "BaW_jenozKc"),
+            (tests.constants.YOUTUBE_PLAYLIST_SOURCE_1, None),
+            ("https://www.youtube.com/watch?v=short", None),
+            (tests.constants.YOUTUBE_QUERY_1, None),
+        ],
+    )
+    def test_video_id(self, url, expected):
+        assert YoutubeHandler.video_id(url) == expected
+
+    def test_stream_expiry(self):
+        expire = int(time.time()) + 21600
+        url = f"https://rr1---sn.googlevideo.com/videoplayback?expire={expire}&id=1"
+        margin = settings.player.source.youtube.stream_cache.expiry_margin
+        assert YoutubeHandler.stream_expiry(url) == expire - margin
+
+    def test_stream_default_expiry(self):
+        ttl = settings.player.source.youtube.stream_cache.default_ttl
+        assert YoutubeHandler.stream_expiry("https://a.b/c") > time.time() + ttl - 5
+
+    @pytest.mark.asyncio
+    async def test_fetch_audio_cached(self, mocker, executor, stream_cache):
+        audio = AudioInfo(
+            f"https://a.googlevideo.com/videoplayback?expire={int(time.time()) + 21600}"
+        )
+        get_audio = mocker.patch.object(
+            YoutubeHandler, "get_audio_info", return_value=audio
+        )
+        first = await YoutubeHandler.fetch_audio(
+            tests.constants.YOUTUBE_URL_1, executor
+        )
+        second = await YoutubeHandler.fetch_audio(
+            "https://youtu.be/1V_xRb0x9aw", executor
+        )
+        assert first == second == audio
+        get_audio.assert_called_once()
+        assert stream_cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fetch_audio_expired(self, mocker, executor):
+        audio = AudioInfo(
+            f"https://a.googlevideo.com/videoplayback?expire={int(time.time())}"
+        )
+        get_audio = mocker.patch.object(
+            YoutubeHandler, "get_audio_info", return_value=audio
+        )
+        await YoutubeHandler.fetch_audio(tests.constants.YOUTUBE_URL_1, executor)
+        await YoutubeHandler.fetch_audio(tests.constants.YOUTUBE_URL_1, executor)
+        assert get_audio.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_fetch_audio_valid_for(self, mocker, executor):
+        expire = int(time.time()) + 3600
+        audio = AudioInfo(f"https://a.googlevideo.com/videoplayback?expire={expire}")
+        get_audio = mocker.patch.object(
+            YoutubeHandler, "get_audio_info", return_value=audio
+        )
+        await YoutubeHandler.fetch_audio(tests.constants.YOUTUBE_URL_1, executor)
+        await YoutubeHandler.fetch_audio(tests.constants.YOUTUBE_URL_1, executor, 600)
+        assert get_audio.call_count == 1
+        # cached url would expire too soon, so it is resolved again
+        await YoutubeHandler.fetch_audio(tests.constants.YOUTUBE_URL_1, executor, 7200)
+        assert get_audio.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_fetch_audio_not_found(self, mocker, executor, stream_cache):
+        mocker.patch.object(YoutubeHandler, "get_audio_info", return_value=None)
+        assert not await YoutubeHandler.fetch_audio(
+            tests.constants.YOUTUBE_URL_1, executor
+        )
+        assert len(stream_cache) == 0
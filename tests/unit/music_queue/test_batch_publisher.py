@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from pipo.player.music_queue.batch_publisher import BatchPublisher
+
+
+class Publisher:
+    def __init__(self, delay=0.01, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.published = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def publish(self, message, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if message in self.fail:
+                raise RuntimeError(message)
+            self.published.append((message, kwargs))
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.unit
+class TestBatchPublisher:
+    @pytest.mark.asyncio
+    async def test_publish_all(self):
+        publisher = Publisher()
+        async with BatchPublisher(10) as batch:
+            for index in range(50):
+                await batch.publish(publisher.publish, index, routing_key="key")
+        assert sorted(message for message, _ in publisher.published) == list(range(50))
+        assert all(
+            kwargs == {"routing_key": "key"} for _, kwargs in publisher.published
+        )
+        assert batch.published == 50
+
+    @pytest.mark.asyncio
+    async def test_bounded_in_flight(self):
+        publisher = Publisher()
+        async with BatchPublisher(4) as batch:
+            for index in range(20):
+                await batch.publish(publisher.publish, index)
+                assert publisher.in_flight <= 4
+        assert publisher.peak == 4
+
+    @pytest.mark.asyncio
+    async def test_minimum_in_flight(self):
+        publisher = Publisher()
+        async with BatchPublisher(0) as batch:
+            for index in range(5):
+                await batch.publish(publisher.publish, index)
+        assert batch.max_in_flight == 1
+        assert publisher.peak == 1
+        assert [message for message, _ in publisher.published] == list(range(5))
+
+    @pytest.mark.asyncio
+    async def test_first_error_after_all(self):
+        publisher = Publisher(fail={3, 7})
+        with pytest.raises(RuntimeError, match="3"):
+            async with BatchPublisher(2) as batch:
+                for index in range(10):
+                    await batch.publish(publisher.publish, index)
+        assert len(publisher.published) == 8
+        assert batch.published == 8
+
+    @pytest.mark.asyncio
+    async def test_cancel_on_error(self):
+        publisher = Publisher(delay=10)
+        with pytest.raises(ValueError):
+            async with BatchPublisher(5) as batch:
+                for index in range(3):
+                    await batch.publish(publisher.publish, index)
+                raise ValueError
+        # pending publications are cancelled and awaited before leaving
+        assert publisher.in_flight == 0
+        assert publisher.published == []
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from pipo.player.music_queue.batch_resolver import BatchResolver
+
+
+@pytest.mark.unit
+class TestBatchResolver:
+    @pytest.mark.asyncio
+    async def test_resolve_in_order(self):
+        async def resolve(item):
+            await asyncio.sleep(0.01 * (5 - item))
+            return item * 10
+
+        results = [
+            result async for _, result in BatchResolver(5).resolve(range(5), resolve)
+        ]
+        assert results == [0, 10, 20, 30, 40]
+
+    @pytest.mark.asyncio
+    async def test_bounded_workers(self):
+        running, peak = 0, 0
+
+        async def resolve(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return item
+
+        results = [
+            item async for item, _ in BatchResolver(3).resolve(range(10), resolve)
+        ]
+        assert results == list(range(10))
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_item(self):
+        async def resolve(item):
+            if item == 1:
+                raise RuntimeError(item)
+            return item
+
+        resolver = BatchResolver(2)
+        results = [result async for _, result in resolver.resolve(range(3), resolve)]
+        assert results == [0, None, 2]
+        assert resolver.failed == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_pending(self):
+        running = set()
+
+        async def resolve(item):
+            running.add(item)
+            try:
+                await asyncio.sleep(10)
+            finally:
+                running.discard(item)
+
+        results = BatchResolver(2).resolve(range(4), resolve)
+        task = asyncio.create_task(results.__anext__())
+        await asyncio.sleep(0.01)
+        assert running == {0, 1}
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await results.aclose()
+        await asyncio.sleep(0)
+        assert running == set()
@@ -0,0 +1,103 @@
+import importlib.util
+
+import pytest
+from faststream import Context
+from faststream.rabbit import RabbitBroker, TestRabbitBroker
+
+import tests.constants
+from pipo.config import settings
+from pipo.player.music_queue.codec import (
+    JSON_CODEC,
+    MSGPACK_CODEC,
+    CodecMiddleware,
+    Codecs,
+    MessageCodec,
+    TrustedHops,
+    decode_message,
+)
+from pipo.player.music_queue.models import Music
+from tests.conftest import Helpers
+
+
+@pytest.mark.unit
+class TestCodec:
+    @pytest.fixture(scope="function", autouse=True)
+    def reset(self):
+        Codecs.reset()
+        TrustedHops.reset()
+        yield
+        Codecs.reset()
+        TrustedHops.reset()
+
+    def test_codec_interface(self):
+        class PartialCodec(MessageCodec):
+            def encode(self, message):
+                return b""
+
+        with pytest.raises(TypeError):
+            PartialCodec()
+
+    @staticmethod
+    def music() -> Music:
+        return Music(
+            uuid=Helpers.generate_uuid(),
+            server_id="0",
+            source=tests.constants.YOUTUBE_URL_1,
+            codec="opus",
+            bitrate=160,
+        )
+
+    @pytest.mark.parametrize("codec", [JSON_CODEC, MSGPACK_CODEC])
+    def test_round_trip(self, codec):
+        pytest.importorskip("msgpack")
+        music = self.music()
+        assert Music.model_validate(codec.decode(codec.encode(music))) == music
+
+    def test_msgpack_compact(self):
+        pytest.importorskip("msgpack")
+        music = self.music()
+        assert len(MSGPACK_CODEC.encode(music)) < len(JSON_CODEC.encode(music))
+
+    def test_by_content_type(self):
+        assert Codecs.by_content_type("application/msgpack") is MSGPACK_CODEC
+        assert Codecs.by_content_type("application/json") is JSON_CODEC
+        assert Codecs.by_content_type("text/plain") is None
+        assert Codecs.by_content_type(None) is None
+
+    def test_default_codec(self):
+        # msgpack is an optional extra, opted in through settings
+        assert Codecs.selected() is JSON_CODEC
+
+    def test_unknown_codec(self, mocker):
+        mocker.patch.object(settings.player.queue.broker, "codec", "unknown")
+        assert Codecs.selected() is JSON_CODEC
+
+    def test_msgpack_unavailable(self, mocker):
+        mocker.patch.object(settings.player.queue.broker, "codec", "msgpack")
+        mocker.patch.object(importlib.util, "find_spec", return_value=None)
+        assert Codecs.selected() is JSON_CODEC
+
+    @pytest.mark.parametrize("name", ["json", "msgpack"])
+    @pytest.mark.asyncio
+    async def test_broker(self, mocker, name):
+        pytest.importorskip("msgpack")
+        mocker.patch.object(settings.player.queue.broker, "codec", name)
+        mocker.patch.object(settings.player.queue.broker.trusted_hops, "enabled", False)
+        broker = RabbitBroker(decoder=decode_message, middlewares=(CodecMiddleware,))
+        received = []
+
+        @broker.subscriber("codec")
+        async def consume(music: Music, content_type=Context("message.content_type")):
+            received.append((music, content_type))
+
+        music = self.music()
+        async with TestRabbitBroker(broker) as br:
+            await br.publish(music, "codec")
+            # messages from services using another codec are still understood
+            await br.publish(
+                JSON_CODEC.encode(music), "codec", content_type="application/json"
+            )
+        assert received == [
+            (music, Codecs.by_name(name).content_type),
+            (music, "application/json"),
+        ]
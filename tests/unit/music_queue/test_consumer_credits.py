@@ -0,0 +1,157 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from pipo.player.music_queue._remote_music_queue import server_publisher
+from pipo.player.music_queue.consumer_credits import ConsumerCredits
+from pipo.player.music_queue.models import Music
+from pipo.player.music_queue.music_queue import music_queue
+
+
+@pytest.mark.unit
+class TestConsumerCredits:
+    @pytest.fixture
+    def subscriber(self, mocker):
+        queue = mocker.AsyncMock()
+        queue.consume.return_value = "resumed"
+        return SimpleNamespace(
+            _queue_obj=queue,
+            _consumer_tag="started",
+            consume=mocker.AsyncMock(),
+            consume_args={},
+        )
+
+    @pytest.mark.asyncio
+    async def test_pause_and_resume(self, subscriber):
+        available = 1
+        credits = ConsumerCredits(lambda: available)
+        credits.bind(subscriber)
+        await credits.update()
+        subscriber._queue_obj.cancel.assert_not_called()
+
+        available = 0
+        await credits.update()
+        await credits.update()
+        subscriber._queue_obj.cancel.assert_awaited_once_with("started")
+        assert subscriber._consumer_tag is None
+        assert credits.stats() == {"credits": 0, "paused": 1, "pauses": 1}
+
+        available = 2
+        await credits.update()
+        subscriber._queue_obj.consume.assert_awaited_once_with(
+            subscriber.consume, arguments=subscriber.consume_args
+        )
+        assert subscriber._consumer_tag == "resumed"
+        assert credits.stats() == {"credits": 2, "paused": 0, "pauses": 1}
+
+    @pytest.mark.asyncio
+    async def test_unstarted_subscriber(self):
+        credits = ConsumerCredits(lambda: 0)
+        credits.bind(SimpleNamespace(_queue_obj=None, _consumer_tag=None))
+        await credits.update()
+        assert credits.paused
+
+    @pytest.mark.asyncio
+    async def test_unsupported_subscriber(self, caplog):
+        credits = ConsumerCredits(lambda: 0)
+        credits.bind(SimpleNamespace())
+        await credits.update()
+        assert credits.paused
+        assert "unsupported FastStream" in caplog.text
+
+
+@pytest.mark.unit
+class TestLocalCapacity:
+    @pytest.mark.asyncio
+    async def test_credits_track_free_capacity(self, mocker):
+        publish = mocker.patch.object(server_publisher, "publish")
+        queue = type(music_queue)("0", 2)
+        await queue.add("query")
+        uuid = publish.call_args.args[0].uuid
+
+        def music(ordinal):
+            return Music(
+                uuid=uuid, server_id="0", source=f"https://audio.test/{ordinal}"
+            )
+
+        assert await queue._add_music(music(0))
+        assert queue.credits.available() == 1
+        assert await queue._add_music(music(1))
+        assert queue.credits.paused
+        # left in remote queue until local queue drains
+        assert not await queue._add_music(music(2))
+        assert queue.size() == 2
+
+        await queue.get()
+        assert not queue.credits.paused
+        assert await queue._add_music(music(2))
+        assert queue.size() == 2
+
+    @pytest.mark.asyncio
+    async def test_held_music_takes_no_capacity(self, mocker):
+        publish = mocker.patch.object(server_publisher, "publish")
+        queue = type(music_queue)("0", 3)
+        await queue.add([f"query {position}" for position in range(4)])
+        uuid = publish.call_args.args[0].uuid
+
+        def music(position):
+            return Music(
+                uuid=uuid,
+                server_id="0",
+                source=f"https://audio.test/{position}",
+                position=position,
+            )
+
+        # consumption goes on while waiting for the first music
+        for position in (3, 2, 1):
+            assert await queue._add_music(music(position))
+        assert not queue.credits.paused
+        assert (queue.size(), queue.reorder.held) == (0, 3)
+
+        assert await queue._add_music(music(0))
+        assert queue.size() == 4
+        assert queue.credits.paused
+        assert [(await queue.get()).position for _ in range(4)] == [0, 1, 2, 3]
+
+    def test_reorder_window_bounded_by_capacity(self):
+        assert type(music_queue)("0", 2).reorder.window == 2
+        assert type(music_queue)("0", 0).reorder.window > 2
+
+    @pytest.mark.asyncio
+    async def test_get_ends_once_requests_are_done(self, mocker):
+        publish = mocker.patch.object(server_publisher, "publish")
+        queue = type(music_queue)("0", 2)
+        assert await asyncio.wait_for(queue.get(60), 1) is None
+
+        await queue.add("query")
+        uuid = publish.call_args.args[0].uuid
+        getter = asyncio.ensure_future(queue.get(60))
+        await asyncio.sleep(0.01)
+        assert not getter.done()
+        # dispatch finished, its only source failing
+        queue.ledger.report(uuid, failed=1, expansions=-1)
+        assert await asyncio.wait_for(getter, 1) is None
+
+    @pytest.mark.asyncio
+    async def test_get_waits_for_request_added_once_idle(self, mocker):
+        publish = mocker.patch.object(server_publisher, "publish")
+        queue = type(music_queue)("0", 2)
+        idle_waits = []
+
+        async def wait_idle():
+            # first wait ended idle, a request being added before get resumed
+            idle_waits.append(None)
+            if len(idle_waits) > 1:
+                await asyncio.Event().wait()
+
+        mocker.patch.object(queue.ledger, "wait_idle", wait_idle)
+        await queue.add("query")
+        uuid = publish.call_args.args[0].uuid
+        getter = asyncio.ensure_future(queue.get(60))
+        await asyncio.sleep(0.01)
+        assert not getter.done()
+        assert await queue._add_music(
+            Music(uuid=uuid, server_id="0", source="https://audio.test/0")
+        )
+        assert (await asyncio.wait_for(getter, 1)).uuid == uuid
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from pipo.player.music_queue.fair_scheduler import FairScheduler
+
+
+async def run(scheduler, key, order, cost=1):
+    async with scheduler.slot(key, cost):
+        order.append(key)
+        await asyncio.sleep(0.01)
+
+
+async def backlog(scheduler, work, order):
+    """Occupy every slot, queue work, then let it run in grant order."""
+    blocker = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("blocker"):
+            await blocker.wait()
+
+    holders = [asyncio.create_task(hold()) for _ in range(scheduler.workers)]
+    await asyncio.sleep(0)
+    tasks = []
+    for key, cost in work:
+        tasks.append(asyncio.create_task(run(scheduler, key, order, cost)))
+        await asyncio.sleep(0)
+    blocker.set()
+    await asyncio.gather(*holders, *tasks)
+
+
+@pytest.mark.unit
+class TestFairScheduler:
+    @pytest.mark.asyncio
+    async def test_free_slots(self):
+        scheduler = FairScheduler(2)
+        await scheduler.acquire("a")
+        await asyncio.wait_for(scheduler.acquire("b"), 0.1)
+        assert scheduler.stats() == {"running": 2, "waiting": 0, "keys": 0}
+        scheduler.release()
+        scheduler.release()
+
+    @pytest.mark.asyncio
+    async def test_round_robin(self):
+        scheduler, order = FairScheduler(1), []
+        await backlog(scheduler, [("a", 1)] * 5 + [("b", 1), ("c", 1)], order)
+        assert order == ["a", "b", "c", "a", "a", "a", "a"]
+
+    @pytest.mark.asyncio
+    async def test_weights(self):
+        scheduler, order = FairScheduler(1, weights={"a": 2}), []
+        await backlog(scheduler, [("a", 1)] * 4 + [("b", 1)] * 4, order)
+        assert order[:6] == ["a", "a", "b", "a", "a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_cost(self):
+        scheduler, order = FairScheduler(1), []
+        await backlog(scheduler, [("a", 2)] * 2 + [("b", 1)] * 4, order)
+        assert order == ["b", "a", "b", "b", "a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter(self):
+        scheduler = FairScheduler(1)
+        await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        other = asyncio.create_task(scheduler.acquire("c"))
+        await asyncio.sleep(0)
+        assert scheduler.waiting() == {"b": 1, "c": 1}
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release()
+        await asyncio.wait_for(other, 0.1)
+        scheduler.release()
+        assert scheduler.stats() == {"running": 0, "waiting": 0, "keys": 0}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_after_grant(self):
+        scheduler = FairScheduler(1)
+        await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        scheduler.release()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.stats()["running"] == 0
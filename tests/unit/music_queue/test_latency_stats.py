@@ -0,0 +1,25 @@
+import pytest
+
+from pipo.player.music_queue.latency_stats import LatencyStats
+
+
+@pytest.mark.unit
+class TestLatencyStats:
+    def test_empty(self):
+        assert LatencyStats().stats() == {
+            "count": 0,
+            "mean_ms": 0,
+            "max_ms": 0,
+            "last_ms": 0,
+        }
+
+    def test_record(self):
+        latency = LatencyStats()
+        for seconds in (0.2, 0.5, 0.1):
+            latency.record(seconds)
+        assert latency.stats() == {
+            "count": 3,
+            "mean_ms": pytest.approx(266.667),
+            "max_ms": 500,
+            "last_ms": 100,
+        }
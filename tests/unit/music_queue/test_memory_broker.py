@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+from faststream.exceptions import NackMessage
+from faststream.rabbit import ExchangeType, RabbitExchange, RabbitQueue
+
+from pipo.player.music_queue.consumer_credits import ConsumerCredits
+from pipo.player.music_queue.memory_broker import (
+    MemoryBroker,
+    UnsupportedFastStreamError,
+    topic_matches,
+)
+
+PROVIDERS = RabbitExchange("providers", type=ExchangeType.TOPIC)
+DLX = RabbitExchange("dlx", type=ExchangeType.TOPIC)
+
+
+async def settle(condition, timeout=1):
+    """Wait until condition holds, deliveries being processed in background."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.001)
+
+
+@pytest.mark.unit
+@pytest.mark.remote_queue
+class TestMemoryBroker:
+    @pytest.mark.parametrize(
+        "pattern, routing_key, expected",
+        [
+            ("provider.youtube.url", "provider.youtube.url", True),
+            ("provider.spotify.*", "provider.spotify.playlist", True),
+            ("provider.spotify.*", "provider.spotify.playlist.bulk", False),
+            ("provider.spotify.*.bulk", "provider.spotify.album.bulk", True),
+            ("dl.#", "dl.youtube", True),
+            ("dl.#", "dl", True),
+            ("#.bulk", "provider.youtube.url.bulk", True),
+            ("hub.0", "hub.1", False),
+        ],
+    )
+    def test_topic_matches(self, pattern, routing_key, expected):
+        assert topic_matches(pattern, routing_key) == expected
+
+    @pytest.mark.asyncio
+    async def test_routing(self):
+        broker = MemoryBroker()
+        received = []
+
+        @broker.subscriber(RabbitQueue("url", routing_key="provider.*.url"), PROVIDERS)
+        @broker.subscriber(RabbitQueue("youtube", routing_key="#.youtube.#"), PROVIDERS)
+        async def consume(message: str) -> None:
+            received.append(message)
+
+        @broker.subscriber(RabbitQueue("direct"))
+        async def consume_direct(message: str) -> None:
+            received.append(f"direct {message}")
+
+        async with broker:
+            await broker.start()
+            await broker.publish(
+                "a", routing_key="provider.youtube.url", exchange=PROVIDERS
+            )
+            await broker.publish(
+                "b", routing_key="provider.spotify.url", exchange=PROVIDERS
+            )
+            await broker.publish("c", routing_key="unbound", exchange=PROVIDERS)
+            await broker.publish("d", "direct")
+            await settle(lambda: len(received) == 4)
+        assert sorted(received) == ["a", "a", "b", "direct d"]
+
+    @pytest.mark.asyncio
+    async def test_dead_lettering(self):
+        broker = MemoryBroker()
+        deliveries, dead = [], []
+        queue = RabbitQueue(
+            "failing",
+            routing_key="provider.#",
+            arguments={
+                "x-dead-letter-exchange": DLX.name,
+                "x-dead-letter-routing-key": "dl.failing",
+                "x-delivery-limit": 2,
+            },
+        )
+
+        @broker.subscriber(queue, PROVIDERS)
+        async def consume(message: str) -> None:
+            deliveries.append(message)
+            if message == "requeued":
+                raise NackMessage(requeue=True)
+            raise ValueError(message)
+
+        @broker.subscriber(RabbitQueue("dlq", routing_key="dl.#"), DLX)
+        async def consume_dead(message: str) -> None:
+            dead.append(message)
+
+        async with broker:
+            await broker.start()
+            await broker.publish(
+                "requeued", routing_key="provider.a", exchange=PROVIDERS
+            )
+            await settle(lambda: dead == ["requeued"])
+            await broker.publish(
+                "rejected", routing_key="provider.a", exchange=PROVIDERS
+            )
+            await settle(lambda: len(dead) == 2)
+        # first delivery and as many redeliveries as the limit allows
+        assert deliveries == ["requeued"] * 3 + ["rejected"]
+        assert dead == ["requeued", "rejected"]
+
+    @pytest.mark.asyncio
+    async def test_requeue_at_head(self):
+        broker = MemoryBroker(max_consumers=1)
+        deliveries = []
+
+        @broker.subscriber(RabbitQueue("requeued"))
+        async def consume(message: str) -> None:
+            deliveries.append(message)
+            if deliveries.count(message) == 1 and message == "a":
+                raise NackMessage(requeue=True)
+
+        async with broker:
+            await broker.start()
+            for message in "abc":
+                await broker.publish(message, "requeued")
+            await settle(lambda: len(deliveries) == 4)
+        # delivered again before messages published after it
+        assert deliveries == ["a", "a", "b", "c"]
+
+    @pytest.mark.parametrize("version", ["0.5.26", "0.6.0", "1.0.0rc1"])
+    def test_unsupported_faststream(self, mocker, version):
+        mocker.patch("importlib.metadata.version", return_value=version)
+        with pytest.raises(UnsupportedFastStreamError, match=version):
+            MemoryBroker()
+
+    @pytest.mark.asyncio
+    async def test_prefetch_limit(self):
+        broker = MemoryBroker(max_consumers=2)
+        release = asyncio.Event()
+        running, done = [], []
+
+        @broker.subscriber(RabbitQueue("first"))
+        @broker.subscriber(RabbitQueue("second"))
+        async def consume(message: int) -> None:
+            running.append(message)
+            await release.wait()
+            done.append(message)
+
+        async with broker:
+            await broker.start()
+            for message in range(3):
+                await broker.publish(message, "first")
+                await broker.publish(message, "second")
+            # limit applies to each subscriber
+            await settle(lambda: len(running) == 4)
+            await asyncio.sleep(0.01)
+            assert sorted(running) == [0, 0, 1, 1]
+            release.set()
+            await settle(lambda: len(done) == 6)
+
+    @pytest.mark.asyncio
+    async def test_consumer_credits(self):
+        broker = MemoryBroker()
+        available = 0
+        received = []
+
+        subscriber = broker.subscriber(RabbitQueue("hub"))
+
+        @subscriber
+        async def consume(message: int) -> None:
+            received.append(message)
+
+        credits = ConsumerCredits(lambda: available)
+        credits.bind(subscriber)
+        async with broker:
+            await broker.start()
+            await credits.update()
+            await broker.publish(1, "hub")
+            await asyncio.sleep(0.01)
+            assert received == []
+            assert broker.declarer.stats()["hub"] == 1
+
+            available = 1
+            await credits.update()
+            await settle(lambda: received == [1])
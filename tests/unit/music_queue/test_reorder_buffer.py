@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+import uuid6
+
+from pipo.player.music_queue.models import Music
+from pipo.player.music_queue.reorder_buffer import ReorderBuffer
+
+UUID = str(uuid6.uuid7())
+
+
+def music(position, ordinal=0, final=True, uuid=UUID):
+    return Music(
+        uuid=uuid,
+        server_id="0",
+        source=f"https://audio.test/{position}/{ordinal}",
+        position=position,
+        ordinal=ordinal,
+        final=final,
+    )
+
+
+def order(released):
+    return [(item.position, item.ordinal) for item in released]
+
+
+@pytest.mark.unit
+class TestReorderBuffer:
+    @pytest.mark.asyncio
+    async def test_in_order(self):
+        released = []
+        buffer = ReorderBuffer(released.append, window=4, gap_timeout=60)
+        buffer.push(music(0))
+        buffer.push(music(1))
+        assert order(released) == [(0, 0), (1, 0)]
+        assert buffer.stats() == {"held": 0, "skipped": 0}
+
+    @pytest.mark.asyncio
+    async def test_holds_until_predecessor(self):
+        released = []
+        buffer = ReorderBuffer(released.append, window=4, gap_timeout=60)
+        buffer.push(music(0, 2, final=True))
+        buffer.push(music(1))
+        buffer.push(music(0, 1, final=False))
+        assert released == []
+        assert buffer.held == 3
+        buffer.push(music(0, 0, final=False))
+        assert order(released) == [(0, 0), (0, 1), (0, 2), (1, 0)]
+        assert buffer.held == 0
+
+    @pytest.mark.asyncio
+    async def test_streams_are_independent(self):
+        released = []
+        other = str(uuid6.uuid7())
+        buffer = ReorderBuffer(released.append, window=4, gap_timeout=60)
+        buffer.push(music(1))
+        buffer.push(music(0, uuid=other))
+        assert order(released) == [(0, 0)]
+        assert released[0].uuid == other
+
+    @pytest.mark.asyncio
+    async def test_skips_gap_after_timeout(self):
+        released = []
+        buffer = ReorderBuffer(released.append, window=4, gap_timeout=0.01)
+        buffer.push(music(2))
+        buffer.push(music(3))
+        assert released == []
+        await asyncio.sleep(0.05)
+        assert order(released) == [(2, 0), (3, 0)]
+        assert buffer.stats() == {"held": 0, "skipped": 1}
+
+    @pytest.mark.asyncio
+    async def test_releases_skipped_music_late(self):
+        released = []
+        buffer = ReorderBuffer(released.append, window=1, gap_timeout=60)
+        buffer.push(music(1))
+        buffer.push(music(2))
+        assert order(released) == [(1, 0), (2, 0)]
+        buffer.push(music(0))
+        buffer.push(music(4))
+        assert order(released) == [(1, 0), (2, 0), (0, 0)]
+        assert buffer.stats() == {"held": 1, "skipped": 1}
+        # music expected next is still released in order
+        buffer.push(music(3))
+        assert order(released) == [(1, 0), (2, 0), (0, 0), (3, 0), (4, 0)]
+
+    @pytest.mark.asyncio
+    async def test_skips_gap_beyond_window(self):
+        released = []
+        buffer = ReorderBuffer(released.append, window=2, gap_timeout=60)
+        buffer.push(music(1))
+        buffer.push(music(3))
+        assert released == []
+        buffer.push(music(4))
+        assert order(released) == [(1, 0)]
+        assert buffer.held == 2
+        buffer.clear()
+        assert buffer.held == 0
+
+    @pytest.mark.asyncio
+    async def test_flush(self):
+        released = []
+        buffer = ReorderBuffer(released.append, window=4, gap_timeout=60)
+        buffer.push(music(2))
+        buffer.push(music(1))
+        buffer.flush(UUID)
+        assert order(released) == [(1, 0), (2, 0)]
+        assert buffer.stats() == {"held": 0, "skipped": 0}
+
+    @pytest.mark.asyncio
+    async def test_late_music_after_flush(self):
+        released = []
+        buffer = ReorderBuffer(released.append, window=4, gap_timeout=60)
+        buffer.push(music(0))
+        buffer.push(music(2))
+        buffer.flush(UUID)
+        # flushed stream is not restarted, so late music is not held
+        buffer.push(music(1))
+        buffer.push(music(3))
+        assert order(released) == [(0, 0), (2, 0), (1, 0), (3, 0)]
+        assert buffer.held == 0
+        buffer.clear()
+        buffer.push(music(1))
+        assert buffer.held == 1
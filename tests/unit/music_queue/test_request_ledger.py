@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from pipo.player.music_queue.request_ledger import RequestLedger, TimerWheel
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestTimerWheel:
+    def test_expiry(self):
+        clock = Clock()
+        wheel = TimerWheel(ttl=10, resolution=1, clock=clock)
+        wheel.touch("a")
+        clock.now = 5.5
+        assert wheel.advance() == []
+        wheel.touch("b")
+        clock.now = 10.5
+        assert wheel.advance() == []
+        clock.now = 12
+        assert wheel.advance() == ["a"]
+        wheel.touch("b")
+        clock.now = 20
+        assert wheel.advance() == []
+        clock.now = 100
+        assert wheel.advance() == ["b"]
+
+    def test_discard(self):
+        clock = Clock()
+        wheel = TimerWheel(ttl=1, resolution=1, clock=clock)
+        wheel.touch("a")
+        wheel.discard("a")
+        clock.now = 10
+        assert wheel.advance() == []
+
+
+@pytest.mark.unit
+class TestRequestLedger:
+    def test_progress(self):
+        ledger = RequestLedger(ttl=60)
+        ledger.open("a", expected=1)
+        ledger.open("b", expected=2)
+        assert ledger.outstanding == 2
+        assert ledger.report("a", expected=2)
+        ledger.resolve("a")
+        ledger.resolve("a")
+        assert ledger.outstanding == 2
+        assert ledger.report("a", failed=1)
+        assert ledger.outstanding == 1
+        ledger.resolve("b")
+        ledger.play("b")
+        ledger.report("b", failed=1)
+        assert ledger.idle()
+        progress = ledger.get("b")
+        assert (progress.expected, progress.resolved, progress.failed) == (2, 1, 1)
+        assert progress.played == 1
+
+    def test_music_ahead_of_expansion(self):
+        ledger = RequestLedger(ttl=60)
+        ledger.open("a", expected=1, expanding=1)
+        # playlist music may arrive before the report expanding the request
+        ledger.resolve("a")
+        assert not ledger.idle()
+        ledger.report("a", expected=1, expansions=1)
+        ledger.report("a", expansions=-1)
+        assert not ledger.idle()
+        ledger.report("a", expansions=-1)
+        assert not ledger.idle()
+        ledger.resolve("a")
+        assert ledger.idle()
+
+    def test_unknown_request(self):
+        ledger = RequestLedger(ttl=60)
+        assert not ledger.report("a", failed=1)
+        assert ledger.resolve("a") is None
+        assert ledger.idle()
+
+    def test_expiry(self):
+        clock = Clock()
+        ledger = RequestLedger(ttl=10, clock=clock)
+        ledger.open("a", expected=1)
+        clock.now = 8
+        ledger.report("a", expected=1)
+        clock.now = 15
+        assert not ledger.idle()
+        clock.now = 20
+        assert ledger.idle()
+        assert ledger.get("a") is None
+        assert ledger.stats() == {"requests": 0, "outstanding": 0, "expired": 1}
+
+    @pytest.mark.asyncio
+    async def test_wait_idle(self):
+        ledger = RequestLedger(ttl=60)
+        ledger.open("a", expected=1)
+        waiter = asyncio.ensure_future(ledger.wait_idle())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        ledger.resolve("a")
+        await asyncio.wait_for(waiter, 0.1)
@@ -0,0 +1,134 @@
+import hashlib
+import hmac
+from types import SimpleNamespace
+
+import pydantic
+import pytest
+from faststream.rabbit import RabbitBroker, TestRabbitBroker
+
+import tests.constants
+from pipo.config import settings
+from pipo.player.music_queue.codec import (
+    CodecMiddleware,
+    Codecs,
+    TrustedHops,
+    decode_message,
+)
+from pipo.player.music_queue.models import (
+    Music,
+    ProviderOperation,
+    TrustedPayload,
+)
+from tests.conftest import Helpers
+
+
+@pytest.mark.unit
+class TestTrustedModel:
+    def test_trusted_not_validated(self):
+        payload = {"uuid": "not an uuid", "server_id": "0", "source": "not an url"}
+        music = Music.model_validate(TrustedPayload(payload))
+        assert music.uuid == "not an uuid"
+        assert music.source == "not an url"
+        assert music.bitrate is None
+        with pytest.raises(pydantic.ValidationError):
+            Music.model_validate(payload)
+
+    def test_missing_field_validated(self):
+        with pytest.raises(pydantic.ValidationError):
+            Music.model_validate(TrustedPayload(server_id="0"))
+
+    def test_defaults(self):
+        music = Music.model_validate(
+            TrustedPayload(uuid=Helpers.generate_uuid(), server_id="0", source="a")
+        )
+        assert music.model_fields_set == {"uuid", "server_id", "source"}
+        assert (music.codec, music.container, music.bitrate, music.duration) == (
+            None,
+            None,
+            None,
+            None,
+        )
+
+    def test_untrusted_model_validated(self):
+        with pytest.raises(pydantic.ValidationError):
+            ProviderOperation.model_validate(
+                TrustedPayload(
+                    uuid="not an uuid",
+                    server_id="0",
+                    provider="provider.youtube.query",
+                    operation="query",
+                    query="a",
+                )
+            )
+
+
+@pytest.mark.unit
+class TestTrustedHops:
+    @pytest.fixture(scope="function", autouse=True)
+    def reset(self):
+        Codecs.reset()
+        TrustedHops.reset()
+        yield
+        Codecs.reset()
+        TrustedHops.reset()
+
+    @pytest.fixture(scope="function")
+    def signing_key(self):
+        settings.set("queue_signing_key", "secret")
+        yield "secret"
+        settings.unset("queue_signing_key", force=True)
+
+    @staticmethod
+    def message(body: bytes, value) -> SimpleNamespace:
+        header = settings.player.queue.broker.trusted_hops.header
+        return SimpleNamespace(body=body, headers={header: value})
+
+    def test_unsigned(self):
+        # forged headers are not trusted without a signing key
+        assert TrustedHops.sign(b"body") is None
+        assert not TrustedHops.verify(self.message(b"body", "1"))
+
+    def test_signed(self, signing_key):
+        signature = TrustedHops.sign(b"body")
+        assert TrustedHops.verify(self.message(b"body", signature))
+        assert not TrustedHops.verify(self.message(b"tampered", signature))
+        assert not TrustedHops.verify(self.message(b"body", "1"))
+        assert not TrustedHops.verify(self.message(b"body", None))
+        assert not TrustedHops.verify(SimpleNamespace(body=b"body", headers=None))
+
+    def test_disabled(self, mocker, signing_key):
+        mocker.patch.object(settings.player.queue.broker.trusted_hops, "enabled", False)
+        assert TrustedHops.sign(b"body") is None
+        signature = hmac.digest(signing_key.encode(), b"body", hashlib.sha256).hex()
+        assert not TrustedHops.verify(self.message(b"body", signature))
+
+    @pytest.mark.parametrize("codec", ["json", "msgpack"])
+    @pytest.mark.asyncio
+    async def test_broker(self, mocker, signing_key, codec):
+        pytest.importorskip("msgpack")
+        mocker.patch.object(settings.player.queue.broker, "codec", codec)
+        broker = RabbitBroker(decoder=decode_message, middlewares=(CodecMiddleware,))
+        received = []
+
+        @broker.subscriber("trusted")
+        async def consume(music: Music):
+            received.append(music)
+
+        music = Music(
+            uuid=Helpers.generate_uuid(),
+            server_id="0",
+            source=tests.constants.YOUTUBE_URL_1,
+        )
+        async with TestRabbitBroker(broker) as br:
+            await br.publish(music, "trusted")
+            # untrusted publications are validated
+            await br.publish(
+                music.model_dump_json().encode(),
+                "trusted",
+                content_type="application/json",
+            )
+        assert isinstance(received[0].source, str)
+        assert not isinstance(received[1].source, str)
+        assert [str(music.source) for music in received] == [
+            tests.constants.YOUTUBE_URL_1
+        ] * 2
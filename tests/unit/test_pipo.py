@@ -0,0 +1,119 @@
+#!usr/bin/env python3
+import asyncio
+import threading
+import time
+
+import mock
+import pytest
+import uuid6
+
+import tests.constants
+from pipo.pipo import Pipo
+from pipo.player.audio_source.audio_info import AudioInfo
+from pipo.player.audio_source.youtube_handler import YoutubeHandler
+from pipo.player.music_queue.models.music import Music
+
+
+@pytest.mark.unit
+class TestPipo:
+    @pytest.fixture(scope="function")
+    def pipo(self):
+        return Pipo(mock.Mock())
+
+    @staticmethod
+    def music(**kwargs) -> Music:
+        return Music(
+            uuid=str(uuid6.uuid7()),
+            server_id="0",
+            source="https://a.googlevideo.com/videoplayback",
+            **kwargs,
+        )
+
+    @pytest.mark.asyncio
+    async def test_load_music_passthrough(self, pipo, mocker):
+        audio = mocker.patch("discord.FFmpegOpusAudio")
+        music = self.music(codec="opus", container="webm", bitrate=129.5)
+        open_source = await pipo.load_music(music)
+        audio.assert_not_called()
+        open_source()
+        audio.assert_called_once()
+        assert audio.call_args.kwargs["codec"] == "copy"
+        assert audio.call_args.kwargs["bitrate"] == 130
+        audio.probe.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "codec, container",
+        [(None, None), ("opus", None), ("mp4a", "m4a"), ("opus", "mp4")],
+    )
+    @pytest.mark.asyncio
+    async def test_load_music_probe(self, pipo, mocker, codec, container):
+        audio = mocker.patch("discord.FFmpegOpusAudio")
+        audio.probe = mock.AsyncMock(return_value=("vorbis", 96))
+        open_source = await pipo.load_music(
+            self.music(codec=codec, container=container)
+        )
+        audio.probe.assert_awaited_once()
+        audio.assert_not_called()
+        open_source()
+        assert audio.call_args.kwargs["codec"] == "vorbis"
+        assert audio.call_args.kwargs["bitrate"] == 96
+
+    @pytest.mark.parametrize("valid_for, resolved", [(21600, False), (600, True)])
+    @pytest.mark.asyncio
+    async def test_load_music_expiring_url(self, pipo, mocker, valid_for, resolved):
+        audio = mocker.patch("discord.FFmpegOpusAudio")
+        audio.probe = mock.AsyncMock(return_value=("opus", 128))
+        expire = int(time.time())
+        fresh = f"https://b.googlevideo.com/videoplayback?expire={expire + 21600}"
+        fetch_audio = mocker.patch.object(
+            YoutubeHandler, "fetch_audio", return_value=AudioInfo(fresh)
+        )
+        music = Music(
+            uuid=str(uuid6.uuid7()),
+            server_id="0",
+            source=f"https://a.googlevideo.com/videoplayback?expire={expire + valid_for}",
+            origin=tests.constants.YOUTUBE_URL_1,
+            duration=240,
+        )
+        await pipo.load_music(music)
+        assert fetch_audio.called == resolved
+        url = audio.probe.call_args.args[0]
+        assert url == (fresh if resolved else str(music.source))
+
+    @pytest.fixture(scope="function")
+    def voice_client(self, pipo):
+        voice_client = mock.Mock()
+
+        def play(source, after):
+            threading.Timer(voice_client.play_time, after, args=(None,)).start()
+
+        voice_client.play_time = 0.2
+        voice_client.play.side_effect = play
+        pipo.voice_client = voice_client
+        return voice_client
+
+    @pytest.mark.asyncio
+    async def test_submit_music_waits_completion(self, pipo, voice_client):
+        submission = asyncio.create_task(pipo.submit_music(self.music(), mock.Mock()))
+        await asyncio.sleep(voice_client.play_time / 2)
+        assert not submission.done()
+        await asyncio.wait_for(submission, tests.constants.SHORT_TIMEOUT)
+        assert pipo.player.can_play.is_set()
+
+    @pytest.mark.asyncio
+    async def test_stop_music(self, pipo, voice_client):
+        voice_client.play_time = tests.constants.SHORT_TIMEOUT
+        voice_client.play.side_effect = None
+        submission = asyncio.create_task(pipo.submit_music(self.music(), mock.Mock()))
+        await asyncio.sleep(0)
+        pipo.stop_music()
+        await asyncio.wait_for(submission, voice_client.play_time)
+        voice_client.stop.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_submit_music_playback_error(self, pipo, voice_client):
+        voice_client.play.side_effect = lambda source, after: after(RuntimeError())
+        await asyncio.wait_for(
+            pipo.submit_music(self.music(), mock.Mock()),
+            tests.constants.SHORT_TIMEOUT,
+        )
@@ -0,0 +1,152 @@
+#!usr/bin/env python3
+import asyncio
+from typing import List, Optional
+
+import mock
+import pytest
+import uuid6
+
+import tests.constants
+from pipo.player import Player
+from pipo.player.music_queue.models.music import Music
+from pipo.player.queue import PlayerQueue
+
+
+class LocalQueue(PlayerQueue):
+    def __init__(self) -> None:
+        super().__init__()
+        self.musics = asyncio.Queue()
+
+    async def add(self, query: List[str], shuffle: bool = False) -> None:
+        [
+            self.musics.put_nowait(
+                Music(
+                    uuid=str(uuid6.uuid7()),
+                    server_id="0",
+                    source=f"https://{music}.test",
+                )
+            )
+            for music in query
+        ]
+
+    async def get(self, timeout: int = 0) -> Optional[Music]:
+        try:
+            return await asyncio.wait_for(self.musics.get(), 0.2)
+        except asyncio.TimeoutError:
+            return None
+
+    def size(self) -> int:
+        return self.musics.qsize()
+
+    def clear(self) -> None:
+        while not self.musics.empty():
+            self.musics.get_nowait()
+
+
+class IdleQueue(LocalQueue):
+    """Ends get operations at once when empty, as if no request was outstanding."""
+
+    async def get(self, timeout: int = 0) -> Optional[Music]:
+        return None if self.musics.empty() else self.musics.get_nowait()
+
+
+class Bot:
+    def __init__(self, play_time: float = 0.2) -> None:
+        self.play_time = play_time
+        self.loaded = []
+        self.sources = {}
+        self.opened = []
+        self.played = []
+        self.loaded_when_played = []
+        self.idle = asyncio.Event()
+        self.send_message = mock.AsyncMock()
+        self.voice_client = mock.Mock()
+        self.stop_music = mock.Mock()
+
+    @staticmethod
+    def name(music: Music) -> str:
+        return music.source.host.removesuffix(".test")
+
+    async def load_music(self, music: Music):
+        url = self.name(music)
+        if url == "broken":
+            raise RuntimeError
+        self.loaded.append(url)
+        self.sources[url] = mock.Mock(name=url)
+        return self.sources[url]
+
+    async def submit_music(self, music: Music, open_source=None) -> None:
+        self.opened.append(open_source())
+        self.played.append(self.name(music))
+        await asyncio.sleep(self.play_time / 2)
+        self.loaded_when_played.append(len(self.loaded))
+        await asyncio.sleep(self.play_time / 2)
+
+    def become_idle(self) -> None:
+        self.idle.set()
+
+
+@pytest.mark.unit
+class TestPlayer:
+    @pytest.fixture(scope="function")
+    def bot(self):
+        return Bot()
+
+    @pytest.fixture(scope="function")
+    def player(self, bot):
+        player = Player(bot)
+        player._player_queue = LocalQueue()
+        return player
+
+    @pytest.mark.asyncio
+    async def test_play_order(self, player, bot):
+        await player.play(tests.constants.MUSIC_SIMPLE_LIST_3)
+        await asyncio.wait_for(bot.idle.wait(), tests.constants.SHORT_TIMEOUT)
+        assert bot.played == tests.constants.MUSIC_SIMPLE_LIST_3
+
+    @pytest.mark.asyncio
+    async def test_next_music_prefetched(self, player, bot):
+        await player.play(tests.constants.MUSIC_SIMPLE_LIST_3)
+        await asyncio.wait_for(bot.idle.wait(), tests.constants.SHORT_TIMEOUT)
+        musics = len(tests.constants.MUSIC_SIMPLE_LIST_3)
+        # while a music plays the following one is prepared
+        assert bot.loaded_when_played == [*range(2, musics + 1), musics]
+
+    @pytest.mark.asyncio
+    async def test_lookahead_depth(self, player, bot):
+        await player.play(tests.constants.MUSIC_SIMPLE_LIST_3)
+        await asyncio.sleep(bot.play_time / 2)
+        assert bot.played == [tests.constants.MUSIC_1]
+        assert len(bot.loaded) == 2
+        # prepared music holds no audio stream until played
+        assert bot.opened == [bot.sources[tests.constants.MUSIC_1].return_value]
+        player.clear()
+
+    @pytest.mark.asyncio
+    async def test_load_error(self, player, bot):
+        await player.play([tests.constants.MUSIC_1, "broken", tests.constants.MUSIC_2])
+        await asyncio.wait_for(bot.idle.wait(), tests.constants.SHORT_TIMEOUT)
+        assert bot.played == tests.constants.MUSIC_SIMPLE_LIST_1
+        bot.send_message.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_clear_discards_prefetched(self, player, bot):
+        await player.play(tests.constants.MUSIC_SIMPLE_LIST_3)
+        await asyncio.sleep(bot.play_time / 2)
+        player.clear()
+        await asyncio.sleep(bot.play_time)
+        assert player.queue_size() == 0
+        assert bot.played == [tests.constants.MUSIC_1]
+        bot.sources[tests.constants.MUSIC_2].assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_add_during_last_music(self, bot):
+        player = Player(bot)
+        player._player_queue = IdleQueue()
+        await player.play(tests.constants.MUSIC_1)
+        # look-ahead task ends once music starts, no other music being requested
+        await asyncio.sleep(bot.play_time / 2)
+        assert bot.played == [tests.constants.MUSIC_1]
+        await player.play(tests.constants.MUSIC_2)
+        await asyncio.wait_for(bot.idle.wait(), tests.constants.SHORT_TIMEOUT)
+        assert bot.played == tests.constants.MUSIC_SIMPLE_LIST_1
@@ -0,0 +1,72 @@
+#!usr/bin/env python3
+import subprocess
+import sys
+
+import mock
+import pytest
+from faststream.rabbit import TestRabbitBroker
+
+from pipo import worker
+from pipo.config import settings
+from pipo.player.audio_source.youtube_handler import YoutubeHandler, YoutubeOperations
+from pipo.player.music_queue._remote_music_queue import provider_exch
+from pipo.player.music_queue.models import ProviderOperation
+from pipo.worker import ROUTERS, WorkerGroup
+from tests.conftest import Helpers
+
+
+@pytest.mark.unit
+@pytest.mark.remote_queue
+class TestWorker:
+    @pytest.fixture(scope="function")
+    def routers(self):
+        # bot broker includes the routers too, as workers are disabled in tests,
+        # and including them again adds the middlewares of the group broker
+        middlewares = {
+            subscriber: subscriber._broker_middlewares
+            for router in ROUTERS.values()
+            for subscriber in router._subscribers.values()
+        }
+        yield
+        for subscriber, original in middlewares.items():
+            subscriber._broker_middlewares = original
+
+    def test_groups_cover_routers(self):
+        assert set(ROUTERS) == set(WorkerGroup)
+        assert len(set(ROUTERS.values())) == len(WorkerGroup)
+        assert set(settings.worker.concurrency) == set(WorkerGroup)
+
+    @pytest.mark.parametrize("group", list(WorkerGroup))
+    @pytest.mark.asyncio
+    async def test_group_broker(self, mocker, routers, group):
+        fetch_audio = mocker.patch.object(YoutubeHandler, "fetch_audio")
+        fetch_audio.return_value = None
+        mocker.patch.object(worker.broker, "publish", mock.AsyncMock())
+        request = ProviderOperation(
+            uuid=Helpers.generate_uuid(),
+            server_id="0",
+            provider=settings.player.queue.service.transmuter.youtube.routing_key,
+            operation=YoutubeOperations.URL,
+            query="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        )
+        async with TestRabbitBroker(worker.group_broker(group)) as br:
+            await br.publish(
+                request, exchange=provider_exch, routing_key=request.provider
+            )
+        # only youtube group consumes youtube urls
+        assert fetch_audio.called == (group == WorkerGroup.YOUTUBE)
+
+    def test_no_discord_dependencies(self):
+        loaded = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, pipo.worker; "
+                "print(*(m for m in sys.modules if m.startswith("
+                "('discord', 'nacl', 'pipo.bot', 'pipo.cogs', 'pipo.player.player'))))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert loaded.stdout.split() == []